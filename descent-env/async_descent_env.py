@@ -0,0 +1,173 @@
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from descent_env import ACTION_FREQUENCY
+from vec_descent_env import VecDescentEnv
+
+# Columns of the shared observation buffer, in the order of the observation dict
+OBS_KEYS = ("altitude", "vz", "target_altitude", "runway_distance")
+# Per-aircraft values of the episodes that ended in the last step
+INFO_KEYS = ("total_reward", "final_altitude", "episode_length")
+
+
+def _worker(index, envs_per_worker, env_kwargs, buffers, pipe):
+    """
+    Runs a VecDescentEnv (and, with the bluesky backend, its own BlueSky) in a child
+    process. Commands arrive through the pipe; observations, actions, rewards and
+    terminations are exchanged through the shared buffers (rows of this worker only).
+    """
+    rows = slice(index * envs_per_worker, (index + 1) * envs_per_worker)
+    obs, actions, rewards, terminated, info = (np.frombuffer(b).reshape(s)[rows] for b, s in buffers)
+    env = None
+    try:
+        env = VecDescentEnv(envs_per_worker, **env_kwargs)
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                observation, _ = env.reset(seed=data)
+                terminated[:] = 0
+            elif command == "step":
+                observation, reward, done, _, infos = env.step(actions)
+                rewards[:] = reward
+                terminated[:] = done
+                for i, key in enumerate(INFO_KEYS):
+                    info[:, i] = infos.get(key, 0)
+            elif command == "close":
+                pipe.send(("ok", None))
+                break
+            for i, key in enumerate(OBS_KEYS):
+                obs[:, i] = observation[key][:, 0]
+            pipe.send(("ok", None))
+    except (KeyboardInterrupt, Exception):
+        pipe.send(("error", traceback.format_exc()))
+    finally:
+        pipe.close()
+
+
+class AsyncVecDescentEnv(VectorEnv):
+    """
+    VecDescentEnv split across worker processes, each with its own simulator.
+
+    BlueSky is a process-wide singleton (bs.init, bs.traf, bs.scr are module globals), so
+    several simulations can only run side by side in separate processes. Each of the
+    num_workers processes flies envs_per_worker aircraft; observations, actions, rewards
+    and terminations live in shared memory and only short commands go through the pipes.
+
+    step_async / step_wait (and reset_async / reset_wait) let the caller overlap its own
+    work with the simulation. Autoreset and infos work as in VecDescentEnv. The returned
+    observation arrays are views of the shared buffer: the next step overwrites them.
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_workers=None, envs_per_worker=1, backend="bluesky", action_repeat=ACTION_FREQUENCY,
+                 fast_reset=False, context=None):
+        self.num_workers = num_workers or multiprocessing.cpu_count()
+        self.envs_per_worker = envs_per_worker
+        self.num_envs = self.num_workers * envs_per_worker
+        self.backend = backend
+
+        template = VecDescentEnv(1, backend="surrogate")
+        self.single_observation_space = template.single_observation_space
+        self.single_action_space = template.single_action_space
+        self.observation_space = batch_space(self.single_observation_space, self.num_envs)
+        self.action_space = batch_space(self.single_action_space, self.num_envs)
+
+        ctx = multiprocessing.get_context(context)
+        env_kwargs = {"backend": backend, "action_repeat": action_repeat, "fast_reset": fast_reset}
+        n = self.num_envs
+        shapes = [(n, len(OBS_KEYS)), (n,), (n,), (n,), (n, len(INFO_KEYS))]
+        self._buffers = [(ctx.RawArray("d", int(np.prod(shape))), shape) for shape in shapes]
+        self._obs, self._actions, self._rewards, self._terminated, self._info = (
+            np.frombuffer(b).reshape(s) for b, s in self._buffers)
+        self._truncations = np.zeros(n, dtype=bool)
+
+        self._pipes = []
+        self._processes = []
+        for index in range(self.num_workers):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, daemon=True,
+                                  args=(index, envs_per_worker, env_kwargs, self._buffers, child))
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+        self._waiting = False
+        self.closed = False
+
+    def _send(self, command, data=None):
+        assert not self._waiting, "Call the matching *_wait before sending another command."
+        for i, pipe in enumerate(self._pipes):
+            pipe.send((command, data[i] if isinstance(data, list) else data))
+        self._waiting = True
+
+    def _wait(self):
+        errors = []
+        for pipe in self._pipes:
+            status, message = pipe.recv()
+            if status == "error":
+                errors.append(message)
+        self._waiting = False
+        if errors:
+            raise RuntimeError("A descent env worker failed:\n" + errors[0])
+
+    def _get_obs(self):
+        return {key: self._obs[:, i:i + 1] for i, key in enumerate(OBS_KEYS)}
+
+    def reset_async(self, seed=None, options=None):
+        # Worker i is seeded with seed + i
+        self._send("reset", None if seed is None else [seed + i for i in range(self.num_workers)])
+
+    def reset_wait(self):
+        self._wait()
+        return self._get_obs(), {}
+
+    def reset(self, *, seed=None, options=None):
+        self.reset_async(seed, options)
+        return self.reset_wait()
+
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions, dtype=np.float64).reshape(self.num_envs)
+        self._send("step")
+
+    def step_wait(self):
+        self._wait()
+        terminated = self._terminated.astype(bool)
+        infos = {}
+        if terminated.any():
+            for i, key in enumerate(INFO_KEYS):
+                infos[key] = self._info[:, i].copy()
+                infos["_" + key] = terminated.copy()
+            infos["episode_length"] = infos["episode_length"].astype(np.int64)
+        return self._get_obs(), self._rewards, terminated, self._truncations, infos
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self, **kwargs):
+        if self.closed:
+            return
+        if self._waiting:
+            self._wait()
+        for pipe in self._pipes:
+            pipe.send(("close", None))
+        for pipe, process in zip(self._pipes, self._processes):
+            try:
+                pipe.recv()
+            except EOFError:
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            pipe.close()
+        self.closed = True
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
@@ -0,0 +1,43 @@
+"""
+Time one simulation tick of SurrogateDynamics and, when BlueSky is installed, of
+BlueSkyDynamics, with n aircraft levelling off at random selected altitudes.
+
+    python benchmark_dynamics.py [n ...]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+from dynamics import BlueSkyDynamics, SurrogateDynamics
+
+TICKS = 1000
+REPEAT = 5
+
+
+def tick_time(sim, n, seed=0):
+    """Best time [s] of one sim.step() over REPEAT runs of TICKS ticks."""
+    rng = np.random.default_rng(seed)
+    sim.create(rng.uniform(2000, 4000, n), 150.0, idx=np.arange(n))
+    rows = sim.rows()
+    sim.selalt[rows] = rng.uniform(2000, 4000, n)
+    sim.selvs[rows] = rng.uniform(-12.5, 12.5, n)
+    return min(timeit.repeat(sim.step, number=TICKS, repeat=REPEAT)) / TICKS
+
+
+def main(sizes):
+    try:
+        bluesky = BlueSkyDynamics()
+    except ImportError:
+        bluesky = None
+        print("BlueSky is not installed: timing the surrogate only")
+    for n in sizes:
+        row = f"{n:5d} aircraft  surrogate {tick_time(SurrogateDynamics(n), n) * 1e6:9.1f} us/tick"
+        if bluesky is not None:
+            bluesky.delete_all()
+            row += f"  bluesky {tick_time(bluesky, n) * 1e6:9.1f} us/tick"
+        print(row)
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or [1, 16, 256])
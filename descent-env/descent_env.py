@@ -2,12 +2,11 @@ import numpy as np
 import pygame
 import pygame.surfarray
 
-import bluesky as bs
-from bluesky_gym.envs.common.screen_dummy import ScreenDummy
-
 import gymnasium as gym
 from gymnasium import spaces
 
+from dynamics import BlueSkyDynamics, SurrogateDynamics, kwikdist
+
 # Define constants
 ALT_MEAN = 1500
 ALT_STD = 3000
@@ -30,6 +29,29 @@ AC_SPD = 150
 
 ACTION_FREQUENCY = 30
 
+# Adaptive action repeat: full repeat beyond this runway distance [km], shorter closer in
+ADAPTIVE_RWY_DIS = 20
+MIN_ACTION_FREQUENCY = 5
+
+DEFAULT_RWY_DIS = 200
+RWY_LAT = 52
+RWY_LON = 4
+NM2KM = 1.852
+
+BACKENDS = ("bluesky", "surrogate")
+
+
+def vertical_command(vs):
+    """
+    BlueSky interprets a vertical velocity command through an altitude command with a
+    vertical speed (magnitude), so an arbitrary altitude is selected in the direction
+    of the requested vertical speed. Returns (selalt, selvs).
+    """
+    if vs >= 0:
+        return 1000000, vs # High target altitude to start climb
+    return 0, vs # Zero target altitude to start descent
+
+
 class DescentEnv(gym.Env):
     """ 
     Very simple environment that requires the agent to climb / descend to a target altitude.
@@ -41,7 +63,8 @@ class DescentEnv(gym.Env):
     # for BlueSkyGym probably only implement 1 for now together with None, which is default
     metadata = {"render_modes": ["rgb_array","human"], "render_fps": 120}
 
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, backend="bluesky", action_repeat=ACTION_FREQUENCY,
+                 adaptive_repeat=False, min_action_repeat=MIN_ACTION_FREQUENCY, fast_reset=False):
         self.window_width = 512
         self.window_height = 256
         self.window_size = (self.window_width, self.window_height) # Size of the rendered environment
@@ -60,12 +83,21 @@ class DescentEnv(gym.Env):
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = render_mode
 
-        # initialize bluesky as non-networked simulation node
-        bs.init(mode='sim', detached=True)
-
-        # initialize dummy screen and set correct sim speed
-        bs.scr = ScreenDummy()
-        bs.stack.stack('DT 1;FF')
+        # "bluesky" runs the full simulator; "surrogate" integrates the same altitude,
+        # vertical speed and position with numpy (see dynamics.SurrogateDynamics)
+        # With fast_reset the aircraft is kept when an episode ends and re-initialized in
+        # place by the next reset, instead of being deleted and created again
+        assert backend in BACKENDS
+        self.backend = backend
+        self.fast_reset = fast_reset
+        self.sim = BlueSkyDynamics(reuse_aircraft=fast_reset) if backend == "bluesky" else SurrogateDynamics()
+
+        # Simulation ticks per action. With adaptive_repeat the number of ticks shrinks
+        # linearly from action_repeat (ADAPTIVE_RWY_DIS km or more from the runway) down
+        # to min_action_repeat, so the agent acts more often close to the runway
+        self.action_repeat = action_repeat
+        self.adaptive_repeat = adaptive_repeat
+        self.min_action_repeat = min(min_action_repeat, action_repeat)
 
         # initialize values used for logging -> input in _get_info
         self.total_reward = 0
@@ -88,14 +120,9 @@ class DescentEnv(gym.Env):
         Very crude normalization in place for now
         """
 
-        DEFAULT_RWY_DIS = 200 
-        RWY_LAT = 52
-        RWY_LON = 4
-        NM2KM = 1.852
-
-        self.altitude = bs.traf.alt[0]
-        self.vz = bs.traf.vs[0]
-        self.runway_distance = (DEFAULT_RWY_DIS - bs.tools.geo.kwikdist(RWY_LAT,RWY_LON,bs.traf.lat[0],bs.traf.lon[0])*NM2KM)
+        self.altitude = self.sim.alt[0]
+        self.vz = self.sim.vs[0]
+        self.runway_distance = self._get_runway_distance()
 
         # very crude normalization
         obs_altitude = np.array([(self.altitude - ALT_MEAN)/ALT_STD])
@@ -112,6 +139,19 @@ class DescentEnv(gym.Env):
         
         return observation
     
+    def _get_runway_distance(self):
+        return DEFAULT_RWY_DIS - kwikdist(RWY_LAT,RWY_LON,self.sim.lat[0],self.sim.lon[0])*NM2KM
+
+    def _is_terminal(self):
+        # Same termination conditions as _get_reward, checked on the current sim state
+        return self.sim.alt[0] <= 0 or self._get_runway_distance() <= 0
+
+    def _get_action_repeat(self):
+        if not self.adaptive_repeat:
+            return self.action_repeat
+        fraction = max(self.runway_distance, 0) / ADAPTIVE_RWY_DIS
+        return int(np.clip(round(self.action_repeat * fraction), self.min_action_repeat, self.action_repeat))
+
     def _get_info(self):
         # Here you implement any additional info that you want to return after a step,
         # but that should not be used by the agent for decision making, so used for logging and debugging purposes
@@ -121,11 +161,12 @@ class DescentEnv(gym.Env):
             "final_altitude": self.final_altitude
         }
     
-    def _get_reward(self):
+    def _get_reward(self, weight=1):
 
-        # reward part of the function
+        # reward part of the function; weight scales the altitude-tracking reward of
+        # steps shorter than action_repeat (adaptive repeat)
         if self.runway_distance > 0 and self.altitude > 0:
-            reward = abs(self.target_alt - self.altitude) * ALT_DIF_REWARD_SCALE
+            reward = abs(self.target_alt - self.altitude) * ALT_DIF_REWARD_SCALE * weight
             self.total_reward += reward
             return reward, 0
         elif self.altitude <= 0:
@@ -141,19 +182,10 @@ class DescentEnv(gym.Env):
         
     def _get_action(self,action):
         # Transform action to the meters per second
-        action = action * ACTION_2_MS
+        action = np.ravel(action)[0] * ACTION_2_MS
 
-        # Bluesky interpretes vertical velocity command through altitude commands 
-        # with a vertical speed (magnitude). So check sign of action and give arbitrary 
-        # altitude command
-
-        # The actions are then executed through stack commands;
-        if action >= 0:
-            bs.traf.selalt[0] = 1000000 # High target altitude to start climb
-            bs.traf.selvs[0] = action
-        elif action < 0:
-            bs.traf.selalt[0] = 0 # High target altitude to start descent
-            bs.traf.selvs[0] = action
+        # The actions are then executed by setting the selected altitude / vertical speed
+        self.sim.selalt[0], self.sim.selvs[0] = vertical_command(action)
 
     def reset(self, seed=None, options=None):
         
@@ -166,8 +198,7 @@ class DescentEnv(gym.Env):
         alt_init = np.random.randint(ALT_MIN, ALT_MAX)
         self.target_alt = alt_init + np.random.randint(-TARGET_ALT_DIF,TARGET_ALT_DIF)
 
-        bs.traf.cre('KL001',actype="A320",acalt=alt_init,acspd=AC_SPD)
-        bs.traf.swvnav[0] = False
+        self.sim.create(alt_init, AC_SPD)
 
         observation = self._get_obs()
         info = self._get_info()
@@ -181,26 +212,45 @@ class DescentEnv(gym.Env):
         
         self._get_action(action)
 
-        action_frequency = ACTION_FREQUENCY
+        action_frequency = self._get_action_repeat()
         for i in range(action_frequency):
-            bs.sim.step()
+            self.sim.step()
             if self.render_mode == "human":
                 self._render_frame()
                 observation = self._get_obs()
+            # Stop at the tick where the aircraft crashes or reaches the runway
+            if self._is_terminal():
+                break
 
         observation = self._get_obs()
-        reward, terminated = self._get_reward()
+        reward, terminated = self._get_reward((i + 1) / self.action_repeat if self.adaptive_repeat else 1)
 
         info = self._get_info()
 
-        # bluesky reset?? bs.sim.reset()
-        if terminated:
-            for acid in bs.traf.id:
-                idx = bs.traf.id2idx(acid)
-                bs.traf.delete(idx)
+        if terminated and not self.fast_reset:
+            self.sim.delete_all()
 
         return observation, reward, terminated, False, info
     
+    def snapshot(self):
+        """
+        Whole simulation state plus the episode variables, to go back to this point
+        later with restore() (for example to evaluate several actions from one state).
+        """
+        return {
+            "sim": self.sim.snapshot(),
+            "target_alt": self.target_alt,
+            "total_reward": self.total_reward,
+            "final_altitude": self.final_altitude,
+        }
+
+    def restore(self, snapshot):
+        self.sim.restore(snapshot["sim"])
+        self.target_alt = snapshot["target_alt"]
+        self.total_reward = snapshot["total_reward"]
+        self.final_altitude = snapshot["final_altitude"]
+        return self._get_obs()
+
     def render(self, mode=None):
         # Si no se especifica, usa el modo de la instancia
         if mode is None:
@@ -0,0 +1,535 @@
+import copy
+import sys
+
+import numpy as np
+
+# Constants used by BlueSky (bluesky.tools.aero / geo)
+NM = 1852.0  # m
+FT = 0.3048  # m
+R_EARTH = 6371000.0  # m
+P0 = 101325.0  # Pa, sea level ISA pressure
+RHO0 = 1.225  # kg/m3, sea level ISA density
+T0 = 288.15  # K, sea level ISA temperature
+T_STRAT = 216.65  # K, temperature above the tropopause
+R_AIR = 287.05287  # J/(kg K)
+
+# Vertical speed changes are limited to this acceleration by BlueSky (300 fpm per second)
+VS_ACCEL = 300 * FT / 60
+# Autopilot default vertical speed (1500 fpm), used when |selvs| <= VS_MIN_COMMAND
+VS_DEFAULT = 1500 * FT / 60
+VS_MIN_COMMAND = 0.1
+G0 = 9.80665  # m/s2
+GAMMA = 1.4  # cp/cv of air
+
+# Flight phases of BlueSky's OpenAP performance model (openap.phase)
+NA, GD, IC, CL, CR, DE, AP = range(7)
+
+# OpenAP data of the A320 the environment flies (bluesky.traffic.performance.openap)
+A320_MASS = 60300.0  # kg, mean of OEW and MTOW
+A320_SREF = 122.6  # m2, wing area
+A320_BPR = 5.9  # engine bypass ratio
+A320_THRUST = 2 * 120110.0  # N, static maximum thrust of both engines
+A320_HMAX = 11060.0  # m, ceiling
+A320_MMO = 0.8
+A320_AXMAX = 2.37  # m/s2, until the first performance update
+AXMAX_MIN = 0.5  # m/s2, OpenAP's lower bound of axmax
+# Drag polar (cd0, k) per phase (indexed by phase): clean, takeoff (+ gear on the ground), landing
+A320_CD0 = np.array([0.018, 0.019 + 0.017, 0.019, 0.018, 0.018, 0.018, 0.023])
+A320_K = np.array([0.039, 0.036, 0.036, 0.039, 0.039, 0.039, 0.034])
+# CAS envelope [m/s] per phase, as built by OpenAP._construct_v_limits
+A320_VMIN = np.array([67.0, 0.0, 67.0, 67.0, 67.0, 67.0, 67.0])
+A320_VMAX = np.array([163.0, 89.0, 163.0, 163.0, 163.0, 163.0, 77.0])
+
+# Aircraft are created at BlueSky's default position, which is also the runway reference point
+START_LAT = 52.0
+START_LON = 4.0
+
+# Values that BlueSkyDynamics can write into a reused traffic row without copying them
+IMMUTABLE = (bool, int, float, str, type(None), np.generic)
+
+# Per-aircraft state of SurrogateDynamics, saved by snapshot()
+SURROGATE_STATE = ("alt", "vs", "cas", "tas", "hdg", "lat", "lon", "selalt", "selvs", "selspd", "swvnav",
+                   "phase", "axmax")
+
+
+def vatmos(h):
+    """ISA pressure, density and temperature at altitude h [m] (port of bluesky.tools.aero.vatmos)."""
+    T = np.maximum(T0 - 0.0065 * h, T_STRAT)
+    rhotrop = RHO0 * (T / T0) ** 4.256848030018761
+    dhstrat = np.maximum(0.0, h - 11000.0)
+    rho = rhotrop * np.exp(-dhstrat / 6341.552161)
+    p = rho * R_AIR * T
+    return p, rho, T
+
+
+def _cas2tas(cas, p, rho):
+    qdyn = P0 * ((1.0 + RHO0 * cas * cas / (7.0 * P0)) ** 3.5 - 1.0)
+    tas = np.sqrt(7.0 * p / rho * ((1.0 + qdyn / p) ** (2.0 / 7.0) - 1.0))
+    return np.copysign(tas, cas)
+
+
+def _tas2cas(tas, p, rho):
+    qdyn = p * ((1.0 + rho * tas * tas / (7.0 * p)) ** 3.5 - 1.0)
+    cas = np.sqrt(7.0 * P0 / RHO0 * ((qdyn / P0 + 1.0) ** (2.0 / 7.0) - 1.0))
+    return np.copysign(cas, tas)
+
+
+def vcas2tas(cas, h):
+    """True airspeed from calibrated airspeed [m/s] at altitude h [m]."""
+    p, rho, _ = vatmos(h)
+    return _cas2tas(cas, p, rho)
+
+
+def vtas2cas(tas, h):
+    """Calibrated airspeed from true airspeed [m/s] at altitude h [m]."""
+    p, rho, _ = vatmos(h)
+    return _tas2cas(tas, p, rho)
+
+
+def kwikdist(lata, lona, latb, lonb):
+    """Flat-earth distance in nautical miles (port of bluesky.tools.geo.kwikdist)."""
+    dlat = np.radians(latb - lata)
+    dlon = np.radians(((lonb - lona) + 180) % 360 - 180)
+    cavelat = np.cos(np.radians(lata + latb) * 0.5)
+    dangle = np.sqrt(dlat * dlat + dlon * dlon * cavelat * cavelat)
+    return R_EARTH * dangle / NM
+
+
+def flight_phase(vs, alt):
+    """OpenAP flight phase of fixed-wing aircraft from vertical speed [m/s] and altitude [m]."""
+    roc = vs / (FT / 60)
+    alt = alt / FT
+    level = np.abs(roc) <= 150
+    climb = roc >= 150
+    descent = roc <= -150
+    # Same order as openap.phase: later phases overwrite earlier ones
+    phase = np.where(alt <= 75, GD, NA)
+    if (alt < 1000).any():
+        low = (alt >= 75) & (alt <= 1000)
+        phase = np.where(low & climb, IC, phase)
+        phase = np.where(low & descent, AP, phase)
+    high = alt >= 1000
+    phase = np.where(high & climb, CL, phase)
+    phase = np.where(high & descent, DE, phase)
+    return np.where((alt >= 10000) & level, CR, phase)
+
+
+# Reference values of the in-flight thrust model (openap.thrust.inflight)
+_P10 = vatmos(10000 * FT)[0]
+_P35 = vatmos(35000 * FT)[0]
+_F35 = (200 + 0.2 * A320_THRUST / 4.448) * 4.448
+_MACH_REF = 0.8
+_VCAS_REF = float(vtas2cas(_MACH_REF * np.sqrt(GAMMA * R_AIR * vatmos(35000 * FT)[2]), 35000 * FT))
+
+
+def max_thrust_ratio(tas, alt, vs, p, T, cas):
+    """
+    In-flight maximum thrust over static thrust (port of openap.thrust.inflight) at
+    true / calibrated airspeed tas / cas and altitude alt, with pressure p and
+    temperature T there. The take-off thrust is not needed: OpenAP fixes axmax on the
+    ground.
+    """
+    roc = np.abs(vs / (FT / 60))
+    a = (cas / _VCAS_REF) ** (-0.1)
+    n = 2.667e-05 * roc + 0.8633
+    F10 = _F35 * a * (_P10 / _P35) ** (-0.355 * (cas / _VCAS_REF) + n)
+    m = -1.2043e-1 * cas / _VCAS_REF - 8.8889e-9 * roc ** 2 + 2.4444e-5 * roc + 4.7379e-1
+    ratio = m * (p / _P35) + (F10 / _F35 - m * (_P10 / _P35))
+    high = alt > 10000 * FT
+    if high.any():
+        ratio_seg2 = a * (p / _P35) ** (-0.355 * (cas / _VCAS_REF) + n)
+        mach = tas / np.sqrt(GAMMA * R_AIR * T)
+        ratio_seg3 = (-0.4204 * mach / _MACH_REF + 1.0824) * np.log(p / _P35) + (mach / _MACH_REF) ** (-0.11)
+        ratio = np.where(alt > 35000 * FT, ratio_seg3, np.where(high, ratio_seg2, ratio))
+    return ratio * _F35 / A320_THRUST
+
+
+def max_acceleration(phase, tas, alt, vs, p, rho, T):
+    """
+    OpenAP's axmax [m/s2]: (maximum thrust - drag) / mass, 2 on the ground, at least
+    AXMAX_MIN; p, rho and T are the atmosphere at alt.
+    """
+    rhovs = 0.5 * rho * tas ** 2 * A320_SREF
+    cl = A320_MASS * G0 / rhovs
+    drag = rhovs * (A320_CD0[phase] + A320_K[phase] * cl ** 2)
+    v = np.maximum(tas, 10)
+    thrust = max_thrust_ratio(v, alt, vs, p, T, _tas2cas(v, p, rho)) * A320_THRUST
+    axmax = np.where(phase == GD, 2.0, (thrust - drag) / A320_MASS)
+    return np.maximum(axmax, AXMAX_MIN)
+
+
+class SurrogateDynamics:
+    """
+    Lightweight numpy replacement for the part of BlueSky the descent environment uses.
+
+    Each row is one A320 on a fixed heading, flown with the same laws BlueSky applies
+    with VNAV/LNAV off and its default OpenAP performance model:
+
+    - autopilot.update: the commanded speed is the TAS of selspd (a CAS) at the current
+      altitude; the commanded vertical speed is |selvs|, or the default 1500 fpm when
+      |selvs| <= 0.1 m/s.
+    - OpenAP.limits: the commanded speed is clipped to the CAS envelope of the flight
+      phase, evaluated at the selected altitude (capped at the ceiling), and to MMO.
+    - traffic.update_airspeed: the TAS moves towards the command at most axmax per
+      second (OpenAP: (maximum thrust - drag) / mass, updated once per tick before the
+      traffic, except on the very first tick of the simulation); the vertical speed
+      changes at most VS_ACCEL per second and the altitude snaps to the selected one
+      once it is within 1.05 ticks of it.
+    - traffic.update_pos: positions are integrated on a flat earth, so runway distances
+      can be computed with kwikdist on lat/lon.
+
+    The vertical speed limits of the envelope are not modelled: they never bind for the
+    environment's commands (|selvs| <= 12.5 m/s, A320 limits -14.7 / 16.0 m/s).
+
+    The arrays (alt, vs, lat, lon, selalt, selvs, ...) mirror the bs.traf arrays of the
+    same name, so the environment can read and write them the same way for both backends;
+    rows() gives the array index of each aircraft (here, always its row).
+    """
+
+    def __init__(self, n=1, dt=1.0):
+        self.n = n
+        self.dt = dt
+        self.alt = np.zeros(n)
+        self.vs = np.zeros(n)
+        self.cas = np.zeros(n)
+        self.tas = np.zeros(n)
+        self.hdg = np.zeros(n)
+        self.lat = np.full(n, START_LAT)
+        self.lon = np.full(n, START_LON)
+        self.selalt = np.zeros(n)
+        self.selvs = np.zeros(n)
+        self.selspd = np.zeros(n)
+        self.swvnav = np.zeros(n, dtype=bool)
+        # Performance model state (bs.traf.perf.phase / axmax)
+        self.phase = np.full(n, NA)
+        self.axmax = np.full(n, A320_AXMAX)
+        self.simt = 0.0
+        self._rows = np.arange(n)
+
+    def rows(self):
+        return self._rows
+
+    def create(self, alt, spd, idx=0, hdg=None):
+        """
+        (Re)initialize the aircraft in row idx (an index or an array of indices) at the
+        start position, like bs.traf.cre: spd is the calibrated airspeed [m/s] and, as in
+        BlueSky, the heading is 0 (north) when not given.
+        """
+        idx = np.atleast_1d(idx)
+        if hdg is None:
+            hdg = 0.0
+        self.alt[idx] = alt
+        self.vs[idx] = 0.0
+        self.cas[idx] = spd
+        self.tas[idx] = vcas2tas(self.cas[idx], self.alt[idx])
+        self.hdg[idx] = hdg
+        self.lat[idx] = START_LAT
+        self.lon[idx] = START_LON
+        self.selalt[idx] = alt
+        self.selvs[idx] = 0.0
+        self.selspd[idx] = spd
+        self.swvnav[idx] = False
+        self.phase[idx] = NA
+        self.axmax[idx] = A320_AXMAX
+
+    def delete_all(self):
+        # Rows are reused by the next create
+        pass
+
+    def snapshot(self):
+        state = {name: getattr(self, name).copy() for name in SURROGATE_STATE}
+        state["simt"] = self.simt
+        return state
+
+    def restore(self, snapshot):
+        for name in SURROGATE_STATE:
+            setattr(self, name, snapshot[name].copy())
+        self.simt = snapshot["simt"]
+
+    def step(self):
+        """Advance every aircraft by one simulation tick of dt seconds."""
+        dt = self.dt
+        p, rho, T = vatmos(self.alt)
+        # Performance update (a timer in BlueSky, which first fires after the first tick)
+        if self.simt > 0:
+            self.phase = flight_phase(self.vs, self.alt)
+
+        # Autopilot commands; a (near) zero vertical speed command means "use the default"
+        ap_tas = _cas2tas(self.selspd, p, rho)
+        ap_vs = np.abs(np.where(np.abs(self.selvs) > VS_MIN_COMMAND, self.selvs, VS_DEFAULT))
+        # Flight envelope, evaluated at the selected altitude
+        ap_alt = np.minimum(self.selalt, A320_HMAX)
+        p_sel, rho_sel, T_sel = vatmos(ap_alt)
+        ap_cas = np.minimum(np.maximum(_tas2cas(ap_tas, p_sel, rho_sel), A320_VMIN[self.phase]), A320_VMAX[self.phase])
+        ap_tas = np.minimum(_cas2tas(ap_cas, p_sel, rho_sel), A320_MMO * np.sqrt(GAMMA * R_AIR * T_sel))
+
+        delta_spd = ap_tas - self.tas
+        # axmax only limits speed changes larger than AXMAX_MIN * dt, so it is only
+        # recomputed (from the state at the start of the tick) for those aircraft
+        if self.simt > 0:
+            i = np.flatnonzero(np.abs(delta_spd) > AXMAX_MIN * dt)
+            if i.size:
+                self.axmax[i] = max_acceleration(self.phase[i], self.tas[i], self.alt[i], self.vs[i],
+                                                 p[i], rho[i], T[i])
+        need_ax = np.abs(delta_spd) > np.abs(dt * self.axmax)
+        self.tas = np.where(need_ax, self.tas + np.sign(delta_spd) * self.axmax * dt, ap_tas)
+        self.cas = _tas2cas(self.tas, p, rho)
+
+        delta_alt = ap_alt - self.alt
+        # Time based altitude capture
+        swaltsel = np.abs(delta_alt) > 1.05 * np.maximum(np.abs(dt * ap_vs), np.abs(dt * self.vs))
+        target_vs = swaltsel * np.sign(delta_alt) * ap_vs
+        delta_vs = target_vs - self.vs
+        need_az = np.abs(delta_vs) > VS_ACCEL * dt
+        self.vs = np.where(need_az, self.vs + np.sign(delta_vs) * VS_ACCEL * dt, target_vs)
+
+        self.alt = np.where(swaltsel, np.round(self.alt + self.vs * dt, 6), ap_alt)
+        hdg = np.radians(self.hdg)
+        self.lat = self.lat + np.degrees(dt * self.tas * np.cos(hdg) / R_EARTH)
+        coslat = np.cos(np.radians(self.lat))
+        self.lon = self.lon + np.degrees(dt * self.tas * np.sin(hdg) / coslat / R_EARTH)
+        self.simt += dt
+
+
+class BlueSkyDynamics:
+    """
+    The full BlueSky simulator behind the same interface as SurrogateDynamics.
+
+    BlueSky is a process-wide singleton: creating this initializes it as a detached
+    simulation node with a 1 second time step, or resets it to an empty simulation at
+    t = 0 if it was already initialized. Aircraft idx is called KL001, KL002, ...;
+    bs.traf reorders its arrays when an aircraft is deleted, so multi-aircraft users index
+    the arrays with rows().
+
+    With reuse_aircraft, create() re-initializes an existing aircraft in place instead of
+    deleting it and calling bs.traf.cre again, which avoids resizing every traffic array
+    on each reset. The whole row is reset (autopilot, route, performance model, ADS-B,
+    ...) to the values a fresh bs.traf.cre gives it; validate_surrogate checks this.
+    """
+
+    def __init__(self, reuse_aircraft=False):
+        global bs, Route
+        import bluesky as bs
+        import bluesky.tools.aero
+        from bluesky.traffic.route import Route
+        from bluesky_gym.envs.common.screen_dummy import ScreenDummy
+
+        if bs.sim is None:
+            # initialize bluesky as non-networked simulation node
+            bs.init(mode='sim', detached=True)
+            # initialize dummy screen
+            bs.scr = ScreenDummy()
+        else:
+            # A second bs.init would keep the clock and timers of the running simulation
+            # (they are module state); start a new one at t = 0 instead
+            bs.sim.reset()
+        # set correct sim speed
+        bs.stack.stack('DT 1;FF')
+        self._count = 0
+        self._rows = None
+        self.reuse_aircraft = reuse_aircraft
+        # Row of a freshly created aircraft in every traffic array, see _reinitialize
+        self._template = None
+
+    def __getattr__(self, name):
+        # alt, vs, lat, lon, selalt, selvs, swvnav, ... are the bs.traf arrays themselves
+        return getattr(bs.traf, name)
+
+    @property
+    def simt(self):
+        return bs.sim.simt
+
+    def rows(self):
+        # Cached until the next create / delete_all
+        if self._rows is None:
+            self._rows = np.array([bs.traf.id2idx(f"KL{row + 1:03d}") for row in range(self._count)])
+        return self._rows
+
+    def create(self, alt, spd, idx=0, hdg=None):
+        idx = np.atleast_1d(idx)
+        alt = np.broadcast_to(alt, idx.shape)
+        hdg = np.broadcast_to(hdg, idx.shape) if hdg is not None else [None] * idx.size
+        for i, row in enumerate(idx):
+            acid = f"KL{row + 1:03d}"
+            if acid in bs.traf.id:
+                if self.reuse_aircraft:
+                    self._reinitialize(bs.traf.id2idx(acid), alt[i], spd, hdg[i])
+                    continue
+                # A finished aircraft is replaced by a new one with the same callsign
+                bs.traf.delete(bs.traf.id2idx(acid))
+            heading = {} if hdg[i] is None else {"achdg": hdg[i]}
+            bs.traf.cre(acid, actype="A320", acalt=alt[i], acspd=spd, **heading)
+            bs.traf.swvnav[bs.traf.id2idx(acid)] = False
+            if self.reuse_aircraft and self._template is None:
+                # Only mutable values (lists, routes, ...) need a copy for each reused row
+                self._template = [[(name, value, not isinstance(value, IMMUTABLE)) for name, value in row.items()]
+                                  for row in _row_state(bs.traf.id2idx(acid))]
+        self._count = max(self._count, int(idx.max()) + 1)
+        self._rows = None
+
+    def _reinitialize(self, i, alt, spd, hdg):
+        # A fresh bs.traf.cre written over an existing aircraft. Every traffic array first
+        # gets the row cre / create_children gave the first aircraft: the A320 data and the
+        # defaults, which do not depend on the initial state ...
+        traf = bs.traf
+        acid = traf.id[i]
+        for obj, values in zip(_traffic_arrays(traf), self._template):
+            for name, value, mutable in values:
+                getattr(obj, name)[i] = copy.deepcopy(value) if mutable else value
+        traf.id[i] = acid
+        traf.ap.route[i] = Route(acid)
+
+        # ... and then the values that do, computed as cre and the create of each child do
+        hdg = (bs.ref.hdg or 0.0) if hdg is None else hdg
+        tas, cas, mach = bs.tools.aero.vcasormach(spd, alt)
+        traf.lat[i], traf.lon[i], traf.alt[i] = START_LAT, START_LON, alt
+        traf.hdg[i] = traf.trk[i] = hdg
+        traf.tas[i], traf.cas[i], traf.M[i] = tas, cas, mach
+        traf.gs[i] = tas
+        traf.gsnorth[i] = tas * np.cos(np.radians(hdg))
+        traf.gseast[i] = tas * np.sin(np.radians(hdg))
+        traf.p[i], traf.rho[i], traf.Temp[i] = bs.tools.aero.vatmos(alt)
+        traf.selspd[i], traf.aptas[i], traf.selalt[i] = cas, tas, alt
+        traf.coslat[i] = np.cos(np.radians(START_LAT))
+        traf.ap.trk[i], traf.ap.tas[i], traf.ap.alt[i] = hdg, tas, alt
+        traf.aporasas.alt[i], traf.aporasas.tas[i] = alt, tas
+        traf.aporasas.hdg[i] = traf.aporasas.trk[i] = hdg
+        adsb = traf.adsb
+        adsb.lastupdate[i] = -adsb.trunctime * np.random.rand()
+        adsb.lat[i], adsb.lon[i], adsb.alt[i] = START_LAT, START_LON, alt
+        adsb.trk[i], adsb.tas[i], adsb.gs[i] = hdg, tas, tas
+        traf.trails.lastlat[i], traf.trails.lastlon[i] = START_LAT, START_LON
+        # The AREA plugin (loaded by BlueSky's default settings) keeps per-aircraft state too
+        area = getattr(sys.modules.get("bluesky.plugins.area"), "area", None)
+        if area is not None:
+            area.oldalt[i] = alt
+            area.create_time[i] = bs.sim.simt
+        # The simulation clock is not reset, as with delete + cre: it belongs to the whole
+        # simulation (bs.sim.reset would also delete every other aircraft), and a reused
+        # aircraft starts at the same simt and timer phase a newly created one would
+
+    def snapshot(self):
+        """
+        Copy of the whole traffic state (bs.traf and its child objects such as the
+        autopilot and performance model) and the simulation clock.
+        """
+        state = []
+        for obj in _traffic_arrays(bs.traf):
+            names = list(getattr(obj, "_ArrVars", [])) + list(getattr(obj, "_LstVars", []))
+            state.append({name: copy.deepcopy(getattr(obj, name)) for name in names})
+        return {"traffic": state, "ntraf": bs.traf.ntraf, "simt": bs.sim.simt, "count": self._count}
+
+    def restore(self, snapshot):
+        for obj, values in zip(_traffic_arrays(bs.traf), snapshot["traffic"]):
+            for name, value in values.items():
+                setattr(obj, name, copy.deepcopy(value))
+        bs.traf.ntraf = snapshot["ntraf"]
+        bs.sim.simt = snapshot["simt"]
+        self._count = snapshot["count"]
+        self._rows = None
+
+    def delete_all(self):
+        for acid in bs.traf.id:
+            idx = bs.traf.id2idx(acid)
+            bs.traf.delete(idx)
+        self._count = 0
+        self._rows = None
+
+    def step(self):
+        bs.sim.step()
+
+
+def _row_state(i):
+    # Values of aircraft i in every traffic array, one dict per object of _traffic_arrays
+    return [{name: copy.deepcopy(getattr(obj, name)[i])
+             for name in list(getattr(obj, "_ArrVars", [])) + list(getattr(obj, "_LstVars", []))}
+            for obj in _traffic_arrays(bs.traf)]
+
+
+def _same(a, b):
+    # NaN (e.g. the rotorcraft coefficients of a fixed-wing aircraft) equals NaN
+    try:
+        return bool(np.array_equal(a, b, equal_nan=True))
+    except TypeError:
+        return a == b
+
+
+def _fresh_state_mismatches(i, alt, spd, hdg):
+    """
+    Names of the traffic arrays in which aircraft i differs from a new aircraft created
+    with bs.traf.cre at the same moment with the same altitude, speed and heading
+    (except its callsign and route, which belong to the callsign).
+    """
+    bs.traf.cre("REF", actype="A320", acalt=alt, acspd=spd, achdg=hdg)
+    ref = bs.traf.id2idx("REF")
+    bs.traf.swvnav[ref] = False
+    mismatches = [f"{type(obj).__name__}.{name}"
+                  for obj, row, fresh in zip(_traffic_arrays(bs.traf), _row_state(i), _row_state(ref))
+                  for name in row if name not in ("id", "route") and not _same(row[name], fresh[name])]
+    bs.traf.delete(ref)
+    return mismatches
+
+
+def _traffic_arrays(obj):
+    # bs.traf and its children keep their per-aircraft state in the variables listed in
+    # _ArrVars / _LstVars (BlueSky's TrafficArrays)
+    yield obj
+    for child in getattr(obj, "_children", []):
+        yield from _traffic_arrays(child)
+
+
+def validate_surrogate(episodes=10, action_frequency=30, alt_tol=5.0, vs_tol=0.5, dist_tol=0.5, seed=0,
+                       reuse_aircraft=False):
+    """
+    Fly the same random action sequences with BlueSky and with SurrogateDynamics (same
+    start altitude and heading) and compare altitude [m], vertical speed [m/s] and
+    runway distance [km] after every tick. With reuse_aircraft the BlueSky aircraft is
+    re-initialized in place between episodes, and each reset is also compared with a
+    fresh bs.traf.cre in every traffic array.
+
+    Returns:
+        dict with the largest absolute error of each quantity, the traffic arrays in
+        which a reset differed from a fresh aircraft (reset_mismatches) and whether
+        everything is within tolerance.
+    """
+    from descent_env import ALT_MIN, ALT_MAX, AC_SPD, ACTION_2_MS, vertical_command
+
+    rng = np.random.default_rng(seed)
+    bluesky = BlueSkyDynamics(reuse_aircraft)
+    surrogate = SurrogateDynamics()
+    errors = {"altitude": 0.0, "vz": 0.0, "runway_distance": 0.0}
+    reset_mismatches = set()
+    for _ in range(episodes):
+        alt = int(rng.integers(ALT_MIN, ALT_MAX))
+        bluesky.create(alt, AC_SPD)
+        if reuse_aircraft:
+            reset_mismatches.update(_fresh_state_mismatches(0, alt, AC_SPD, float(bluesky.hdg[0])))
+        surrogate.create(alt, AC_SPD, hdg=float(bluesky.hdg[0]))
+        done = False
+        while not done:
+            selalt, selvs = vertical_command(rng.uniform(-1, 1) * ACTION_2_MS)
+            for sim in (bluesky, surrogate):
+                sim.selalt[0] = selalt
+                sim.selvs[0] = selvs
+            for _ in range(action_frequency):
+                bluesky.step()
+                surrogate.step()
+                dist = [kwikdist(START_LAT, START_LON, sim.lat[0], sim.lon[0]) * NM / 1000
+                        for sim in (bluesky, surrogate)]
+                errors["altitude"] = max(errors["altitude"], abs(bluesky.alt[0] - surrogate.alt[0]))
+                errors["vz"] = max(errors["vz"], abs(bluesky.vs[0] - surrogate.vs[0]))
+                errors["runway_distance"] = max(errors["runway_distance"], abs(dist[0] - dist[1]))
+                # The environment stops at the tick the episode ends
+                done = bluesky.alt[0] <= 0 or dist[0] >= 200
+                if done:
+                    break
+        if not reuse_aircraft:
+            bluesky.delete_all()
+    errors["reset_mismatches"] = sorted(reset_mismatches)
+    errors["ok"] = (errors["altitude"] <= alt_tol and errors["vz"] <= vs_tol
+                    and errors["runway_distance"] <= dist_tol and not reset_mismatches)
+    return errors
+
+
+if __name__ == "__main__":
+    print(validate_surrogate())
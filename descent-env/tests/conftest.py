@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The modules are imported by name from the project directory (from dynamics import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
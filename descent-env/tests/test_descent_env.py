@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pygame")
+
+from descent_env import DescentEnv
+
+
+def run_episodes(env, episodes=3, seed=0):
+    # DescentEnv.reset draws the start altitude from np.random
+    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
+    trajectory = []
+    for _ in range(episodes):
+        env.reset()
+        done = False
+        while not done:
+            obs, reward, done, _, _ = env.step(rng.uniform(-1, 1, 1))
+            trajectory.append((obs["altitude"][0], obs["vz"][0], obs["runway_distance"][0], reward))
+    return np.array(trajectory)
+
+
+@pytest.mark.parametrize("backend", ["surrogate", "bluesky"])
+def test_fast_reset_matches_fresh_reset(backend):
+    if backend == "bluesky":
+        pytest.importorskip("bluesky")
+    fresh = run_episodes(DescentEnv(backend=backend))
+    fast = run_episodes(DescentEnv(backend=backend, fast_reset=True))
+    np.testing.assert_array_equal(fast, fresh)
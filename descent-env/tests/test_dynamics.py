@@ -0,0 +1,19 @@
+import pytest
+
+from dynamics import validate_surrogate
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_surrogate_matches_bluesky(seed):
+    pytest.importorskip("bluesky")
+    errors = validate_surrogate(episodes=3, seed=seed)
+    assert errors["altitude"] == 0
+    assert errors["runway_distance"] == 0
+    assert errors["vz"] <= 1e-12
+
+
+def test_reused_aircraft_matches_new_aircraft():
+    pytest.importorskip("bluesky")
+    errors = validate_surrogate(episodes=3, seed=2, reuse_aircraft=True)
+    assert errors["reset_mismatches"] == []
+    assert errors["ok"]
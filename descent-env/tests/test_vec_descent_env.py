@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("pygame")
+
+from descent_env import AC_SPD, DescentEnv
+from vec_descent_env import VecDescentEnv
+
+
+def test_vec_env_matches_descent_env():
+    vec = VecDescentEnv(4)
+    vec.reset(seed=3)
+    envs = []
+    for i in range(4):
+        # Same start altitude and target as aircraft i, and (like reset) the default heading
+        env = DescentEnv(backend="surrogate")
+        env.reset()
+        env.sim.create(vec.sim.alt[i], AC_SPD)
+        env.target_alt = vec.target_alt[i]
+        envs.append(env)
+
+    rng = np.random.default_rng(0)
+    running = np.ones(4, dtype=bool)
+    while running.any():
+        actions = rng.uniform(-1, 1, 4)
+        obs, rewards, terminated, _, _ = vec.step(actions)
+        for i in np.flatnonzero(running):
+            single_obs, reward, done, _, _ = envs[i].step(actions[i:i + 1])
+            assert reward == pytest.approx(rewards[i], abs=1e-9)
+            assert done == terminated[i]
+            if done:
+                running[i] = False
+            else:
+                for key, value in single_obs.items():
+                    assert value[0] == pytest.approx(obs[key][i, 0], abs=1e-12)
@@ -0,0 +1,147 @@
+import numpy as np
+
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from descent_env import (ALT_MEAN, ALT_STD, VZ_MEAN, VZ_STD, RWY_DIS_MEAN, RWY_DIS_STD, ACTION_2_MS,
+                         ALT_DIF_REWARD_SCALE, CRASH_PENALTY, RWY_ALT_DIF_REWARD_SCALE, ALT_MIN, ALT_MAX,
+                         TARGET_ALT_DIF, AC_SPD, ACTION_FREQUENCY, DEFAULT_RWY_DIS, RWY_LAT, RWY_LON, NM2KM,
+                         BACKENDS)
+from dynamics import BlueSkyDynamics, SurrogateDynamics, kwikdist
+
+
+def descent_rewards(altitude, runway_distance, target_alt):
+    """
+    DescentEnv._get_reward for arrays of aircraft.
+
+    Returns:
+        (rewards, terminated, final_altitude) arrays.
+    """
+    flying = (runway_distance > 0) & (altitude > 0)
+    crashed = altitude <= 0
+    rewards = np.where(flying, np.abs(target_alt - altitude) * ALT_DIF_REWARD_SCALE,
+                       np.where(crashed, CRASH_PENALTY, altitude * RWY_ALT_DIF_REWARD_SCALE))
+    final_altitude = np.where(crashed, -100, altitude)
+    return rewards, ~flying, final_altitude
+
+
+class VecDescentEnv(VectorEnv):
+    """
+    num_envs descent episodes flown by num_envs aircraft in one simulation, with the
+    gymnasium VectorEnv API.
+
+    step(actions) receives an array of num_envs actions in [-1, 1] and sets all the
+    selected altitudes / vertical speeds at once before running the simulation ticks, so
+    one BlueSky (or surrogate) step advances every episode. Rewards and terminations are
+    those of DescentEnv, per aircraft. Finished aircraft are respawned in the same step
+    (AutoresetMode.SAME_STEP): the returned observation is already the new episode and
+    infos["total_reward"] / infos["final_altitude"] (masked by "_total_reward" /
+    "_final_altitude") describe the episode that ended.
+
+    Each step runs action_repeat simulation ticks. An aircraft that crashes or reaches the
+    runway during the interval is evaluated at that tick (as DescentEnv does), and the
+    step stops early once every aircraft has finished.
+
+    With fast_reset the BlueSky aircraft are respawned in place (see BlueSkyDynamics);
+    the surrogate always reuses its rows.
+
+    BlueSky is a process-wide singleton, so only one env with backend="bluesky" can
+    exist per process; the surrogate backend has no such limit.
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs, backend="surrogate", action_repeat=ACTION_FREQUENCY, fast_reset=False):
+        assert backend in BACKENDS
+        self.num_envs = num_envs
+        self.backend = backend
+        self.action_repeat = action_repeat
+        self.sim = BlueSkyDynamics(reuse_aircraft=fast_reset) if backend == "bluesky" else SurrogateDynamics(num_envs)
+
+        self.single_observation_space = spaces.Dict(
+            {
+                "altitude": spaces.Box(-np.inf, np.inf, shape=(1,), dtype=np.float64),
+                "vz": spaces.Box(-np.inf, np.inf, shape=(1,), dtype=np.float64),
+                "target_altitude": spaces.Box(-np.inf, np.inf, shape=(1,), dtype=np.float64),
+                "runway_distance": spaces.Box(-np.inf, np.inf, shape=(1,), dtype=np.float64)
+            }
+        )
+        self.single_action_space = spaces.Box(-1, 1, shape=(1,), dtype=np.float64)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+
+        self.target_alt = np.zeros(num_envs)
+        self.total_reward = np.zeros(num_envs)
+        self.episode_length = np.zeros(num_envs, dtype=np.int64)
+        self._truncations = np.zeros(num_envs, dtype=bool)
+        self._np_random = None
+
+    def _spawn(self, idx):
+        # Same initial conditions as DescentEnv.reset, drawn from the env's generator
+        rng = self._np_random
+        alt_init = rng.integers(ALT_MIN, ALT_MAX, idx.size)
+        self.target_alt[idx] = alt_init + rng.integers(-TARGET_ALT_DIF, TARGET_ALT_DIF, idx.size)
+        self.sim.create(alt_init, AC_SPD, idx=idx)
+        self.total_reward[idx] = 0
+        self.episode_length[idx] = 0
+
+    def _state(self):
+        rows = self.sim.rows()
+        altitude = self.sim.alt[rows]
+        vz = self.sim.vs[rows]
+        runway_distance = DEFAULT_RWY_DIS - kwikdist(RWY_LAT, RWY_LON, self.sim.lat[rows], self.sim.lon[rows]) * NM2KM
+        return altitude, vz, runway_distance
+
+    def _get_obs(self, altitude, vz, runway_distance):
+        return {
+            "altitude": ((altitude - ALT_MEAN) / ALT_STD)[:, None],
+            "vz": ((vz - VZ_MEAN) / VZ_STD)[:, None],
+            "target_altitude": ((self.target_alt - ALT_MEAN) / ALT_STD)[:, None],
+            "runway_distance": ((runway_distance - RWY_DIS_MEAN) / RWY_DIS_STD)[:, None],
+        }
+
+    def reset(self, *, seed=None, options=None):
+        if seed is not None or self._np_random is None:
+            self._np_random, _ = seeding.np_random(seed)
+        self._spawn(np.arange(self.num_envs))
+        return self._get_obs(*self._state()), {}
+
+    def step(self, actions):
+        vs = np.asarray(actions, dtype=np.float64).reshape(self.num_envs) * ACTION_2_MS
+        rows = self.sim.rows()
+        # Same commands as descent_env.vertical_command, for all aircraft at once
+        self.sim.selalt[rows] = np.where(vs >= 0, 1000000, 0)
+        self.sim.selvs[rows] = vs
+
+        # State of each aircraft at the tick it finished (crash or runway), or at the end
+        finished = np.zeros(self.num_envs, dtype=bool)
+        final_state = np.zeros((3, self.num_envs))
+        for _ in range(self.action_repeat):
+            self.sim.step()
+            state = np.array(self._state())
+            now = ~finished & ((state[0] <= 0) | (state[2] <= 0))
+            if now.any():
+                final_state[:, now] = state[:, now]
+                finished |= now
+                if finished.all():
+                    break
+        altitude, vz, runway_distance = np.where(finished, final_state, state)
+        rewards, terminated, final_altitude = descent_rewards(altitude, runway_distance, self.target_alt)
+        self.total_reward += rewards
+        self.episode_length += 1
+
+        infos = {}
+        done = np.flatnonzero(terminated)
+        if done.size:
+            infos["total_reward"] = np.where(terminated, self.total_reward, 0.0)
+            infos["_total_reward"] = terminated.copy()
+            infos["final_altitude"] = np.where(terminated, final_altitude, 0.0)
+            infos["_final_altitude"] = terminated.copy()
+            infos["episode_length"] = np.where(terminated, self.episode_length, 0)
+            infos["_episode_length"] = terminated.copy()
+            # Autoreset in the same step
+            self._spawn(done)
+            altitude, vz, runway_distance = self._state()
+        return self._get_obs(altitude, vz, runway_distance), rewards, terminated, self._truncations, infos
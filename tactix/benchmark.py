@@ -0,0 +1,103 @@
+import random
+import time
+from bitboard import Bitboard
+from movegen import generate_moves
+
+
+def position_suite(board_size=6, count=20, seed=0, min_plies=2, max_plies=10):
+    """
+    Conjunto fijo de posiciones para comparar versiones de la búsqueda.
+
+    Las posiciones salen de partidas aleatorias reproducibles (misma semilla,
+    mismas posiciones), cortadas entre min_plies y max_plies jugadas.
+
+    Returns:
+        Lista de Bitboard no vacíos.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        state = Bitboard(board_size)
+        for _ in range(rng.randint(min_plies, max_plies)):
+            actions = generate_moves(state)
+            if not actions:
+                break
+            state.apply(rng.choice(actions))
+        if not state.is_empty():
+            positions.append(Bitboard(board_size, state.mask))
+    return positions
+
+
+def measure_pruning(agent, positions, depth):
+    """
+    Ejecuta la búsqueda de raíz del agente sobre cada posición y suma contadores.
+
+    Parameters:
+        agent: MinimaxTacTixAgent (cualquier configuración de orden/tabla).
+        positions: Lista de Bitboard, por ejemplo position_suite().
+        depth: Profundidad fija de búsqueda.
+
+    Returns:
+        Diccionario con nodos, cortes, tasa de corte en primera jugada y tiempo.
+    """
+    totals = {"nodes": 0, "cutoffs": 0, "first_move_cutoffs": 0, "seconds": 0.0}
+    for position in positions:
+        state = Bitboard(position.size, position.mask)
+        agent.stats.reset()
+        if agent.tt is not None:
+            agent.tt.clear()
+        if agent.orderer is not None:
+            agent.orderer.clear()
+        start = time.perf_counter()
+        agent.search_root(state, depth, agent.get_valid_actions(state))
+        totals["seconds"] += time.perf_counter() - start
+        totals["nodes"] += agent.stats.nodes
+        totals["cutoffs"] += agent.stats.cutoffs
+        totals["first_move_cutoffs"] += agent.stats.first_move_cutoffs
+    cutoffs = totals["cutoffs"]
+    totals["first_move_cutoff_rate"] = totals["first_move_cutoffs"] / cutoffs if cutoffs else 0.0
+    return totals
+
+
+def measure_expectimax(agent, positions):
+    """
+    Juega act() del ExpectimaxTacTixAgent en cada posición y suma nodos y cortes
+    (para comparar la poda Star1/Star2 con la búsqueda sin poda).
+    """
+    totals = {"nodes": 0, "cutoffs": 0, "seconds": 0.0}
+    for position in positions:
+        if agent.cache is not None:
+            agent.cache.clear()
+        start = time.perf_counter()
+        agent.act({"board": position.to_array(), "current_player": 0})
+        totals["seconds"] += time.perf_counter() - start
+        totals["nodes"] += agent.stats.nodes
+        totals["cutoffs"] += agent.stats.cutoffs
+    return totals
+
+
+if __name__ == "__main__":
+    from tactix_env import TacTixEnv
+    from minimax_agent import MinimaxTacTixAgent
+    from expectimax_agent import ExpectimaxTacTixAgent
+
+    env = TacTixEnv(board_size=6)
+    suite = position_suite()
+    configs = {
+        "sin orden": None,
+        "length": ("length",),
+        "tt": ("tt",),
+        "killer+history": ("killer", "history"),
+        "todas": ("tt", "killer", "history", "length"),
+    }
+    for name, ordering in configs.items():
+        agent = MinimaxTacTixAgent(env, ordering=ordering)
+        result = measure_pruning(agent, suite, depth=4)
+        print(f"{name:16s} nodos={result['nodes']:8d} cortes={result['cutoffs']:7d} "
+              f"primera={result['first_move_cutoff_rate']:.2f} t={result['seconds']:.2f}s")
+
+    for pruning in (None, "star1", "star2"):
+        agent = ExpectimaxTacTixAgent(env, depth=4, pruning=pruning)
+        result = measure_expectimax(agent, suite)
+        print(f"expectimax {str(pruning):5s} nodos={result['nodes']:8d} cortes={result['cutoffs']:7d} "
+              f"t={result['seconds']:.2f}s")
@@ -0,0 +1,172 @@
+from functools import lru_cache
+import numpy as np
+
+
+class BoardTables:
+    """
+    Tablas precalculadas para un tamaño de tablero.
+
+    La celda (r, c) es el bit r*size + c de la máscara. Además de la máscara
+    por filas se mantiene una copia transpuesta (bit c*size + r) para poder
+    leer la ocupación de una columna con un shift, igual que una fila.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = size * size
+        self.full_line = (1 << size) - 1
+        self.full = (1 << self.cells) - 1
+
+        self.row_masks = [self.full_line << (r * size) for r in range(size)]
+        self.col_masks = [sum(1 << (r * size + c) for r in range(size)) for c in range(size)]
+
+        # segment_masks[is_row][idx][start][end] -> (máscara, máscara transpuesta)
+        self.segment_masks = [[[[None] * size for _ in range(size)] for _ in range(size)] for _ in range(2)]
+        for idx in range(size):
+            for start in range(size):
+                for end in range(start, size):
+                    line = ((1 << (end - start + 1)) - 1) << start
+                    along = line << (idx * size)
+                    across = 0
+                    for i in range(start, end + 1):
+                        across |= 1 << (i * size + idx)
+                    self.segment_masks[1][idx][start][end] = (along, across)
+                    self.segment_masks[0][idx][start][end] = (across, along)
+
+        # transpose_rows[r][occ]: aporte de la fila r con ocupación occ a la máscara transpuesta
+        self.transpose_rows = [
+            [sum(1 << (c * size + r) for c in range(size) if occ >> c & 1) for occ in range(1 << size)]
+            for r in range(size)
+        ]
+
+    def transpose(self, mask):
+        size, full_line, rows = self.size, self.full_line, self.transpose_rows
+        out = 0
+        for r in range(size):
+            out |= rows[r][(mask >> (r * size)) & full_line]
+        return out
+
+
+@lru_cache(maxsize=None)
+def get_tables(size):
+    return BoardTables(size)
+
+
+def popcount(mask):
+    return mask.bit_count()
+
+
+def mask_from_array(board):
+    flat = np.asarray(board, dtype=np.uint8).ravel() != 0
+    return int.from_bytes(np.packbits(flat, bitorder="little").tobytes(), "little")
+
+
+def mask_to_array(mask, size):
+    cells = size * size
+    raw = np.frombuffer(mask.to_bytes((cells + 7) // 8, "little"), dtype=np.uint8)
+    bits = np.unpackbits(raw, bitorder="little")[:cells]
+    return bits.reshape(size, size).astype(np.int32)
+
+
+class Bitboard:
+    """
+    Estado de TacTix como enteros: `mask` tiene un bit por posición
+    (fila mayor) y `tmask` es la misma ocupación por columnas.
+
+    apply/undo modifican el estado en lugar de copiarlo, así que la búsqueda
+    recorre el árbol con un único objeto.
+    """
+
+    __slots__ = ("size", "tables", "mask", "tmask", "_history")
+
+    def __init__(self, size=6, mask=None):
+        self.size = size
+        self.tables = get_tables(size)
+        self.mask = self.tables.full if mask is None else mask
+        self.tmask = self.tables.transpose(self.mask)
+        self._history = []
+
+    @classmethod
+    def from_array(cls, board):
+        board = np.asarray(board)
+        return cls(board.shape[0], mask_from_array(board))
+
+    def to_array(self):
+        return mask_to_array(self.mask, self.size)
+
+    def copy(self):
+        other = Bitboard.__new__(Bitboard)
+        other.size = self.size
+        other.tables = self.tables
+        other.mask = self.mask
+        other.tmask = self.tmask
+        other._history = []
+        return other
+
+    def reset(self):
+        self.mask = self.tables.full
+        self.tmask = self.tables.full
+        self._history.clear()
+
+    def move_masks(self, action):
+        idx, start, end, is_row = action
+        return self.tables.segment_masks[1 if is_row else 0][idx][start][end]
+
+    def is_valid(self, action):
+        idx, start, end, is_row = action
+        if not (0 <= idx < self.size and 0 <= start <= end < self.size):
+            return False
+        along, _ = self.move_masks(action)
+        return self.mask & along == along
+
+    def apply(self, action):
+        # No valida la jugada: la búsqueda solo aplica jugadas generadas sobre este estado
+        along, across = self.move_masks(action)
+        self.mask ^= along
+        self.tmask ^= across
+        self._history.append((along, across))
+
+    def undo(self):
+        along, across = self._history.pop()
+        self.mask |= along
+        self.tmask |= across
+
+    def is_empty(self):
+        return self.mask == 0
+
+    def count(self):
+        return self.mask.bit_count()
+
+    def row(self, idx):
+        return (self.mask >> (idx * self.size)) & self.tables.full_line
+
+    def col(self, idx):
+        return (self.tmask >> (idx * self.size)) & self.tables.full_line
+
+    def line(self, idx, is_row):
+        return self.row(idx) if is_row else self.col(idx)
+
+    def __eq__(self, other):
+        return isinstance(other, Bitboard) and self.size == other.size and self.mask == other.mask
+
+    def __hash__(self):
+        return hash((self.size, self.mask))
+
+    def __repr__(self):
+        return f"Bitboard(size={self.size}, mask={self.mask:#x})"
+
+
+def line_runs(occ, size):
+    # Segmentos maximales (start, end) de una línea con ocupación occ
+    runs = []
+    start = None
+    for i in range(size):
+        if occ >> i & 1:
+            if start is None:
+                start = i
+        elif start is not None:
+            runs.append((start, i - 1))
+            start = None
+    if start is not None:
+        runs.append((start, size - 1))
+    return runs
@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+import heuristics
+
+
+class Evaluator(ABC):
+    """
+    Evaluación de hojas para los agentes de búsqueda.
+
+    evaluate(state, maximizing_player) devuelve el valor desde el punto de vista
+    del maximizador; evaluate_masks hace lo mismo para un array de máscaras
+    (todos los hijos hoja de un nodo) de una vez. batched indica si conviene
+    evaluar así por defecto (batch_leaves=None en los agentes).
+    """
+
+    batched = False
+
+    @abstractmethod
+    def evaluate(self, state, maximizing_player):
+        raise NotImplementedError
+
+    @abstractmethod
+    def evaluate_masks(self, masks, size, maximizing_player):
+        raise NotImplementedError
+
+    @abstractmethod
+    def bounds(self, size):
+        # (mínimo, máximo) de los valores que puede devolver (para la poda Star1/Star2)
+        raise NotImplementedError
+
+
+class HeuristicEvaluator(Evaluator):
+    """h = h1 + h2_weight * h2 con puntajes de segmento `weights` (ver heuristics)."""
+
+    def __init__(self, weights=heuristics.SEGMENT_WEIGHTS, h2_weight=heuristics.H2_WEIGHT):
+        self.weights = tuple(weights)
+        self.h2_weight = h2_weight
+
+    def evaluate(self, state, maximizing_player):
+        # heuristics.h en línea: es la llamada más frecuente de la búsqueda
+        if isinstance(state, heuristics.ScoredBitboard) and state.heuristic_tables.weights == self.weights:
+            score = state.score
+        else:
+            score = heuristics.segment_total(state, self.weights)
+        if state.count() % 2 == 1:
+            return 1 + self.h2_weight * score
+        return -1 - self.h2_weight * score
+
+    def evaluate_masks(self, masks, size, maximizing_player):
+        return heuristics.evaluate_batch(masks, size, self.weights, self.h2_weight)[2].tolist()
+
+    def bounds(self, size):
+        return heuristics.h_bounds(size, self.weights, self.h2_weight)
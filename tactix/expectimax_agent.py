@@ -1,123 +1,337 @@
 from agent import Agent
 import numpy as np
+import heuristics
+from bitboard import Bitboard
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from symmetry import canonicalize
+from nim_solver import EndgameSolver, WIN_SCORE
+from solve_db import SolveDatabase
+from evaluation import HeuristicEvaluator
+from opponent_models import UniformOpponentModel
+from search_stats import SearchStats
 
 class ExpectimaxTacTixAgent(Agent):
-    def __init__(self, env, depth=4):
+    def __init__(self, env, depth=4, all_moves=False, cache_size_bits=16, use_symmetry=True,
+                 endgame_threshold=None, opening_book=None, batch_leaves=None, evaluator=None,
+                 opponent_model=None, prob_epsilon=0.0, pruning=None, log_path=None):
         self.env = env
         self.depth = depth
+        self.all_moves = all_moves  # True: también considera sub-segmentos, no solo segmentos maximales
+        # Caché de valores por posición (canónica, ver _canonical); None la desactiva
+        self.cache = TranspositionTable(cache_size_bits) if cache_size_bits else None
+        self.use_symmetry = use_symmetry
+        # Con endgame_threshold piezas o menos se juega con el solver exacto. None (por defecto)
+        # lo desactiva: con 12 piezas cuesta más que la búsqueda que reemplaza, sobre todo en misère
+        self.endgame_threshold = endgame_threshold
+        self.solver = EndgameSolver(env.board_size, env.misere) if endgame_threshold else None
+        # Base de datos resuelta o libro de aperturas (SolveDatabase o ruta al archivo)
+        if isinstance(opening_book, str):
+            opening_book = SolveDatabase(opening_book)
+        if opening_book is not None and opening_book.misere != env.misere:
+            # Los valores exactos de una base con otras reglas serían incorrectos
+            raise ValueError("La base de datos / libro de aperturas es de otra variante (misère) que el entorno.")
+        self.opening_book = opening_book
+        # Evaluación de hojas (por defecto h()); ver evaluation.Evaluator
+        self.evaluator = evaluator if evaluator is not None else HeuristicEvaluator()
+        # Evaluar todos los hijos hoja de un nodo en un lote (solo hasta 8x8); None: lo decide el evaluador
+        self.batch_leaves = self.evaluator.batched if batch_leaves is None else batch_leaves
+        # Modelo del rival en los nodos de azar; las ramas con probabilidad menor a
+        # prob_epsilon se descartan y el resto se renormaliza
+        self.opponent_model = opponent_model if opponent_model is not None else UniformOpponentModel()
+        self.prob_epsilon = prob_epsilon
+        # La caché usa la forma canónica solo si el modelo del rival no distingue simetrías
+        # (TrainerLikeOpponentModel y LearnedOpponentModel miran filas vs columnas)
+        self._canonical = use_symmetry and self.opponent_model.invariant
+        # Poda *-minimax de Ballard: None (sin poda), "star1" o "star2" (Star1 con sondeo).
+        # Poda según qué tan ajustadas sean las cotas: en los subárboles que llegan al solver
+        # son ±WIN_SCORE y en la práctica no corta nada
+        if pruning not in (None, "star1", "star2"):
+            raise ValueError(f"Poda desconocida: {pruning}")
+        self.pruning = pruning
+        # Cotas de los valores de la búsqueda: las del evaluador, y ±WIN_SCORE solo en los
+        # subárboles que llegan al solver (ver _bounds)
+        self.lower, self.upper = self.evaluator.bounds(env.board_size)
+        self.solved_bounds = (min(self.lower, -WIN_SCORE), max(self.upper, WIN_SCORE))
+        # Contadores por jugada; con log_path se registra cada jugada en JSON lines
+        self.stats = SearchStats(log_path)
 
-    def get_valid_actions(self, board):
-        actions = []
-        size = board.shape[0]
-        for is_row in [0, 1]:
-            for idx in range(size):
-                line = board[idx, :] if is_row else board[:, idx]
-                start = None
-                for i in range(size):
-                    if line[i] == 1:
-                        if start is None:
-                            start = i
-                    elif start is not None:
-                        actions.append([idx, start, i-1, is_row])
-                        start = None
-                if start is not None:
-                    actions.append([idx, start, size-1, is_row])
-        return actions
-
-    def simulate_action(self, board, action):
-        # Simula el resultado de aplicar una acción sobre una copia del tablero
-        idx, start, end, is_row = action
-        new_board = board.copy()
-        if is_row:
-            new_board[idx, start:end+1] = 0
-        else:
-            new_board[start:end+1, idx] = 0
-        return new_board
+    def get_valid_actions(self, state):
+        return self.stats.generate_moves(state, maximal=not self.all_moves)
 
-    def pol_prob(self, board, action):
-        valid_actions = self.get_valid_actions(board)
-        return 1 / len(valid_actions) if action in valid_actions else 0 # probabilidad uniforme de elegir una acción válida
-    
-    def h1(self, board):
-        # Heurística simple: paridad de piezas restantes
-        remaining = np.count_nonzero(board)
-        return 1 if remaining % 2 == 1 else -1
-
-    def h2(self, board):
-        # Heurística de segmentos ponderados: evalúa la calidad de los segmentos disponibles
-        score = 0
-        size = board.shape[0]
-        
-        # Evaluar filas y columnas
-        for is_row in [0, 1]:
-            for idx in range(size):
-                line = board[idx, :] if is_row else board[:, idx]
-                # Encontrar segmentos consecutivos
-                segments = []
-                start = None
-                for i in range(size):
-                    if line[i] == 1:
-                        if start is None:
-                            start = i
-                    elif start is not None:
-                        segments.append(i - start)  # longitud del segmento
-                        start = None
-                if start is not None:
-                    segments.append(size - start)
-                
-                # Asignar puntuación basada en el tamaño de los segmentos
-                for seg_len in segments:
-                    if seg_len == 1:
-                        score += 1    # Segmentos pequeños son menos valiosos
-                    elif seg_len == 2:
-                        score += 3    # Segmentos medianos
-                    elif seg_len == 3:
-                        score += 5    # Segmentos grandes
-                    else:
-                        score += 7    # Segmentos muy grandes son muy valiosos
-        
-        # Aplicar paridad como factor de corrección
-        remaining = np.count_nonzero(board)
-        parity_factor = 1 if remaining % 2 == 1 else -1 # para quien va
-        
-        return score * parity_factor
+    def pol_prob(self, state, action):
+        valid_actions = self.get_valid_actions(state)
+        if action not in valid_actions:
+            return 0
+        return self.opponent_model.probabilities(state, valid_actions)[valid_actions.index(action)]
+
+    def chance_distribution(self, state, actions):
+        # Probabilidades de todos los hijos de un nodo de azar en una sola pasada
+        probs = self.opponent_model.probabilities(state, actions)
+        if self.prob_epsilon <= 0:
+            return list(zip(actions, probs))
+        kept = [(action, p) for action, p in zip(actions, probs) if p >= self.prob_epsilon]
+        if not kept:
+            best = max(range(len(probs)), key=probs.__getitem__)
+            return [(actions[best], 1.0)]
+        total = sum(p for _, p in kept)
+        return [(action, p / total) for action, p in kept]
     
-    def h(self, board):
-        return self.h1(board) + 2 * self.h2(board) # ponderación de heurísticas, es más importante la segunda
+    def h1(self, state):
+        return heuristics.h1(state)
+
+    def h2(self, state):
+        return heuristics.h2(state)
+
+    def h(self, state):
+        return heuristics.h(state)
 
-    def expectimax(self, board, depth, maximizing_player):
-        if depth == 0 or np.count_nonzero(board) == 0:
-            return self.h(board)
+    def _bounds(self, count, depth):
+        # Cotas del valor de un nodo con count piezas a depth niveles de las hojas. Cada jugada
+        # quita a lo sumo board_size piezas: si ni así se llega al umbral, ningún valor del
+        # subárbol es del solver y alcanzan las cotas (ajustadas) del evaluador
+        if self.solver is not None and count - depth * self.env.board_size <= self.endgame_threshold:
+            return self.solved_bounds
+        return self.lower, self.upper
+
+    def _evaluate_leaves(self, state, actions, maximizing_player):
+        # Evalúa en un solo lote todos los hijos hoja de un nodo (maximizing_player es el de los hijos)
+        masks = [state.mask ^ state.move_masks(action)[0] for action in actions]
+        self.stats.leaves += len(masks)
+        values = self.evaluator.evaluate_masks(np.array(masks, dtype=np.uint64), state.size, maximizing_player)
+        if self.solver is not None:
+            for i, mask in enumerate(masks):
+                if mask.bit_count() <= self.endgame_threshold:
+                    values[i] = self.solver.value(Bitboard(state.size, mask), maximizing_player)
+        return values
+
+
+    def expectimax(self, state, depth, maximizing_player):
+        stats = self.stats
+        stats.nodes += 1
+        if self.solver is not None and state.count() <= self.endgame_threshold:
+            stats.leaves += 1
+            return self.solver.value(state, maximizing_player)
+        if depth == 0 or state.is_empty():
+            stats.leaves += 1
+            return self.evaluator.evaluate(state, maximizing_player)
         
-        valid_actions = self.get_valid_actions(board)
+        cache = self.cache
+        if cache is not None:
+            canon = canonicalize(state.mask, state.size)[0] if self._canonical else state.mask
+            key = (canon << 1) | maximizing_player
+            entry = cache.probe(key)
+            if entry is not None and entry[0] >= depth:
+                return entry[1]
+
+        valid_actions = self.get_valid_actions(state)
         if not valid_actions:
             return 0
 
-        if maximizing_player: # jugador maximizador
+        if depth == 1 and self.batch_leaves and state.size <= 8:
+            if maximizing_player:
+                value = max(self._evaluate_leaves(state, valid_actions, False))
+            else:
+                distribution = self.chance_distribution(state, valid_actions)
+                values = self._evaluate_leaves(state, [action for action, _ in distribution], True)
+                value = sum(p * val for (_, p), val in zip(distribution, values))
+        elif maximizing_player: # jugador maximizador
             values = []
             for action in valid_actions:
-                new_board = self.simulate_action(board, action)
-                val = self.expectimax(new_board, depth - 1, False)
+                state.apply(action)
+                val = self.expectimax(state, depth - 1, False)
+                state.undo()
                 values.append(val)
-            return max(values)
+            value = max(values)
         else: # jugador minimizador (expectativa)
             expected_value = 0
-            for action in valid_actions:
-                new_board = self.simulate_action(board, action)
-                prob = self.pol_prob(board, action)
-                val = self.expectimax(new_board, depth-1, True)
+            for action, prob in self.chance_distribution(state, valid_actions):
+                state.apply(action)
+                val = self.expectimax(state, depth-1, True)
+                state.undo()
                 expected_value += prob * val
-            return expected_value
+            value = expected_value
+
+        if cache is not None:
+            cache.store(key, depth, value, EXACT)
+        return value
+
+    def star_search(self, state, depth, maximizing_player, alpha, beta):
+        """
+        Expectimax con poda *-minimax (Ballard). Fail-soft: un valor <= alpha es
+        cota superior, uno >= beta cota inferior y en el medio es exacto, así
+        que con ventana (lower, upper) devuelve lo mismo que expectimax().
+        """
+        stats = self.stats
+        stats.nodes += 1
+        if self.solver is not None and state.count() <= self.endgame_threshold:
+            stats.leaves += 1
+            return self.solver.value(state, maximizing_player)
+        if depth == 0 or state.is_empty():
+            stats.leaves += 1
+            return self.evaluator.evaluate(state, maximizing_player)
+        # Si la ventana cae fuera de las cotas del nodo, una de ellas ya es el resultado
+        lower, upper = self._bounds(state.count(), depth)
+        if alpha >= upper:
+            return upper
+        if beta <= lower:
+            return lower
+
+        cache = self.cache
+        if cache is not None:
+            canon = canonicalize(state.mask, state.size)[0] if self._canonical else state.mask
+            key = (canon << 1) | maximizing_player
+            entry = cache.probe(key)
+            if entry is not None and entry[0] >= depth:
+                value, flag = entry[1], entry[2]
+                if flag == EXACT:
+                    return value
+                # Una cota guardada con otra ventana igual sirve para estrecharla
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        valid_actions = self.get_valid_actions(state)
+        if not valid_actions:
+            return 0
+
+        if depth == 1 and self.batch_leaves and state.size <= 8:
+            if maximizing_player:
+                value = max(self._evaluate_leaves(state, valid_actions, False))
+            else:
+                distribution = self.chance_distribution(state, valid_actions)
+                values = self._evaluate_leaves(state, [action for action, _ in distribution], True)
+                value = sum(p * val for (_, p), val in zip(distribution, values))
+        elif maximizing_player:
+            value = float('-inf')
+            for action in valid_actions:
+                state.apply(action)
+                val = self.star_search(state, depth - 1, False, max(alpha, value), beta)
+                state.undo()
+                if val > value:
+                    value = val
+                    if value >= beta:
+                        self.stats.cutoffs += 1
+                        break
+        else:
+            value = self._chance_node(state, depth, alpha, beta, valid_actions)
+
+        if cache is not None:
+            flag = UPPER if value <= alpha else LOWER if value >= beta else EXACT
+            cache.store(key, depth, value, flag)
+        return value
+
+    def _chance_node(self, state, depth, alpha, beta, valid_actions):
+        # Star1: la ventana de cada hijo sale de lo ya sumado y de las cotas de
+        # los que faltan (las de _bounds, o las cotas inferiores de Star2)
+        distribution = [(action, p) for action, p in self.chance_distribution(state, valid_actions) if p > 0]
+        # Cotas de cada hijo; la jugada (idx, start, end, is_row) quita end - start + 1 piezas
+        count = state.count()
+        bounds = [self._bounds(count - (action[2] - action[1] + 1), depth - 1) for action, _ in distribution]
+        probes = None
+        if self.pruning == "star2" and depth >= 2:
+            probes = self._probe_children(state, depth, beta, distribution, bounds)
+            if not isinstance(probes, list):
+                self.stats.cutoffs += 1
+                return probes
+
+        accumulated = 0  # suma de p * valor de los hijos ya buscados
+        # Sumas de p * cota de los que faltan
+        pending_lower = sum(p * lb for (_, p), lb in zip(distribution, probes or (lb for lb, _ in bounds)))
+        pending_upper = sum(p * ub for (_, p), (_, ub) in zip(distribution, bounds))
+        for i, (action, p) in enumerate(distribution):
+            lower, upper = bounds[i]
+            pending_lower -= p * (probes[i] if probes else lower)
+            pending_upper -= p * upper
+            child_alpha = (alpha - accumulated - pending_upper) / p
+            child_beta = (beta - accumulated - pending_lower) / p
+            state.apply(action)
+            val = self.star_search(state, depth - 1, True, max(child_alpha, lower), min(child_beta, upper))
+            state.undo()
+            if val <= child_alpha:
+                self.stats.cutoffs += 1
+                return min(accumulated + p * val + pending_upper, alpha)
+            if val >= child_beta:
+                self.stats.cutoffs += 1
+                return max(accumulated + p * val + pending_lower, beta)
+            accumulated += p * val
+        return accumulated
+
+    def _probe_children(self, state, depth, beta, distribution, bounds):
+        """
+        Fase de sondeo de Star2: cota inferior de cada hijo (nodo max) buscando
+        solo su primera jugada. Devuelve la lista de cotas, o un valor >= beta
+        si ya alcanzan para cortar.
+        """
+        probes = []
+        known = 0  # suma de p * cota de los hijos ya sondeados
+        pending_lower = sum(p * lb for (_, p), (lb, _) in zip(distribution, bounds))
+        for (action, p), (lower, upper) in zip(distribution, bounds):
+            pending_lower -= p * lower
+            child_beta = (beta - known - pending_lower) / p
+            state.apply(action)
+            bound = self._probe(state, depth - 1, min(child_beta, upper))
+            state.undo()
+            probes.append(bound)
+            known += p * bound
+            if bound >= child_beta:
+                return max(known + pending_lower, beta)
+        return probes
+
+    def _probe(self, state, depth, beta):
+        # Cota inferior del valor de un nodo max: el valor de su primera jugada
+        if depth == 0 or state.is_empty() or (self.solver is not None and state.count() <= self.endgame_threshold):
+            return self.star_search(state, depth, True, *self._bounds(state.count(), depth))
+        valid_actions = self.get_valid_actions(state)
+        if not valid_actions:
+            return 0
+        state.apply(valid_actions[0])
+        # Con alpha = lower el resultado es exacto o cota inferior, nunca solo superior
+        lower, _ = self._bounds(state.count(), depth - 1)
+        value = self.star_search(state, depth - 1, False, lower, beta)
+        state.undo()
+        return value
+
+    def search_move(self, state, action, depth, alpha=float('-inf')):
+        """
+        Valor de una sola jugada de raíz, para repartir la raíz entre procesos.
+        Sin poda alpha no se usa; con poda un valor <= alpha es cota superior.
+        """
+        state.apply(action)
+        if self.pruning is None:
+            value = self.expectimax(state, depth - 1, False)
+        else:
+            lower, upper = self._bounds(state.count(), depth - 1)
+            value = self.star_search(state, depth - 1, False, max(alpha, lower), upper)
+        state.undo()
+        return value
 
     def act(self, observation):
-        board = observation["board"]
-        valid_actions = self.get_valid_actions(board)
+        self.stats.begin_move(self.cache)
+        action = self._act(observation)
+        self.stats.end_move(action)
+        return action
+
+    def _act(self, observation):
+        # Estado con h2/paridad incrementales: h() en O(1) en las hojas
+        state = heuristics.ScoredBitboard.from_array(observation["board"])
+        if self.opening_book is not None:
+            book_move = self.opening_book.best_move(state)
+            if book_move is not None:
+                return book_move
+        if self.cache is not None:
+            self.cache.new_search()
+        if self.solver is not None and 0 < state.count() <= self.endgame_threshold:
+            return self.solver.best_move(state)
+        valid_actions = self.get_valid_actions(state)
         best_action = None
         best_value = float('-inf')
         for action in valid_actions:
-            new_board = self.simulate_action(board, action)
-            value = self.expectimax(new_board, self.depth - 1, False)
+            value = self.search_move(state, action, self.depth, best_value)
             if value > best_value:
                 best_value = value
                 best_action = action
+        self.stats.complete_depth(self.depth)
         return best_action
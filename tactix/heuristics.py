@@ -0,0 +1,193 @@
+from functools import lru_cache
+import numpy as np
+from bitboard import Bitboard, get_tables, line_runs
+
+# Puntaje por segmento según su longitud: 1, 2, 3 y 4 o más piezas
+SEGMENT_WEIGHTS = (1, 3, 5, 7)
+# h = h1 + H2_WEIGHT * h2, es más importante la segunda
+H2_WEIGHT = 2
+
+
+def segment_score(length, weights=SEGMENT_WEIGHTS):
+    return weights[min(length, len(weights)) - 1]
+
+
+class HeuristicTables:
+    """
+    Tablas de h2 por línea: line_scores[occ] es la suma de los puntajes de los
+    segmentos de una fila o columna con ocupación occ.
+    """
+
+    def __init__(self, size, weights=SEGMENT_WEIGHTS):
+        self.size = size
+        self.weights = tuple(weights)
+        self.full_line = (1 << size) - 1
+        self.line_scores = [sum(segment_score(end - start + 1, self.weights) for start, end in line_runs(occ, size))
+                            for occ in range(1 << size)]
+        # Versiones numpy para la evaluación por lotes
+        integral = all(float(w).is_integer() for w in self.weights)
+        self.line_scores_np = np.array(self.line_scores, dtype=np.int64 if integral else np.float64)
+        self.line_weights_np = (1 << np.arange(size)).astype(np.int64)
+        self.transpose_rows_np = np.array(get_tables(size).transpose_rows, dtype=np.uint64)
+        self.max_line_score = max(self.line_scores)
+
+
+@lru_cache(maxsize=None)
+def get_heuristic_tables(size, weights=SEGMENT_WEIGHTS):
+    return HeuristicTables(size, tuple(weights))
+
+
+class ScoredBitboard(Bitboard):
+    """
+    Bitboard que mantiene incrementalmente la suma de puntajes de segmentos
+    (la parte de h2 sin paridad) y la cantidad de piezas (paridad de h1).
+
+    Una jugada solo cambia su propia línea y las líneas que cruza, así que
+    apply/undo recalculan esas líneas y h() queda en O(1).
+    """
+
+    __slots__ = ("heuristic_tables", "score", "stones", "_deltas")
+
+    def __init__(self, size=6, mask=None, weights=SEGMENT_WEIGHTS):
+        super().__init__(size, mask)
+        self.heuristic_tables = get_heuristic_tables(size, tuple(weights))
+        self.score = _scan_segments(self, self.heuristic_tables)
+        self.stones = self.mask.bit_count()
+        self._deltas = []
+
+    def copy(self):
+        other = ScoredBitboard.__new__(ScoredBitboard)
+        other.size = self.size
+        other.tables = self.tables
+        other.mask = self.mask
+        other.tmask = self.tmask
+        other._history = []
+        other.heuristic_tables = self.heuristic_tables
+        other.score = self.score
+        other.stones = self.stones
+        other._deltas = []
+        return other
+
+    def reset(self):
+        super().reset()
+        self.score = _scan_segments(self, self.heuristic_tables)
+        self.stones = self.mask.bit_count()
+        self._deltas.clear()
+
+    def apply(self, action):
+        idx, start, end, is_row = action
+        size, full_line = self.size, self.tables.full_line
+        scores = self.heuristic_tables.line_scores
+        along, across = self.tables.segment_masks[1 if is_row else 0][idx][start][end]
+        mask, tmask = self.mask, self.tmask
+        along_mask, across_mask = (mask, tmask) if is_row else (tmask, mask)
+        # Línea de la jugada
+        old = (along_mask >> (idx * size)) & full_line
+        delta = scores[old ^ (((1 << (end - start + 1)) - 1) << start)] - scores[old]
+        # Líneas que cruza: pierden el bit idx
+        bit = 1 << idx
+        for shift in range(start * size, (end + 1) * size, size):
+            old = (across_mask >> shift) & full_line
+            delta += scores[old ^ bit] - scores[old]
+        self.mask = mask ^ along
+        self.tmask = tmask ^ across
+        self._history.append((along, across))
+        self.score += delta
+        self.stones -= end - start + 1
+        self._deltas.append(delta)
+
+    def undo(self):
+        along, across = self._history.pop()
+        self.mask |= along
+        self.tmask |= across
+        self.score -= self._deltas.pop()
+        self.stones += along.bit_count()
+
+    def count(self):
+        return self.stones
+
+
+def h1(state):
+    # Heurística simple: paridad de piezas restantes
+    return 1 if state.count() % 2 == 1 else -1
+
+
+def segment_total(state, weights=SEGMENT_WEIGHTS):
+    # Suma de puntajes de segmentos de todas las filas y columnas (sin paridad)
+    if isinstance(state, ScoredBitboard) and state.heuristic_tables.weights == tuple(weights):
+        return state.score
+    return _scan_segments(state, get_heuristic_tables(state.size, tuple(weights)))
+
+
+def _scan_segments(state, tables):
+    scores, size, full_line = tables.line_scores, state.size, tables.full_line
+    mask, tmask = state.mask, state.tmask
+    score = 0
+    for idx in range(size):
+        shift = idx * size
+        score += scores[(mask >> shift) & full_line] + scores[(tmask >> shift) & full_line]
+    return score
+
+
+def h2(state, weights=SEGMENT_WEIGHTS):
+    # Heurística de segmentos ponderados, con la paridad como factor de corrección (para quien va)
+    parity_factor = 1 if state.count() % 2 == 1 else -1
+    return segment_total(state, weights) * parity_factor
+
+
+def h(state, weights=SEGMENT_WEIGHTS, h2_weight=H2_WEIGHT):
+    score = segment_total(state, weights)
+    if state.count() % 2 == 1:
+        return 1 + h2_weight * score
+    return -1 - h2_weight * score
+
+
+def h_bounds(size, weights=SEGMENT_WEIGHTS, h2_weight=H2_WEIGHT):
+    # Cotas (mínimo, máximo) de h() en un tablero de size x size
+    top = 1 + h2_weight * 2 * size * get_heuristic_tables(size, tuple(weights)).max_line_score
+    return -top, top
+
+
+def _as_masks(boards, size):
+    boards = np.asarray(boards)
+    if boards.ndim == 3:
+        return None, boards
+    return boards.astype(np.uint64), None
+
+
+def evaluate_batch(boards, size=None, weights=SEGMENT_WEIGHTS, h2_weight=H2_WEIGHT):
+    """
+    Evalúa h1, h2 y h sobre muchos tableros en una pasada vectorizada.
+
+    Parameters:
+        boards: Array N x size x size de 0/1, o array de N máscaras (uint64,
+            tableros de hasta 8x8) en el formato de Bitboard.mask.
+        size: Tamaño del tablero; obligatorio si se pasan máscaras.
+        weights: Puntajes por longitud de segmento (ver SEGMENT_WEIGHTS).
+        h2_weight: Peso de h2 en h.
+
+    Returns:
+        (h1, h2, h) como arrays de N elementos.
+    """
+    masks, arrays = _as_masks(boards, size)
+    if arrays is not None:
+        size = arrays.shape[1]
+        tables = get_heuristic_tables(size, tuple(weights))
+        cells = arrays.astype(np.int64)
+        rows = cells @ tables.line_weights_np
+        cols = cells.transpose(0, 2, 1) @ tables.line_weights_np
+        counts = cells.sum(axis=(1, 2))
+    else:
+        if size is None:
+            raise ValueError("size es obligatorio al evaluar máscaras.")
+        tables = get_heuristic_tables(size, tuple(weights))
+        full_line = np.uint64(tables.full_line)
+        shifts = np.arange(size, dtype=np.uint64) * np.uint64(size)
+        rows = (masks[:, None] >> shifts) & full_line
+        tmasks = np.bitwise_or.reduce(tables.transpose_rows_np[np.arange(size), rows], axis=1)
+        cols = (tmasks[:, None] >> shifts) & full_line
+        counts = np.bitwise_count(masks)
+    score = tables.line_scores_np[rows].sum(axis=1) + tables.line_scores_np[cols].sum(axis=1)
+    parity = np.where(counts % 2 == 1, 1, -1)
+    batch_h2 = score * parity
+    return parity, batch_h2, parity + h2_weight * batch_h2
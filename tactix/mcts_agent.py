@@ -0,0 +1,366 @@
+import math
+import random
+import time
+from functools import lru_cache
+import numpy as np
+from agent import Agent
+from bitboard import Bitboard, get_tables, line_runs
+from movegen import generate_moves
+from nim_solver import EndgameSolver
+from search_stats import SearchStats
+from minimax_agent import SearchTimeout
+
+
+class RolloutTables:
+    """
+    Tablas por ocupación de línea para simular partidas sobre máscaras:
+
+    run_count[occ] / run_bits[occ][k]: cantidad de segmentos maximales de la
+        línea y la máscara local (bits de la línea) del k-ésimo.
+    spread[bits]: bits de una columna 0 con esas filas ocupadas (la máscara
+        local de una columna llevada al tablero; se desplaza idx para la columna idx).
+    nim_value[occ]: XOR de las longitudes de los segmentos de la fila (el
+        nim-sum por filas de TrainerAgent).
+    nim_move[occ][target]: sub-segmento local que deja la fila en nim_value
+        target, o 0 si no hay.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.full_line = (1 << size) - 1
+        lines = 1 << size
+        runs = [line_runs(occ, size) for occ in range(lines)]
+        self.max_runs = max(1, max(len(r) for r in runs))
+        self.run_count = [len(r) for r in runs]
+        self.run_bits = [[((1 << (end - start + 1)) - 1) << start for start, end in r] for r in runs]
+        self.spread = [sum(1 << (r * size) for r in range(size) if occ >> r & 1) for occ in range(lines)]
+        self.nim_value = []
+        for r in runs:
+            value = 0
+            for start, end in r:
+                value ^= end - start + 1
+            self.nim_value.append(value)
+        nim_bound = 1 << size.bit_length()
+        self.nim_move = []
+        for occ in range(lines):
+            moves = [0] * nim_bound
+            for start, end in runs[occ]:
+                for s in range(start, end + 1):
+                    for e in range(s, end + 1):
+                        bits = ((1 << (e - s + 1)) - 1) << s
+                        target = self.nim_value[occ ^ bits]
+                        if not moves[target]:
+                            moves[target] = bits
+            self.nim_move.append(moves)
+
+        # Versiones numpy para las simulaciones por lotes
+        run_bits = np.zeros((lines, self.max_runs), dtype=np.uint64)
+        for occ, bits in enumerate(self.run_bits):
+            run_bits[occ, :len(bits)] = bits
+        self.run_bits_np = run_bits
+        self.run_count_np = np.array(self.run_count, dtype=np.int64)
+        self.spread_np = np.array(self.spread, dtype=np.uint64)
+        self.nim_value_np = np.array(self.nim_value, dtype=np.int64)
+        self.nim_move_np = np.array(self.nim_move, dtype=np.uint64)
+        self.transpose_rows_np = np.array(get_tables(size).transpose_rows, dtype=np.uint64)
+        self.shifts_np = np.arange(size, dtype=np.uint64) * np.uint64(size)
+
+
+@lru_cache(maxsize=None)
+def get_rollout_tables(size):
+    return RolloutTables(size)
+
+
+def nim_guided_move(mask, tables):
+    """
+    Jugada de fila que deja el nim-sum por filas en 0 (como la jugada "óptima"
+    de TrainerAgent), o None si ya es 0 o no hay una.
+    """
+    size, full_line = tables.size, tables.full_line
+    rows = [(mask >> (r * size)) & full_line for r in range(size)]
+    total = 0
+    for occ in rows:
+        total ^= tables.nim_value[occ]
+    if total == 0:
+        return None
+    for r, occ in enumerate(rows):
+        bits = tables.nim_move[occ][tables.nim_value[occ] ^ total]
+        if bits:
+            start = (bits & -bits).bit_length() - 1
+            return (r, start, bits.bit_length() - 1, 1)
+    return None
+
+
+def sample_maximal_runs(masks, tables, rng):
+    """
+    Elige para cada máscara un segmento maximal uniformemente entre todos los
+    de sus líneas (la distribución de RandomTacTixAgent), vectorizado.
+
+    Returns:
+        (rows, line, bits): ocupación de las filas (N x size), la línea elegida
+        (0..size-1 columnas, size..2*size-1 filas, como generate_moves) y la
+        máscara local del segmento dentro de esa línea.
+    """
+    size = tables.size
+    full_line = np.uint64(tables.full_line)
+    rows = (masks[:, None] >> tables.shifts_np) & full_line
+    tmasks = np.bitwise_or.reduce(tables.transpose_rows_np[np.arange(size), rows], axis=1)
+    cols = (tmasks[:, None] >> tables.shifts_np) & full_line
+    lines = np.concatenate([cols, rows], axis=1)
+    counts = tables.run_count_np[lines]
+    cumulative = counts.cumsum(axis=1)
+    pick = (rng.random(masks.size) * cumulative[:, -1]).astype(np.int64)
+    line = (cumulative > pick[:, None]).argmax(axis=1)
+    ar = np.arange(masks.size)
+    k = pick - cumulative[ar, line] + counts[ar, line]
+    bits = tables.run_bits_np[lines[ar, line], k]
+    return rows, line, bits
+
+
+class _Node:
+    __slots__ = ("mask", "action", "parent", "children", "untried", "visits", "wins")
+
+    def __init__(self, mask, action, parent, untried):
+        self.mask = mask
+        self.action = action
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0  # victorias del jugador que hizo `action`
+
+
+class MCTSTacTixAgent(Agent):
+    """
+    Monte Carlo Tree Search con UCT.
+
+    Cada iteración baja por el árbol eligiendo el hijo con mayor
+    wins/visits + exploration * sqrt(ln N / n), expande una jugada, simula la
+    partida hasta el final y propaga el resultado. Se juega la jugada más visitada.
+
+    Parameters:
+        env: TacTixEnv (se usan board_size y misere).
+        exploration: Constante de exploración de UCT.
+        playouts: Cantidad de simulaciones por jugada (None: solo tiempo).
+        time_limit: Segundos por jugada (None: solo playouts).
+        rollout_policy: "random" (segmentos maximales al azar, como
+            RandomTacTixAgent) o "nim" (con probabilidad `guidance` juega la
+            jugada de nim-sum 0 por filas, si no al azar).
+        guidance: Probabilidad de seguir la jugada de nim en la política "nim".
+        rollout_batch: Simulaciones por hoja; con más de 1 se corren juntas
+            vectorizadas con numpy (solo tableros de hasta 8x8).
+        reuse_tree: Conserva el subárbol de la posición siguiente entre jugadas.
+        all_moves: True: el árbol también considera sub-segmentos.
+        endgame_threshold: Con esa cantidad de piezas o menos juega con el
+            solver exacto (None, por defecto, lo desactiva: con 12 piezas
+            cuesta más que las simulaciones, sobre todo en misère). Con
+            time_limit el solver también se corta al vencer el plazo.
+        seed: Semilla de las simulaciones.
+        log_path: Archivo JSON lines donde registrar los contadores de cada
+            jugada (ver search_stats.SearchStats; nodes son los nodos
+            expandidos y leaves las simulaciones).
+    """
+
+    def __init__(self, env, exploration=1.4, playouts=2000, time_limit=None, rollout_policy="random",
+                 guidance=0.5, rollout_batch=1, reuse_tree=True, all_moves=False, endgame_threshold=None,
+                 seed=None, log_path=None):
+        if playouts is None and time_limit is None:
+            raise ValueError("Hace falta playouts o time_limit.")
+        if rollout_policy not in ("random", "nim"):
+            raise ValueError(f"Política de simulación desconocida: {rollout_policy}")
+        if rollout_batch > 1 and env.board_size > 8:
+            raise ValueError("Las simulaciones por lotes requieren tableros de hasta 8x8.")
+        self.env = env
+        self.exploration = exploration
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.rollout_policy = rollout_policy
+        self.guidance = guidance if rollout_policy == "nim" else 0.0
+        self.rollout_batch = rollout_batch
+        self.reuse_tree = reuse_tree
+        self.all_moves = all_moves
+        self.misere = env.misere
+        self.endgame_threshold = endgame_threshold
+        self.solver = EndgameSolver(env.board_size, env.misere, check=self._check_deadline) if endgame_threshold else None
+        self._deadline = None
+        self.tables = get_rollout_tables(env.board_size)
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        self._root = None
+        self.last_playouts = 0
+        self.stats = SearchStats(log_path)
+
+    def get_valid_actions(self, state):
+        return self.stats.generate_moves(state, maximal=not self.all_moves)
+
+    def _new_node(self, state, action=None, parent=None):
+        self.stats.nodes += 1
+        untried = list(self.get_valid_actions(state))
+        self.rng.shuffle(untried)
+        return _Node(state.mask, action, parent, untried)
+
+    def _find_root(self, mask):
+        # Reutiliza el subárbol si la posición es la actual o una respuesta ya expandida
+        root = self._root
+        if root is None:
+            return None
+        if root.mask == mask:
+            return root
+        for child in root.children:
+            if child.mask == mask:
+                child.parent = None
+                return child
+        return None
+
+    def act(self, observation):
+        self.stats.begin_move()
+        action = self._act(observation)
+        self.stats.end_move(action)
+        return action
+
+    def _check_deadline(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+
+    def _act(self, observation):
+        state = Bitboard.from_array(observation["board"])
+        deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        if self.solver is not None and 0 < state.count() <= self.endgame_threshold:
+            self._root = None
+            self._deadline = deadline
+            try:
+                return self.solver.best_move(state)
+            except SearchTimeout:
+                pass  # Sin tiempo para resolverla: se juegan las simulaciones que queden
+            finally:
+                self._deadline = None
+
+        root = self.search(state, deadline)
+        if not root.children:
+            return None
+        best = max(root.children, key=lambda child: child.visits)
+        if self.reuse_tree:
+            self._root = best
+        return best.action
+
+    def search(self, state, deadline=None):
+        """
+        Corre las simulaciones del presupuesto desde state y devuelve la raíz
+        del árbol (sus hijos tienen las visitas de cada jugada). deadline es el
+        instante (time.perf_counter) en que cortar; por defecto, time_limit
+        segundos desde ahora. Siempre corre al menos una simulación.
+        """
+        root = self._find_root(state.mask) if self.reuse_tree else None
+        if root is None:
+            root = self._new_node(state)
+        if not root.untried and not root.children:
+            return root
+
+        if deadline is None and self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        playouts = 0
+        while playouts == 0 or (self.playouts is None or playouts < self.playouts) and \
+                (deadline is None or time.perf_counter() < deadline):
+            playouts += self._iterate(root, state)
+        self.last_playouts = playouts
+        self.stats.leaves += playouts
+        return root
+
+    def _iterate(self, root, state):
+        # Selección
+        node = root
+        depth = 0
+        log = math.log
+        sqrt = math.sqrt
+        c = self.exploration
+        while not node.untried and node.children:
+            log_visits = log(node.visits)
+            best, best_score = None, -1.0
+            for child in node.children:
+                score = child.wins / child.visits + c * sqrt(log_visits / child.visits)
+                if score > best_score:
+                    best, best_score = child, score
+            node = best
+            state.apply(node.action)
+            depth += 1
+        # Expansión
+        if node.untried:
+            action = node.untried.pop()
+            state.apply(action)
+            depth += 1
+            child = self._new_node(state, action, node)
+            node.children.append(child)
+            node = child
+        # Simulación: victorias del jugador que mueve en la hoja
+        if self.rollout_batch > 1:
+            count = self.rollout_batch
+            wins = self.rollout_batched(state.mask, count)
+        else:
+            count = 1
+            wins = self.rollout(state.mask)
+        for _ in range(depth):
+            state.undo()
+        # Propagación: cada nodo cuenta las victorias de quien hizo su jugada
+        result = count - wins
+        while node is not None:
+            node.visits += count
+            node.wins += result
+            result = count - result
+            node = node.parent
+        return count
+
+    def _to_move_wins(self, plies):
+        # Con plies jugadas hasta vaciar el tablero, ¿gana el que movía al principio?
+        return (plies % 2 == 1) != self.misere
+
+    def rollout(self, mask):
+        """Simula una partida desde mask; 1 si gana el jugador que mueve, 0 si no."""
+        state = Bitboard(self.tables.size, mask)
+        rng, guidance, tables = self.rng, self.guidance, self.tables
+        plies = 0
+        while not state.is_empty():
+            action = None
+            if guidance and rng.random() < guidance:
+                action = nim_guided_move(state.mask, tables)
+            if action is None:
+                action = rng.choice(generate_moves(state))
+            state.apply(action)
+            plies += 1
+        return int(self._to_move_wins(plies))
+
+    def rollout_batched(self, mask, count):
+        """
+        Simula `count` partidas desde mask a la vez: en cada paso cada tablero
+        elige un segmento maximal uniformemente (o la jugada de nim) con numpy.
+
+        Returns:
+            Cantidad de partidas que gana el jugador que mueve.
+        """
+        t = self.tables
+        size = t.size
+        rng = self.np_rng
+        masks = np.full(count, mask, dtype=np.uint64)
+        plies = np.zeros(count, dtype=np.int64)
+        alive = np.flatnonzero(masks)
+        while alive.size:
+            m = masks[alive]
+            n = alive.size
+            rows, line, bits = sample_maximal_runs(m, t, rng)
+            ar = np.arange(n)
+            index = (line % size).astype(np.uint64)
+            removed = np.where(line >= size, bits << (index * np.uint64(size)), t.spread_np[bits] << index)
+
+            if self.guidance:
+                values = t.nim_value_np[rows]
+                total = np.bitwise_xor.reduce(values, axis=1)
+                candidates = t.nim_move_np[rows, values ^ total[:, None]]
+                has = candidates != 0
+                first = has.argmax(axis=1)
+                guided = (total != 0) & has[ar, first] & (rng.random(n) < self.guidance)
+                nim_removed = candidates[ar, first] << (first.astype(np.uint64) * np.uint64(size))
+                removed = np.where(guided, nim_removed, removed)
+
+            masks[alive] = m ^ removed
+            plies[alive] += 1
+            alive = alive[masks[alive] != 0]
+        return int(np.count_nonzero((plies % 2 == 1) != self.misere))
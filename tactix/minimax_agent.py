@@ -1,121 +1,353 @@
+import time
 from agent import Agent
 import numpy as np
+import heuristics
+from bitboard import Bitboard
+from transposition import TranspositionTable, EXACT, LOWER, UPPER
+from symmetry import canonicalize, to_canonical_move, from_canonical_move
+from move_ordering import MoveOrderer
+from search_stats import SearchStats
+from nim_solver import EndgameSolver
+from solve_db import SolveDatabase
+from evaluation import HeuristicEvaluator
+
+
+class SearchTimeout(Exception):
+    pass
+
 
 class MinimaxTacTixAgent(Agent):
-    def __init__(self, env, depth=4):
+    def __init__(self, env, depth=4, all_moves=False, tt_size_bits=16, use_symmetry=True,
+                 time_limit=None, node_limit=None, max_depth=None,
+                 ordering=("tt", "killer", "history", "length"), endgame_threshold=None,
+                 opening_book=None, batch_leaves=None, evaluator=None, log_path=None):
         self.env = env
         self.depth = depth
-        
-    def get_valid_actions(self, board):
-        actions = []
-        size = board.shape[0]
-        for is_row in [0, 1]:
-            for idx in range(size):
-                line = board[idx, :] if is_row else board[:, idx]
-                start = None
-                for i in range(size):
-                    if line[i] == 1:
-                        if start is None:
-                            start = i
-                    elif start is not None:
-                        actions.append([idx, start, i-1, is_row])
-                        start = None
-                if start is not None:
-                    actions.append([idx, start, size-1, is_row])
-        return actions
-    
-    def simulate_action(self, board, action):
-        # Simula el resultado de aplicar una acción sobre una copia del tablero
-        idx, start, end, is_row = action
-        new_board = board.copy()
-        if is_row:
-            new_board[idx, start:end+1] = 0
+        self.all_moves = all_moves  # True: también considera sub-segmentos, no solo segmentos maximales
+        # Tabla de transposición (None la desactiva); se conserva entre jugadas
+        self.tt = TranspositionTable(tt_size_bits) if tt_size_bits else None
+        # Posiciones simétricas comparten entrada en la tabla (clave = forma canónica)
+        self.use_symmetry = use_symmetry
+        # Modo anytime: si hay presupuesto de tiempo (segundos) o de nodos por jugada se
+        # profundiza iterativamente hasta max_depth (por defecto, las piezas restantes)
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.last_depth = 0
+        # Orden de jugadas: tupla de heurísticas de MoveOrderer, una instancia propia, o None
+        if isinstance(ordering, MoveOrderer) or ordering is None:
+            self.orderer = ordering
         else:
-            new_board[start:end+1, idx] = 0
-        return new_board
-    
-    def h1(self, board):
-        # Heurística simple: paridad de piezas restantes
-        remaining = np.count_nonzero(board)
-        return 1 if remaining % 2 == 1 else -1
-
-    def h2(self, board):
-        # Heurística de segmentos ponderados: evalúa la calidad de los segmentos disponibles
-        score = 0
-        size = board.shape[0]
-        
-        # Evaluar filas y columnas
-        for is_row in [0, 1]:
-            for idx in range(size):
-                line = board[idx, :] if is_row else board[:, idx]
-                # Encontrar segmentos consecutivos
-                segments = []
-                start = None
-                for i in range(size):
-                    if line[i] == 1:
-                        if start is None:
-                            start = i
-                    elif start is not None:
-                        segments.append(i - start)  # longitud del segmento
-                        start = None
-                if start is not None:
-                    segments.append(size - start)
-                
-                # Asignar puntuación basada en el tamaño de los segmentos
-                for seg_len in segments:
-                    if seg_len == 1:
-                        score += 1    # Segmentos pequeños son menos valiosos
-                    elif seg_len == 2:
-                        score += 3    # Segmentos medianos
-                    elif seg_len == 3:
-                        score += 5    # Segmentos grandes
-                    else:
-                        score += 7    # Segmentos muy grandes son muy valiosos
+            self.orderer = MoveOrderer(ordering) if ordering else None
+        # Con endgame_threshold piezas o menos se juega con el solver exacto y se corta con el
+        # mismo presupuesto que la búsqueda. None (por defecto) lo desactiva: con 12 piezas
+        # cuesta más que la búsqueda que reemplaza, sobre todo en misère
+        self.endgame_threshold = endgame_threshold
+        self.solver = EndgameSolver(env.board_size, env.misere, check=self._check_budget) if endgame_threshold else None
+        # Base de datos resuelta o libro de aperturas (SolveDatabase o ruta al archivo)
+        if isinstance(opening_book, str):
+            opening_book = SolveDatabase(opening_book)
+        if opening_book is not None and opening_book.misere != env.misere:
+            # Los valores exactos de una base con otras reglas serían incorrectos
+            raise ValueError("La base de datos / libro de aperturas es de otra variante (misère) que el entorno.")
+        self.opening_book = opening_book
+        # Evaluación de hojas (por defecto h()); ver evaluation.Evaluator
+        self.evaluator = evaluator if evaluator is not None else HeuristicEvaluator()
+        # Evaluar todos los hijos hoja de un nodo en un lote (solo hasta 8x8); None: lo decide el evaluador
+        self.batch_leaves = self.evaluator.batched if batch_leaves is None else batch_leaves
+        # Contadores por jugada; con log_path se registra cada jugada en JSON lines
+        self.stats = SearchStats(log_path)
+        self._deadline = None
+        self._node_budget = None
+        self._solver_base = 0
+        # Nodos a partir de los cuales se vuelve a mirar el presupuesto (inf: sin límite)
+        self._next_check = float('inf')
+        self._pv_table = []
+        self._prev_pv = []
+        self._follow_pv = False
+        self._completed = []
         
-        # Aplicar paridad como factor de corrección
-        remaining = np.count_nonzero(board)
-        parity_factor = 1 if remaining % 2 == 1 else -1 # para quien va
-        
-        return score * parity_factor
-    
-    def h(self, board):
-        return self.h1(board) + 2 * self.h2(board) # ponderación de heurísticas, es más importante la segunda
-
-    def minimax(self, board, depth, maximizing_player, alpha=float('-inf'), beta=float('inf')):
-        if depth == 0 or np.count_nonzero(board) == 0:
-            return self.h(board)
-        
-        valid_actions = self.get_valid_actions(board)
-        if maximizing_player:
+    def get_valid_actions(self, state):
+        return self.stats.generate_moves(state, maximal=not self.all_moves)
+
+    def h1(self, state):
+        return heuristics.h1(state)
+
+    def h2(self, state):
+        return heuristics.h2(state)
+
+    def h(self, state):
+        return heuristics.h(state)
+
+    def _evaluate_leaves(self, state, actions, maximizing_player):
+        # Evalúa en un solo lote todos los hijos hoja de un nodo (maximizing_player es el de los hijos)
+        masks = [state.mask ^ state.move_masks(action)[0] for action in actions]
+        values = self.evaluator.evaluate_masks(np.array(masks, dtype=np.uint64), state.size, maximizing_player)
+        if self.solver is not None:
+            for i, mask in enumerate(masks):
+                if mask.bit_count() <= self.endgame_threshold:
+                    values[i] = self.solver.value(Bitboard(state.size, mask), maximizing_player)
+        return values
+
+
+    def _start_budget(self):
+        self._deadline = time.perf_counter() + self.time_limit if self.time_limit is not None else None
+        self._node_budget = self.node_limit
+        self._solver_base = self.solver.nodes if self.solver is not None else 0
+        self._next_check = self.stats.nodes
+
+    def _stop_budget(self):
+        self._deadline = None
+        self._node_budget = None
+        self._next_check = float('inf')
+
+    def _check_budget(self):
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout()
+        if self._node_budget is not None:
+            # Los nodos que resuelve el solver también gastan el presupuesto
+            nodes = self.stats.nodes + (self.solver.nodes - self._solver_base if self.solver is not None else 0)
+            if nodes >= self._node_budget:
+                raise SearchTimeout()
+
+    def _order_pv_first(self, actions, ply):
+        # Mientras se recorre la variante principal previa, su jugada va primero
+        pv = self._prev_pv
+        if ply < len(pv) and pv[ply] in actions:
+            actions = list(actions)
+            actions.remove(pv[ply])
+            actions.insert(0, pv[ply])
+        else:
+            self._follow_pv = False
+        return actions
+
+    def minimax(self, state, depth, maximizing_player, alpha=float('-inf'), beta=float('inf'), ply=1):
+        stats = self.stats
+        stats.nodes += 1
+        if stats.nodes >= self._next_check:
+            # Umbral y no nodes % 256: con batch_leaves los nodos avanzan de a varios
+            self._next_check = stats.nodes + 256
+            self._check_budget()
+        if ply < len(self._pv_table):
+            self._pv_table[ply] = []
+        if self.solver is not None and state.count() <= self.endgame_threshold:
+            stats.leaves += 1
+            return self.solver.value(state, maximizing_player)
+        if depth == 0 or state.is_empty():
+            stats.leaves += 1
+            return self.evaluator.evaluate(state, maximizing_player)
+
+        tt = self.tt
+        tt_move = None
+        if tt is not None:
+            canon, sym = canonicalize(state.mask, state.size) if self.use_symmetry else (state.mask, 0)
+            key = (canon << 1) | maximizing_player
+            entry = tt.probe(key)
+            if entry is not None and entry[3] is not None:
+                tt_move = from_canonical_move(entry[3], sym, state.size)
+            if entry is not None and entry[0] >= depth:
+                _, value, flag, _ = entry
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value
+        alpha_orig, beta_orig = alpha, beta
+
+        valid_actions = self.get_valid_actions(state)
+        if self.orderer is not None:
+            valid_actions = self.orderer.order(valid_actions, ply, tt_move)
+        if self._follow_pv:
+            valid_actions = self._order_pv_first(valid_actions, ply)
+        best_action = None
+        if depth == 1 and self.batch_leaves and state.size <= 8 and valid_actions:
+            values = self._evaluate_leaves(state, valid_actions, not maximizing_player)
+            stats.nodes += len(values)
+            stats.leaves += len(values)
+            pick = max if maximizing_player else min
+            best_index = pick(range(len(values)), key=values.__getitem__)
+            best_eval, best_action = values[best_index], valid_actions[best_index]
+            self._update_pv(ply, best_action)
+            self._follow_pv = False
+        elif maximizing_player:
             max_eval = float('-inf')
-            for action in valid_actions:
-                new_board = self.simulate_action(board, action)
-                eval = self.minimax(new_board, depth - 1, False, alpha, beta)
-                max_eval = max(max_eval, eval)
+            for i, action in enumerate(valid_actions):
+                state.apply(action)
+                eval = self.minimax(state, depth - 1, False, alpha, beta, ply + 1)
+                state.undo()
+                self._follow_pv = False
+                if eval > max_eval:
+                    max_eval = eval
+                    best_action = action
+                    self._update_pv(ply, action)
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self._record_cutoff(action, i, ply, depth)
                     break  # Poda beta
-            return max_eval
+            best_eval = max_eval
         else:
             min_eval = float('inf')
-            for action in valid_actions:
-                new_board = self.simulate_action(board, action)
-                eval = self.minimax(new_board, depth - 1, True, alpha, beta)
-                min_eval = min(min_eval, eval)
+            for i, action in enumerate(valid_actions):
+                state.apply(action)
+                eval = self.minimax(state, depth - 1, True, alpha, beta, ply + 1)
+                state.undo()
+                self._follow_pv = False
+                if eval < min_eval:
+                    min_eval = eval
+                    best_action = action
+                    self._update_pv(ply, action)
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self._record_cutoff(action, i, ply, depth)
                     break  # Poda alfa
-            return min_eval
+            best_eval = min_eval
+
+        if tt is not None:
+            if best_eval <= alpha_orig:
+                flag = UPPER
+            elif best_eval >= beta_orig:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if best_action is not None:
+                best_action = to_canonical_move(best_action, sym, state.size)
+            tt.store(key, depth, best_eval, flag, best_action)
+        return best_eval
+
+    def _record_cutoff(self, action, index, ply, depth):
+        self.stats.cutoffs += 1
+        if index == 0:
+            self.stats.first_move_cutoffs += 1
+        if self.orderer is not None:
+            self.orderer.record_cutoff(action, ply, depth)
+
+    def _update_pv(self, ply, action):
+        table = self._pv_table
+        if ply < len(table):
+            table[ply] = [action] + (table[ply + 1] if ply + 1 < len(table) else [])
+
+    def search_root(self, state, depth, root_actions):
+        """
+        Busca la raíz a la profundidad dada con las jugadas en el orden recibido.
+
+        Returns:
+            Lista de (valor, acción) en el orden de búsqueda. Los valores de las
+            jugadas que no superan a la mejor son cotas superiores (poda en raíz).
+        """
+        self._pv_table = [[] for _ in range(depth + 2)]
+        scored = self._completed = []
+        best_value = float('-inf')
+        for action in root_actions:
+            state.apply(action)
+            value = self.minimax(state, depth - 1, False, best_value, float('inf'))
+            state.undo()
+            self._follow_pv = False
+            scored.append((value, action))
+            if value > best_value:
+                best_value = value
+                self._pv_table[0] = [action] + self._pv_table[1]
+        return scored
+
+    def search_move(self, state, action, depth, alpha=float('-inf')):
+        """
+        Valor de una sola jugada de raíz con ventana (alpha, inf), para repartir
+        la raíz entre procesos. Si el valor es <= alpha es solo una cota superior.
+        """
+        self._pv_table = [[] for _ in range(depth + 2)]
+        self._follow_pv = False
+        state.apply(action)
+        value = self.minimax(state, depth - 1, False, alpha, float('inf'))
+        state.undo()
+        return value
 
     def act(self, observation):
-        board = observation["board"]
-        valid_actions = self.get_valid_actions(board)
+        self.stats.begin_move(self.tt)
+        action = self._act(observation)
+        self.stats.end_move(action)
+        return action
+
+    def _act(self, observation):
+        # Estado con h2/paridad incrementales: h() en O(1) en las hojas
+        state = heuristics.ScoredBitboard.from_array(observation["board"])
+        if self.opening_book is not None:
+            book_move = self.opening_book.best_move(state)
+            if book_move is not None:
+                return book_move
+        if self.tt is not None:
+            self.tt.new_search()
+        valid_actions = self.get_valid_actions(state)
+        if not valid_actions:
+            return None
+        if self.solver is not None and state.count() <= self.endgame_threshold:
+            self.last_depth = 0
+            return self._solve_root(state, valid_actions)
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self._prev_pv = []
+        self._follow_pv = False
+        if self.time_limit is None and self.node_limit is None:
+            self.last_depth = self.depth
+            scored = self.search_root(state, self.depth, valid_actions)
+            self.stats.complete_depth(self.depth)
+            return self._best(scored)
+        return self._iterative_deepening(state, valid_actions)
+
+    def _best(self, scored):
         best_action = None
         best_value = float('-inf')
-        for action in valid_actions:
-            new_board = self.simulate_action(board, action)
-            value = self.minimax(new_board, self.depth - 1, False)
+        for value, action in scored:
             if value > best_value:
                 best_value = value
                 best_action = action
         return best_action
+
+    def _solve_root(self, state, valid_actions):
+        # Con presupuesto, la resolución exacta de la raíz también se corta
+        self._start_budget()
+        try:
+            return self.solver.best_move(state)
+        except SearchTimeout:
+            # Sin presupuesto para resolverla: la mejor jugada según el evaluador
+            scored = []
+            for action in valid_actions:
+                state.apply(action)
+                scored.append((self.evaluator.evaluate(state, False), action))
+                state.undo()
+            return self._best(scored)
+        finally:
+            self._stop_budget()
+
+    def _iterative_deepening(self, state, valid_actions):
+        self._start_budget()
+        max_depth = self.max_depth or state.count()
+        best_action = valid_actions[0]
+        root_actions = valid_actions
+        self.last_depth = 0
+        try:
+            for depth in range(1, max_depth + 1):
+                scored = []
+                try:
+                    self._follow_pv = bool(self._prev_pv)
+                    scored = self.search_root(state, depth, root_actions)
+                except SearchTimeout:
+                    # Jugadas completadas de la iteración interrumpida: la primera es la mejor
+                    # de la iteración anterior, así que su mejor jugada es al menos igual de informada
+                    partial = self._completed
+                    if partial:
+                        best_action = self._best(partial)
+                    break
+                best_action = self._best(scored)
+                self.last_depth = depth
+                self.stats.complete_depth(depth)
+                self._prev_pv = self._pv_table[0] if self._pv_table else [best_action]
+                # Orden de raíz para la siguiente iteración: mejores valores primero
+                root_actions = [a for _, a in sorted(scored, key=lambda x: -x[0])]
+                if self._prev_pv and self._prev_pv[0] != root_actions[0]:
+                    root_actions.remove(self._prev_pv[0])
+                    root_actions.insert(0, self._prev_pv[0])
+        finally:
+            self._stop_budget()
+        return best_action
@@ -0,0 +1,68 @@
+TT_BONUS = 1 << 30
+KILLER_BONUS = 1 << 20
+
+
+class MoveOrderer:
+    """
+    Orden de jugadas para alfa-beta combinando heurísticas configurables.
+
+    heuristics es una tupla con cualquiera de:
+        "tt"      : la mejor jugada guardada en la tabla de transposición primero
+        "killer"  : jugadas que produjeron corte en el mismo ply (num_killers por ply)
+        "history" : tabla de historia, suma depth^2 por cada corte de la jugada
+        "length"  : segmentos más largos primero
+    """
+
+    def __init__(self, heuristics=("tt", "killer", "history", "length"), num_killers=2):
+        self.heuristics = tuple(heuristics)
+        self.use_tt = "tt" in self.heuristics
+        self.use_killers = "killer" in self.heuristics
+        self.use_history = "history" in self.heuristics
+        self.use_length = "length" in self.heuristics
+        self.num_killers = num_killers
+        self.killers = []
+        self.history = {}
+
+    def clear(self):
+        self.killers = []
+        self.history = {}
+
+    def new_search(self):
+        # Los killers dependen del ply de la búsqueda actual; la historia se envejece
+        self.killers = []
+        for action in self.history:
+            self.history[action] >>= 1
+
+    def order(self, actions, ply, tt_move=None):
+        killers = self.killers[ply] if self.use_killers and ply < len(self.killers) else ()
+        history = self.history if self.use_history else None
+        use_length = self.use_length
+        if tt_move is not None and not self.use_tt:
+            tt_move = None
+        if tt_move is None and not killers and not history and not use_length:
+            return actions
+
+        def score(action):
+            value = 0
+            if action == tt_move:
+                value += TT_BONUS
+            if action in killers:
+                value += KILLER_BONUS
+            if history:
+                value += history.get(action, 0) << 3
+            if use_length:
+                value += action[2] - action[1]
+            return value
+
+        return sorted(actions, key=score, reverse=True)
+
+    def record_cutoff(self, action, ply, depth):
+        if self.use_killers:
+            while len(self.killers) <= ply:
+                self.killers.append([])
+            killers = self.killers[ply]
+            if action not in killers:
+                killers.insert(0, action)
+                del killers[self.num_killers:]
+        if self.use_history:
+            self.history[action] = self.history.get(action, 0) + depth * depth
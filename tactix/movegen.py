@@ -0,0 +1,64 @@
+from functools import lru_cache
+from bitboard import get_tables, line_runs
+
+
+def line_segments(occ, size):
+    # Todos los sub-segmentos legales (start, end) dentro de los segmentos maximales
+    return [(s, e) for start, end in line_runs(occ, size)
+            for s in range(start, end + 1) for e in range(s, end + 1)]
+
+
+class MoveTables:
+    """
+    Jugadas precalculadas por línea, indexadas por la máscara de ocupación.
+
+    maximal[is_row][idx][occ] y segments[is_row][idx][occ] son tuplas de
+    acciones (idx, start, end, is_row) listas para concatenar, en el mismo
+    orden que recorría el antiguo get_valid_actions (columnas primero).
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.board = get_tables(size)
+        self.full_line = (1 << size) - 1
+        runs = [line_runs(occ, size) for occ in range(1 << size)]
+        segs = [line_segments(occ, size) for occ in range(1 << size)]
+        self.maximal = [[[tuple((idx, s, e, is_row) for s, e in runs[occ]) for occ in range(1 << size)]
+                         for idx in range(size)] for is_row in range(2)]
+        self.segments = [[[tuple((idx, s, e, is_row) for s, e in segs[occ]) for occ in range(1 << size)]
+                          for idx in range(size)] for is_row in range(2)]
+
+
+@lru_cache(maxsize=None)
+def get_move_tables(size):
+    return MoveTables(size)
+
+
+def generate_moves(state, maximal=True):
+    """
+    Genera las jugadas legales de un Bitboard con búsquedas en tabla.
+
+    Parameters:
+        state: Bitboard sobre el que se generan las jugadas.
+        maximal: Si es True solo devuelve segmentos maximales (el comportamiento
+            histórico de los agentes); si es False devuelve todo sub-segmento
+            que TacTixEnv._valid_action acepta.
+
+    Returns:
+        Lista de acciones (idx, start, end, is_row).
+    """
+    tables = get_move_tables(state.size)
+    lines = tables.maximal if maximal else tables.segments
+    size, full_line = state.size, tables.full_line
+    mask, tmask = state.mask, state.tmask
+    actions = []
+    cols, rows = lines[0], lines[1]
+    for idx in range(size):
+        occ = (tmask >> (idx * size)) & full_line
+        if occ:
+            actions.extend(cols[idx][occ])
+    for idx in range(size):
+        occ = (mask >> (idx * size)) & full_line
+        if occ:
+            actions.extend(rows[idx][occ])
+    return actions
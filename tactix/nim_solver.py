@@ -0,0 +1,175 @@
+from functools import lru_cache
+from bitboard import Bitboard, get_tables
+from movegen import generate_moves
+from symmetry import TRANSFORMS, transform_mask, canonicalize
+
+# Valor de una posición resuelta para la búsqueda: supera cualquier valor de h()
+WIN_SCORE = 1000
+# Cada cuántos nodos del solver se llama a check (ver EndgameSolver)
+CHECK_INTERVAL = 256
+
+
+class _ComponentTables:
+    def __init__(self, size):
+        tables = get_tables(size)
+        self.size = size
+        self.full = tables.full
+        self.full_line = tables.full_line
+        self.not_first_col = tables.full & ~tables.col_masks[0]
+        self.not_last_col = tables.full & ~tables.col_masks[size - 1]
+
+
+@lru_cache(maxsize=None)
+def _component_tables(size):
+    return _ComponentTables(size)
+
+
+def components(mask, size):
+    """
+    Separa la máscara en componentes conexas por adyacencia ortogonal.
+
+    Una jugada quita un segmento de celdas contiguas en una fila o columna,
+    así que nunca toca dos componentes: el juego es la suma disyuntiva de ellas.
+    """
+    t = _component_tables(size)
+    parts = []
+    while mask:
+        comp = mask & -mask
+        while True:
+            grown = comp | ((comp << 1) & t.not_first_col) | ((comp >> 1) & t.not_last_col) \
+                | ((comp << size) & t.full) | (comp >> size)
+            grown &= mask
+            if grown == comp:
+                break
+            comp = grown
+        parts.append(comp)
+        mask ^= comp
+    return parts
+
+
+def _translate_to_origin(mask, size, full_line):
+    low = (mask & -mask).bit_length() - 1
+    row0 = low // size
+    cols = 0
+    shifted = mask >> (row0 * size)
+    while shifted:
+        cols |= shifted & full_line
+        shifted >>= size
+    col0 = (cols & -cols).bit_length() - 1
+    return mask >> (row0 * size + col0)
+
+
+class EndgameSolver:
+    """
+    Resolución exacta de finales de TacTix.
+
+    En juego normal usa Sprague-Grundy: el valor de Grundy de cada componente
+    se memoriza por forma (trasladada al origen y canónica bajo simetrías) y el
+    de la posición es el XOR de sus componentes. En misère la suma de juegos no
+    se reduce a un XOR, así que se memoriza ganar/perder sobre la posición
+    completa. En ambos casos se consideran todos los sub-segmentos legales.
+
+    check (opcional) se llama cada CHECK_INTERVAL nodos resueltos: una búsqueda con
+    presupuesto lo usa para cortar, lanzando una excepción, una resolución que se lo
+    excede. Solo se memorizan valores completos, así que el solver sigue siendo válido
+    después del corte. nodes cuenta los nodos resueltos.
+    """
+
+    def __init__(self, size=6, misere=False, check=None):
+        self.size = size
+        self.misere = misere
+        self.full_line = (1 << size) - 1
+        self.check = check
+        self.nodes = 0
+        self._next_check = CHECK_INTERVAL
+        self._grundy = {}
+        self._shape_keys = {}
+        self._misere_wins = {}
+
+    def clear(self):
+        self._grundy.clear()
+        self._shape_keys.clear()
+        self._misere_wins.clear()
+
+    def _count_node(self):
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._next_check = self.nodes + CHECK_INTERVAL
+            if self.check is not None:
+                self.check()
+
+    def _shape_key(self, comp):
+        size, full_line = self.size, self.full_line
+        local = _translate_to_origin(comp, size, full_line)
+        key = self._shape_keys.get(local)
+        if key is None:
+            key = min(_translate_to_origin(transform_mask(local, k, size), size, full_line)
+                      for k in range(len(TRANSFORMS)))
+            self._shape_keys[local] = key
+        return key
+
+    def _component_grundy(self, comp):
+        key = self._shape_key(comp)
+        value = self._grundy.get(key)
+        if value is not None:
+            return value
+        self._count_node()
+        state = Bitboard(self.size, key)
+        reachable = set()
+        for action in generate_moves(state, maximal=False):
+            state.apply(action)
+            reachable.add(self.grundy(state.mask))
+            state.undo()
+        value = 0
+        while value in reachable:
+            value += 1
+        self._grundy[key] = value
+        return value
+
+    def grundy(self, mask):
+        value = 0
+        for comp in components(mask, self.size):
+            value ^= self._component_grundy(comp)
+        return value
+
+    def _misere_win(self, mask):
+        if mask == 0:
+            return True  # el rival sacó la última pieza y pierde
+        key = canonicalize(mask, self.size)[0]
+        win = self._misere_wins.get(key)
+        if win is not None:
+            return win
+        self._count_node()
+        state = Bitboard(self.size, mask)
+        win = False
+        for action in generate_moves(state, maximal=False):
+            state.apply(action)
+            if not self._misere_win(state.mask):
+                win = True
+                break
+            state.undo()
+        self._misere_wins[key] = win
+        return win
+
+    def is_win(self, mask):
+        # True si el jugador que mueve gana con juego perfecto
+        if self.misere:
+            return self._misere_win(mask)
+        return self.grundy(mask) != 0
+
+    def value(self, state, maximizing_player):
+        # Valor desde el punto de vista del maximizador, comparable con h()
+        win = self.is_win(state.mask)
+        return WIN_SCORE if win == bool(maximizing_player) else -WIN_SCORE
+
+    def best_move(self, state):
+        """
+        Jugada ganadora si existe; si la posición está perdida devuelve la que
+        quita menos piezas, para alargar la partida y darle chances al rival de errar.
+        """
+        actions = generate_moves(state, maximal=False)
+        for action in actions:
+            # Sin aplicar la jugada: si check corta la resolución, state queda intacto
+            if not self.is_win(state.mask ^ state.move_masks(action)[0]):
+                return action
+        return min(actions, key=lambda a: a[2] - a[1]) if actions else None
@@ -0,0 +1,163 @@
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import numpy as np
+from bitboard import Bitboard, line_runs
+from movegen import generate_moves
+
+
+class OpponentModel(ABC):
+    """
+    Modelo del rival para los nodos de azar de expectimax.
+
+    probabilities(state, actions) devuelve, en una sola pasada, la probabilidad
+    de cada acción de `actions` (los hijos del nodo) en el mismo orden.
+
+    invariant indica si el modelo da las mismas probabilidades en posiciones
+    simétricas (rotaciones / transposición); solo entonces expectimax puede
+    compartir la caché entre ellas.
+    """
+
+    invariant = False
+
+    @abstractmethod
+    def probabilities(self, state, actions):
+        raise NotImplementedError
+
+
+class UniformOpponentModel(OpponentModel):
+    invariant = True
+
+    def probabilities(self, state, actions):
+        if not actions:
+            return []
+        p = 1 / len(actions)
+        return [p] * len(actions)
+
+
+@lru_cache(maxsize=None)
+def _row_nim_table(size):
+    # XOR de las longitudes de los segmentos de una fila, por ocupación
+    table = []
+    for occ in range(1 << size):
+        value = 0
+        for start, end in line_runs(occ, size):
+            value ^= end - start + 1
+        table.append(value)
+    return table
+
+
+def row_nim_sum(state):
+    # El "nim-sum" que usa TrainerAgent: XOR por filas de las longitudes de los segmentos
+    table = _row_nim_table(state.size)
+    size, full_line, mask = state.size, (1 << state.size) - 1, state.mask
+    value = 0
+    for r in range(size):
+        value ^= table[(mask >> (r * size)) & full_line]
+    return value
+
+
+def trainer_optimal_move(state):
+    # Réplica de la jugada "óptima" de TrainerAgent: la primera que deja nim-sum 0
+    actions = generate_moves(state, maximal=False)
+    for action in actions:
+        state.apply(action)
+        zero = row_nim_sum(state) == 0
+        state.undo()
+        if zero:
+            return action
+    return actions[0] if actions else None
+
+
+def _normalize(weights):
+    total = sum(weights)
+    if total <= 0:
+        return [1 / len(weights)] * len(weights) if weights else []
+    return [w / total for w in weights]
+
+
+class TrainerLikeOpponentModel(OpponentModel):
+    """
+    Rival parecido a TrainerAgent: con probabilidad `difficulty` juega la
+    jugada de nim-sum 0 y si no, una jugada aleatoria entre los segmentos
+    maximales (como RandomTacTixAgent). La masa de jugadas que no están entre
+    los hijos del nodo se reparte proporcionalmente.
+    """
+
+    def __init__(self, difficulty=0.3):
+        self.difficulty = difficulty
+
+    def probabilities(self, state, actions):
+        if not actions:
+            return []
+        random_moves = set(generate_moves(state, maximal=True))
+        random_p = (1 - self.difficulty) / len(random_moves) if random_moves else 0.0
+        optimal = trainer_optimal_move(state)
+        weights = []
+        for action in actions:
+            w = random_p if action in random_moves else 0.0
+            if action == optimal:
+                w += self.difficulty
+            weights.append(w)
+        return _normalize(weights)
+
+
+class LearnedOpponentModel(OpponentModel):
+    """
+    Modelo softmax lineal sobre características de cada jugada, ajustado por
+    máxima verosimilitud a partidas observadas (ver fit).
+    """
+
+    FEATURES = ("length", "is_row", "maximal", "row_nim_zero", "clears_line", "odd_remaining")
+
+    def __init__(self, weights=None):
+        self.weights = np.zeros(len(self.FEATURES)) if weights is None else np.asarray(weights, dtype=float)
+
+    def features(self, state, actions):
+        maximal = set(generate_moves(state, maximal=True))
+        size = state.size
+        rows = []
+        for action in actions:
+            idx, start, end, is_row = action
+            length = end - start + 1
+            state.apply(action)
+            rows.append((
+                length / size,
+                float(is_row),
+                float(action in maximal),
+                float(row_nim_sum(state) == 0),
+                float(state.line(idx, is_row) == 0),
+                float(state.count() % 2 == 1),
+            ))
+            state.undo()
+        return np.array(rows, dtype=float)
+
+    def probabilities(self, state, actions):
+        if not actions:
+            return []
+        logits = self.features(state, actions) @ self.weights
+        logits -= logits.max()
+        p = np.exp(logits)
+        return (p / p.sum()).tolist()
+
+    def fit(self, samples, epochs=200, learning_rate=0.5, l2=1e-3):
+        """
+        Ajusta los pesos a una lista de (tablero, acción elegida), donde el
+        tablero es un Bitboard o un array. Las alternativas de cada muestra son
+        todas las jugadas legales.
+        """
+        data = []
+        for board, action in samples:
+            state = board.copy() if isinstance(board, Bitboard) else Bitboard.from_array(board)
+            actions = generate_moves(state, maximal=False)
+            chosen = actions.index(tuple(int(x) for x in action))
+            data.append((self.features(state, actions), chosen))
+        for _ in range(epochs):
+            grad = -l2 * self.weights
+            for feats, chosen in data:
+                logits = feats @ self.weights
+                logits -= logits.max()
+                p = np.exp(logits)
+                p /= p.sum()
+                grad += (feats[chosen] - p @ feats) / len(data)
+            self.weights += learning_rate * grad
+        return self
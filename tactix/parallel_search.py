@@ -0,0 +1,203 @@
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from agent import Agent
+import heuristics
+from bitboard import Bitboard
+from tactix_env import TacTixEnv
+from mcts_agent import MCTSTacTixAgent
+from search_stats import SearchStats
+
+# Estado de cada proceso del pool: su propio agente (con su tabla de transposición,
+# que se conserva entre jugadas) y la cota alpha compartida
+_worker_agent = None
+_worker_mask = None
+_shared_alpha = None
+
+
+def _init_worker(agent_class, env_kwargs, agent_kwargs, shared_alpha):
+    global _worker_agent, _shared_alpha
+    _worker_agent = agent_class(TacTixEnv(**env_kwargs), **agent_kwargs)
+    _shared_alpha = shared_alpha
+
+
+def _table(agent):
+    return getattr(agent, "tt", None) or getattr(agent, "cache", None)
+
+
+def _new_position(mask):
+    # Igual que act(): tabla y orden empiezan una búsqueda nueva en cada posición
+    global _worker_mask
+    if mask == _worker_mask:
+        return
+    _worker_mask = mask
+    agent = _worker_agent
+    table = _table(agent)
+    if table is not None:
+        table.new_search()
+    orderer = getattr(agent, "orderer", None)
+    if orderer is not None:
+        orderer.new_search()
+
+
+def _search_move(size, mask, action, depth, alpha, shared):
+    """
+    Busca una jugada de raíz. Con shared=True toma la mejor alpha publicada por
+    los demás procesos y publica su valor si la mejora.
+
+    Returns:
+        (valor, alpha usada, contadores de SearchStats)
+    """
+    _new_position(mask)
+    agent = _worker_agent
+    if shared:
+        alpha = max(alpha, _shared_alpha.value)
+    agent.stats.begin_move(_table(agent))
+    value = agent.search_move(heuristics.ScoredBitboard(size, mask), action, depth, alpha)
+    if shared and value > alpha:
+        with _shared_alpha.get_lock():
+            if value > _shared_alpha.value:
+                _shared_alpha.value = value
+    agent.stats.end_move()
+    return value, alpha, agent.stats.counters()
+
+
+def _mcts_visits(size, mask, seed):
+    # Árbol independiente por tarea (paralelización de raíz de MCTS)
+    agent = _worker_agent
+    agent.rng = random.Random(seed)
+    agent.np_rng = np.random.default_rng(seed)
+    agent._root = None
+    agent.stats.begin_move()
+    root = agent.search(Bitboard(size, mask))
+    agent.stats.end_move()
+    return [(child.action, child.visits) for child in root.children], agent.stats.counters()
+
+
+class ParallelSearchAgent(Agent):
+    """
+    Reparte la búsqueda de la raíz entre procesos con un pool persistente.
+
+    Minimax / expectimax (a profundidad fija): la primera jugada se busca sola
+    para obtener alpha y el resto en paralelo. Con deterministic=True todas usan
+    esa alpha y se elige igual que la búsqueda serial; con False los procesos
+    comparten la mejor alpha a medida que terminan (más poda, pero el empate
+    entre jugadas de igual valor depende del orden de llegada). Expectimax solo
+    aprovecha alpha con pruning="star1"/"star2".
+
+    MCTS: cada tarea construye un árbol propio con la semilla seed + i y se
+    juega la jugada con más visitas sumadas (determinista con seed y playouts).
+
+    Parameters:
+        env: TacTixEnv.
+        agent_class: MinimaxTacTixAgent, ExpectimaxTacTixAgent o MCTSTacTixAgent.
+        workers: Cantidad de procesos (por defecto os.cpu_count()).
+        deterministic: Ver arriba.
+        seed: Semilla base de MCTS.
+        log_path: Archivo JSON lines donde registrar los contadores de cada
+            jugada, sumados entre procesos.
+        **agent_kwargs: Parámetros de cada agente (el mismo en todos los procesos).
+    """
+
+    def __init__(self, env, agent_class, workers=None, deterministic=True, seed=None, log_path=None,
+                 **agent_kwargs):
+        self.env = env
+        self.agent_class = agent_class
+        self.agent_kwargs = agent_kwargs
+        self.workers = workers or os.cpu_count()
+        self.deterministic = deterministic
+        self.seed = seed
+        self.mcts = issubclass(agent_class, MCTSTacTixAgent)
+        # El agente local resuelve libro, solver y orden de la raíz; los procesos, el resto
+        self.local = agent_class(env, **agent_kwargs)
+        if not self.mcts and (getattr(self.local, "time_limit", None) or getattr(self.local, "node_limit", None)):
+            raise ValueError("La búsqueda paralela de minimax es a profundidad fija.")
+        if self.mcts and self.local.playouts is not None:
+            self.local.playouts = -(-self.local.playouts // self.workers)  # reparto del presupuesto
+        self.stats = SearchStats(log_path)
+        self._pool = None
+        self._shared_alpha = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._shared_alpha = multiprocessing.Value("d", float("-inf"))
+            kwargs = dict(self.agent_kwargs)
+            if self.mcts:
+                kwargs["playouts"] = self.local.playouts
+                kwargs["reuse_tree"] = False
+            env_kwargs = {"board_size": self.env.board_size, "misere": self.env.misere}
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self.agent_class, env_kwargs, kwargs, self._shared_alpha))
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def act(self, observation):
+        self.stats.begin_move()
+        action = self._act(observation)
+        self.stats.end_move(action)
+        return action
+
+    def _act(self, observation):
+        local = self.local
+        state = heuristics.ScoredBitboard.from_array(observation["board"])
+        book = getattr(local, "opening_book", None)
+        if book is not None:
+            book_move = book.best_move(state)
+            if book_move is not None:
+                return book_move
+        actions = local.get_valid_actions(state)
+        if not actions:
+            return None
+        if local.solver is not None and state.count() <= local.endgame_threshold:
+            return local.solver.best_move(state)
+        if self.mcts:
+            return self._act_mcts(state, actions)
+        return self._act_split(state, actions)
+
+    def _act_split(self, state, actions):
+        pool = self._get_pool()
+        size, mask, depth = state.size, state.mask, self.local.depth
+        first_value, _, counters = pool.submit(_search_move, size, mask, actions[0], depth,
+                                               float("-inf"), False).result()
+        self.stats.merge(counters)
+        self._shared_alpha.value = first_value
+        shared = not self.deterministic
+        futures = {pool.submit(_search_move, size, mask, action, depth, first_value, shared): i
+                   for i, action in enumerate(actions[1:], 1)}
+        results = [(first_value, float("-inf"))] + [None] * (len(actions) - 1)
+        for future in as_completed(futures):
+            value, alpha, counters = future.result()
+            results[futures[future]] = (value, alpha)
+            self.stats.merge(counters)
+        # Solo los valores por encima de su alpha son exactos; el resto no supera a la primera
+        best_index, best_value = 0, first_value
+        for i, (value, alpha) in enumerate(results):
+            if value > alpha and value > best_value:
+                best_index, best_value = i, value
+        self.stats.complete_depth(depth)
+        return actions[best_index]
+
+    def _act_mcts(self, state, actions):
+        pool = self._get_pool()
+        base = self.seed if self.seed is not None else random.randrange(1 << 30)
+        futures = [pool.submit(_mcts_visits, state.size, state.mask, base + i) for i in range(self.workers)]
+        visits = {}
+        for future in futures:
+            children, counters = future.result()
+            self.stats.merge(counters)
+            for action, count in children:
+                visits[action] = visits.get(action, 0) + count
+        # Empates por el orden de generación de jugadas
+        return max(actions, key=lambda action: visits.get(action, 0))
@@ -0,0 +1,198 @@
+import cProfile
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from movegen import generate_moves
+
+# Contadores que se suman entre jugadas, procesos y partidas
+COUNTERS = ("nodes", "leaves", "cutoffs", "first_move_cutoffs", "cache_hits", "cache_probes",
+            "movegen_calls", "movegen_time", "seconds")
+
+
+class SearchStats:
+    """
+    Contadores de trabajo de una búsqueda (se reinician en cada jugada) y sus
+    totales acumulados entre jugadas.
+
+    nodes: nodos visitados; leaves: hojas evaluadas (evaluador o solver);
+    cutoffs / first_move_cutoffs: podas y cuántas las produjo la primera jugada;
+    cache_hits / cache_probes: consultas a la tabla de transposición;
+    movegen_calls / movegen_time: generación de jugadas (el tiempo solo se mide
+    con timing=True, ver profile); depth_times / depth_nodes: segundos y nodos
+    de cada profundidad completada; seconds: duración de la jugada.
+
+    Con log_path, end_move agrega una línea JSON por jugada a ese archivo.
+    """
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self.timing = False
+        self.reset()
+        self.reset_totals()
+
+    def reset(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cache_hits = 0
+        self.cache_probes = 0
+        self.movegen_calls = 0
+        self.movegen_time = 0.0
+        self.seconds = 0.0
+        self.depth_times = {}
+        self.depth_nodes = {}
+        self._table = None
+        self._start = self._depth_start = time.perf_counter()
+        self._depth_base = 0
+
+    def reset_totals(self):
+        self.totals = dict.fromkeys(COUNTERS, 0)
+        self.totals.update(moves=0, searches=0, ebf=0.0, depth_times={})
+
+    def generate_moves(self, state, maximal=True):
+        # movegen.generate_moves contando llamadas (y tiempo, si timing)
+        self.movegen_calls += 1
+        if not self.timing:
+            return generate_moves(state, maximal=maximal)
+        start = time.perf_counter()
+        actions = generate_moves(state, maximal=maximal)
+        self.movegen_time += time.perf_counter() - start
+        return actions
+
+    def begin_move(self, table=None):
+        """Reinicia los contadores; table es la tabla de transposición del agente (o None)."""
+        self.reset()
+        self._table = table
+        if table is not None:
+            self._hits_base = table.hits
+            self._probes_base = table.hits + table.misses
+
+    def complete_depth(self, depth):
+        # Cierra una iteración: tiempo y nodos desde la anterior (o desde begin_move)
+        now = time.perf_counter()
+        self.depth_times[depth] = now - self._depth_start
+        self.depth_nodes[depth] = self.nodes - self._depth_base
+        self._depth_start = now
+        self._depth_base = self.nodes
+
+    def end_move(self, action=None):
+        """Cierra la jugada: acumula los totales y, con log_path, la registra."""
+        self.seconds = time.perf_counter() - self._start
+        table = self._table
+        if table is not None:
+            self.cache_hits += table.hits - self._hits_base
+            self.cache_probes += table.hits + table.misses - self._probes_base
+        totals = self.totals
+        for name in COUNTERS:
+            totals[name] += getattr(self, name)
+        totals["moves"] += 1
+        if self.depth_nodes:
+            totals["searches"] += 1
+            totals["ebf"] += self.ebf()
+        for depth, seconds in self.depth_times.items():
+            key = str(depth)
+            totals["depth_times"][key] = totals["depth_times"].get(key, 0.0) + seconds
+        if self.log_path is not None:
+            record = {"action": None if action is None else [int(x) for x in action]}
+            record.update(self.as_dict())
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def merge(self, counters):
+        # Suma los contadores de otra búsqueda (por ejemplo, de un proceso)
+        for name in COUNTERS:
+            if name != "seconds":
+                setattr(self, name, getattr(self, name) + counters[name])
+
+    def counters(self):
+        return {name: getattr(self, name) for name in COUNTERS}
+
+    def cutoff_rate(self):
+        # Fracción de cortes producidos por la primera jugada: mide la calidad del orden
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    def cache_hit_rate(self):
+        return self.cache_hits / self.cache_probes if self.cache_probes else 0.0
+
+    def ebf(self):
+        """
+        Factor de ramificación efectivo: con varias iteraciones, el cociente de
+        nodos entre las dos últimas; con una sola a profundidad d, nodos^(1/d).
+        """
+        if not self.depth_nodes:
+            return 0.0
+        depths = sorted(self.depth_nodes)
+        last = depths[-1]
+        if len(depths) > 1 and self.depth_nodes[depths[-2]]:
+            return self.depth_nodes[last] / self.depth_nodes[depths[-2]]
+        return self.depth_nodes[last] ** (1 / last) if last else 0.0
+
+    def as_dict(self):
+        result = self.counters()
+        result.update({
+            "first_move_cutoff_rate": self.cutoff_rate(),
+            "cache_hit_rate": self.cache_hit_rate(),
+            "ebf": self.ebf(),
+            "depth": max(self.depth_times, default=0),
+            "depth_times": {str(d): t for d, t in self.depth_times.items()},
+        })
+        return result
+
+
+def summarize_totals(totals):
+    """Promedios de unos totales de SearchStats (o de varios sumados con add_totals)."""
+    moves = totals["moves"]
+    seconds = totals["seconds"]
+    return {
+        "moves": moves,
+        "nodes_per_move": totals["nodes"] / moves if moves else 0.0,
+        "leaves_per_move": totals["leaves"] / moves if moves else 0.0,
+        "nodes_per_second": totals["nodes"] / seconds if seconds else 0.0,
+        "seconds_per_move": seconds / moves if moves else 0.0,
+        "cutoff_rate": totals["first_move_cutoffs"] / totals["cutoffs"] if totals["cutoffs"] else 0.0,
+        "cache_hit_rate": totals["cache_hits"] / totals["cache_probes"] if totals["cache_probes"] else 0.0,
+        "movegen_share": totals["movegen_time"] / seconds if seconds else 0.0,
+        "ebf": totals["ebf"] / totals["searches"] if totals["searches"] else 0.0,
+    }
+
+
+def add_totals(into, totals):
+    # Suma unos totales a otros (los de varias partidas de un mismo agente)
+    for name, value in totals.items():
+        if name == "depth_times":
+            merged = into.setdefault("depth_times", {})
+            for depth, seconds in value.items():
+                merged[depth] = merged.get(depth, 0.0) + seconds
+        else:
+            into[name] = into.get(name, 0) + value
+    return into
+
+
+@contextmanager
+def profile(agent, cprofile=False, sort="cumulative", limit=25):
+    """
+    Mide las jugadas de agent dentro del bloque: activa el tiempo de generación
+    de jugadas, reinicia los totales y devuelve el SearchStats del agente.
+    Con cprofile=True además corre cProfile e imprime las `limit` funciones
+    más caras.
+
+        with profile(agent) as stats:
+            agent.act(obs)
+        print(summarize_totals(stats.totals))
+    """
+    stats = agent.stats
+    timing = stats.timing
+    stats.timing = True
+    stats.reset_totals()
+    profiler = cProfile.Profile() if cprofile else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield stats
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            pstats.Stats(profiler).sort_stats(sort).print_stats(limit)
+        stats.timing = timing
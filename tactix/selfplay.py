@@ -0,0 +1,290 @@
+"""
+Generación de partidas de self-play y formato compacto en disco.
+
+Un dataset es un directorio con meta.json y archivos por bloques (chunks):
+    chunk-NNNNN.plies  registros de 10 bytes: máscara del tablero antes de la
+                       jugada (<u8, formato Bitboard.mask) y la jugada (<u2,
+                       índice en solve_db.move_list(size))
+    chunk-NNNNN.games  registros de 12 bytes por partida: primera jugada dentro
+                       del chunk (<u8), cantidad de jugadas (<u2), asiento
+                       ganador (u1: 0 el que empezó, 1 el otro) y relleno
+
+Los archivos solo crecen: primero se agregan las jugadas y después el índice,
+así que una escritura interrumpida deja a lo sumo registros sin indexar que
+el lector ignora. GameDataset los abre con np.memmap sin cargarlos.
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import tournament
+from solve_db import move_list
+
+PLY_DTYPE = np.dtype([("mask", "<u8"), ("action", "<u2")])
+GAME_DTYPE = np.dtype([("start", "<u8"), ("plies", "<u2"), ("winner", "u1"), ("pad", "u1")])
+FORMAT_VERSION = 1
+
+
+def _chunk_paths(path, number):
+    base = os.path.join(path, f"chunk-{number:05d}")
+    return base + ".plies", base + ".games"
+
+
+def _indexed_games(plies_path, games_path):
+    # Partidas completas del chunk: registro de índice entero y todas sus jugadas en disco
+    if not os.path.exists(games_path):
+        return 0
+    count = os.path.getsize(games_path) // GAME_DTYPE.itemsize
+    if count == 0:
+        return 0
+    available = os.path.getsize(plies_path) // PLY_DTYPE.itemsize if os.path.exists(plies_path) else 0
+    games = np.fromfile(games_path, dtype=GAME_DTYPE, count=count)
+    ends = games["start"].astype(np.int64) + games["plies"]
+    return int(np.searchsorted(ends, available, side="right"))
+
+
+class GameWriter:
+    """
+    Agrega partidas a un dataset (lo crea si no existe). Cada chunk guarda
+    hasta chunk_games partidas; al reabrir se sigue en el último.
+    """
+
+    def __init__(self, path, board_size=6, misere=False, chunk_games=100_000, flush_games=1000):
+        self.path = path
+        self.chunk_games = chunk_games
+        self.flush_games = flush_games
+        self._pending = []
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["board_size"] != board_size or meta["misere"] != misere:
+                raise ValueError(f"{path} tiene partidas de otro tablero o variante.")
+        else:
+            with open(meta_path, "w") as f:
+                json.dump({"version": FORMAT_VERSION, "board_size": board_size, "misere": misere}, f)
+        self.board_size = board_size
+        self.move_index = {move: i for i, move in enumerate(move_list(board_size))}
+        chunks = sorted(glob.glob(os.path.join(path, "chunk-*.games")))
+        self.chunk = len(chunks) - 1 if chunks else 0
+        self._open_chunk()
+
+    def _open_chunk(self):
+        plies_path, games_path = _chunk_paths(self.path, self.chunk)
+        self.chunk_count = _indexed_games(plies_path, games_path)
+        # Lo que sobre de una escritura cortada se pisa
+        plies = 0
+        if self.chunk_count:
+            last = np.fromfile(games_path, dtype=GAME_DTYPE, count=self.chunk_count)[-1]
+            plies = int(last["start"]) + int(last["plies"])
+        for path, size in ((plies_path, plies * PLY_DTYPE.itemsize),
+                           (games_path, self.chunk_count * GAME_DTYPE.itemsize)):
+            with open(path, "ab") as f:
+                f.truncate(size)
+        self.chunk_plies = plies
+        self._plies = open(plies_path, "ab")
+        self._games = open(games_path, "ab")
+
+    def append(self, masks, actions, winner):
+        """
+        Agrega una partida: masks[k] es el tablero antes de la jugada k y
+        actions[k] la jugada (tupla o índice en move_list); winner es el asiento ganador.
+        """
+        if self.chunk_count + len(self._pending) >= self.chunk_games:
+            self.flush()
+            self._plies.close()
+            self._games.close()
+            self.chunk += 1
+            self._open_chunk()
+        records = np.empty(len(masks), dtype=PLY_DTYPE)
+        records["mask"] = masks
+        records["action"] = [a if isinstance(a, (int, np.integer)) else self.move_index[tuple(int(x) for x in a)]
+                             for a in actions]
+        self._pending.append((records, winner))
+        if len(self._pending) >= self.flush_games:
+            self.flush()
+
+    def flush(self):
+        # Jugadas primero y después el índice: un corte nunca indexa jugadas que no están
+        if not self._pending:
+            return
+        games = np.zeros(len(self._pending), dtype=GAME_DTYPE)
+        for i, (records, winner) in enumerate(self._pending):
+            games[i] = (self.chunk_plies, records.size, winner, 0)
+            self.chunk_plies += records.size
+            self._plies.write(records.tobytes())
+        self._plies.flush()
+        os.fsync(self._plies.fileno())
+        self._games.write(games.tobytes())
+        self._games.flush()
+        self.chunk_count += len(self._pending)
+        self._pending = []
+
+    def close(self):
+        if self._plies is not None:
+            self.flush()
+            self._plies.close()
+            self._games.close()
+            self._plies = self._games = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameDataset:
+    """
+    Lectura de un dataset con acceso aleatorio por partida y por jugada.
+
+    game(i) devuelve (máscaras, jugadas, ganador) de la partida i; position(j)
+    devuelve (máscara, jugada, valor) de la jugada global j, donde valor es +1
+    si el jugador que movía ganó la partida y -1 si no.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.path = path
+        self.board_size = meta["board_size"]
+        self.misere = meta["misere"]
+        self.moves = move_list(self.board_size)
+        self.plies = []
+        self.games = []
+        number = 0
+        while os.path.exists(_chunk_paths(path, number)[1]):
+            plies_path, games_path = _chunk_paths(path, number)
+            count = _indexed_games(plies_path, games_path)
+            if count:
+                games = np.memmap(games_path, dtype=GAME_DTYPE, mode="r", shape=(count,))
+                total = int(games[-1]["start"]) + int(games[-1]["plies"])
+                self.games.append(games)
+                self.plies.append(np.memmap(plies_path, dtype=PLY_DTYPE, mode="r", shape=(total,)))
+            number += 1
+        self._game_offsets = np.cumsum([0] + [g.size for g in self.games])
+        self._ply_offsets = np.cumsum([0] + [p.size for p in self.plies])
+
+    def num_games(self):
+        return int(self._game_offsets[-1])
+
+    def num_positions(self):
+        return int(self._ply_offsets[-1])
+
+    def __len__(self):
+        return self.num_games()
+
+    def _locate(self, offsets, i):
+        chunk = int(np.searchsorted(offsets, i, side="right")) - 1
+        return chunk, i - int(offsets[chunk])
+
+    def game(self, i):
+        chunk, local = self._locate(self._game_offsets, i)
+        record = self.games[chunk][local]
+        start = int(record["start"])
+        plies = self.plies[chunk][start:start + int(record["plies"])]
+        return plies["mask"], plies["action"], int(record["winner"])
+
+    def position(self, j):
+        chunk, local = self._locate(self._ply_offsets, j)
+        record = self.plies[chunk][local]
+        game = int(np.searchsorted(self.games[chunk]["start"], local, side="right")) - 1
+        info = self.games[chunk][game]
+        ply = local - int(info["start"])
+        value = 1 if ply % 2 == int(info["winner"]) else -1
+        return int(record["mask"]), self.moves[int(record["action"])], value
+
+    def chunk_arrays(self, chunk):
+        """
+        Todas las posiciones de un chunk como arrays (máscaras, jugadas, valor
+        para el que mueve), para entrenar sin recorrer partida por partida.
+        """
+        games, plies = self.games[chunk], self.plies[chunk]
+        lengths = games["plies"].astype(np.int64)
+        ply = np.arange(plies.size) - np.repeat(games["start"].astype(np.int64), lengths)
+        winner = np.repeat(games["winner"].astype(np.int64), lengths)
+        values = np.where(ply % 2 == winner, 1, -1).astype(np.int8)
+        return plies["mask"], plies["action"], values
+
+
+def _record_games(games):
+    # En un proceso del pool de tournament: juega y devuelve (máscaras, jugadas, ganador)
+    records = []
+    env = tournament._worker_env
+    for game in games:
+        first, second = tournament._agent(game.first), tournament._agent(game.second)
+        tournament._seed_game(game.seed, (first, second))
+        obs = env.reset()
+        masks, actions = [], []
+        done = False
+        while not done:
+            agent = first if obs["current_player"] == 0 else second
+            action = tuple(int(x) for x in agent.act(obs))
+            masks.append(env.bitboard.mask)
+            actions.append(action)
+            obs, _, done, _ = env.step(action)
+        last_player = 1 - obs["current_player"]
+        records.append((masks, actions, obs["current_player"] if env.misere else last_player))
+    return records
+
+
+def generate_selfplay(path, first, second, games, board_size=6, misere=False, workers=None, seed=0,
+                      batch=50, chunk_games=100_000):
+    """
+    Juega `games` partidas entre dos AgentSpec (alternando quién empieza) en
+    procesos y las agrega al dataset en path.
+    """
+    schedule = tournament._pair_games(first.name, second.name, games, seed)
+    specs = [first, second] if first.name != second.name else [first]
+    env_kwargs = {"board_size": board_size, "misere": misere}
+    batches = [schedule[i:i + batch] for i in range(0, len(schedule), batch)]
+    with GameWriter(path, board_size, misere, chunk_games) as writer:
+        if workers == 1:
+            tournament._init_worker(env_kwargs, specs)
+            for games_batch in batches:
+                for record in _record_games(games_batch):
+                    writer.append(*record)
+            return
+        with ProcessPoolExecutor(workers, initializer=tournament._init_worker,
+                                 initargs=(env_kwargs, specs)) as pool:
+            for future in as_completed([pool.submit(_record_games, b) for b in batches]):
+                for record in future.result():
+                    writer.append(*record)
+
+
+def generate_random_selfplay(path, games, num_envs=4096, board_size=6, misere=False, seed=0,
+                             chunk_games=100_000):
+    """
+    Self-play aleatorio (segmentos maximales uniformes) con VecTacTixEnv:
+    juega num_envs partidas a la vez hasta completar `games`.
+    """
+    from vec_env import VecTacTixEnv
+
+    env = VecTacTixEnv(num_envs, board_size, misere, obs_mode="mask")
+    masks = env.reset(seed=seed)[0]
+    # Índice en move_list de (idx, start, end, is_row)
+    index = np.zeros((board_size, board_size, board_size, 2), dtype=np.uint16)
+    for i, (idx, start, end, is_row) in enumerate(move_list(board_size)):
+        index[idx, start, end, is_row] = i
+    # Historia de cada partida en curso (una partida dura a lo sumo size*size jugadas)
+    cells = board_size * board_size
+    history_masks = np.zeros((num_envs, cells), dtype=np.uint64)
+    history_actions = np.zeros((num_envs, cells), dtype=np.uint16)
+    plies = np.zeros(num_envs, dtype=np.int64)
+    envs = np.arange(num_envs)
+    written = 0
+    with GameWriter(path, board_size, misere, chunk_games) as writer:
+        while written < games:
+            actions = env.sample_actions()
+            history_masks[envs, plies] = masks
+            history_actions[envs, plies] = index[actions[:, 0], actions[:, 1], actions[:, 2], actions[:, 3]]
+            plies += 1
+            masks, _, done, _, infos = env.step(actions)
+            for i in np.flatnonzero(done)[:games - written]:
+                writer.append(history_masks[i, :plies[i]], history_actions[i, :plies[i]].tolist(),
+                              int(infos["winner"][i]))
+                written += 1
+            plies[done] = 0
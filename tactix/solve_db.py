@@ -0,0 +1,240 @@
+"""
+Base de datos de posiciones resueltas / libro de aperturas de TacTix.
+
+Formato del archivo (little-endian), pensado para abrirse con np.memmap:
+    cabecera de 32 bytes: magic b"TTXDB1\\0\\0", size (u1), misere (u1),
+        layout (u1), 5 bytes de relleno, count (u8), 8 bytes de relleno
+    layout DENSE:     count = 2**(size*size) entradas u2, indexadas por la máscara real
+    layout CANONICAL: count claves u8 ordenadas (máscaras canónicas) y luego count entradas u2
+
+Cada entrada u2 guarda el resultado en los 2 bits altos (UNKNOWN/WIN/LOSS para
+el jugador que mueve) y en los 14 bajos el índice de la mejor jugada en
+move_list(size), o NO_MOVE. En layout CANONICAL la jugada está en la
+orientación canónica y se traduce al tablero real al consultarla.
+"""
+
+import struct
+import numpy as np
+from bitboard import Bitboard, get_tables
+from movegen import generate_moves
+from symmetry import canonicalize, from_canonical_move, get_symmetry_tables
+
+
+MAGIC = b"TTXDB1\0\0"
+HEADER = struct.Struct("<8sBBB5sQ8s")
+DENSE, CANONICAL = 0, 1
+UNKNOWN, WIN, LOSS = 0, 1, 2
+NO_MOVE = 0x3FFF
+
+
+def move_list(size):
+    # Orden fijo de todas las jugadas posibles (índices de la base de datos)
+    return [(idx, start, end, is_row) for is_row in (0, 1) for idx in range(size)
+            for start in range(size) for end in range(start, size)]
+
+
+def encode_entry(outcome, move_index):
+    return (outcome << 14) | move_index
+
+
+def decode_entry(entry):
+    entry = int(entry)
+    return entry >> 14, entry & NO_MOVE
+
+
+def solve_board(size, misere=False):
+    """
+    Resuelve por completo un tablero pequeño (size <= 5) por análisis retrógrado.
+
+    Procesa las posiciones por cantidad de piezas, de menos a más, vectorizado
+    con numpy: una posición gana si alguna jugada lleva a una posición perdida.
+
+    Returns:
+        (win, best): arrays indexados por máscara con el resultado para el
+        jugador que mueve y el índice de la mejor jugada (NO_MOVE si no hay).
+    """
+    cells = size * size
+    if cells > 25:
+        raise ValueError("Solo se pueden resolver por completo tableros de hasta 5x5.")
+    tables = get_tables(size)
+    moves = move_list(size)
+    dtype = np.uint32
+    move_masks = np.array([tables.segment_masks[is_row][idx][start][end][0]
+                           for idx, start, end, is_row in moves], dtype=dtype)
+    # Jugada de una sola celda para cada casilla (la jugada de las posiciones perdidas)
+    single = np.array([moves.index((c // size, c % size, c % size, 1)) for c in range(cells)], dtype=np.uint16)
+
+    total = 1 << cells
+    all_masks = np.arange(total, dtype=dtype)
+    counts = np.bitwise_count(all_masks)
+    del all_masks
+    win = np.zeros(total, dtype=bool)
+    best = np.full(total, NO_MOVE, dtype=np.uint16)
+    win[0] = misere  # tablero vacío: en misère el rival sacó la última y pierde
+
+    for k in range(1, cells + 1):
+        layer = np.flatnonzero(counts == k).astype(dtype)
+        layer_win = np.zeros(layer.size, dtype=bool)
+        layer_best = np.full(layer.size, NO_MOVE, dtype=np.uint16)
+        for move_index, move_mask in enumerate(move_masks):
+            candidates = np.flatnonzero(((layer & move_mask) == move_mask) & ~layer_win)
+            if candidates.size == 0:
+                continue
+            winning = candidates[~win[layer[candidates] ^ move_mask]]
+            layer_win[winning] = True
+            layer_best[winning] = move_index
+        losing = ~layer_win
+        lowest = layer[losing] & (~layer[losing] + dtype(1))
+        layer_best[losing] = single[np.bitwise_count(lowest - dtype(1))]
+        win[layer] = layer_win
+        best[layer] = layer_best
+    return win, best
+
+
+def canonical_masks(masks, size):
+    # Forma canónica de un array de máscaras (mínimo entre las 8 simetrías), vectorizado
+    tables = get_symmetry_tables(size)
+    masks = masks.astype(np.uint64)
+    full_line = np.uint64(tables.full_line)
+    rows = [(masks >> np.uint64(r * size)) & full_line for r in range(size)]
+    canon = masks.copy()
+    for k in range(1, 8):
+        image = np.zeros_like(masks)
+        for r in range(size):
+            image |= np.asarray(tables.row_images[k][r], dtype=np.uint64)[rows[r]]
+        np.minimum(canon, image, out=canon)
+    return canon
+
+
+def write_database(path, size, misere, layout, entries, keys=None):
+    entries = np.ascontiguousarray(entries, dtype="<u2")
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, size, int(misere), layout, b"\0" * 5, entries.size, b"\0" * 8))
+        if layout == CANONICAL:
+            f.write(np.ascontiguousarray(keys, dtype="<u8").tobytes())
+        f.write(entries.tobytes())
+
+
+def build_solve_database(path, size, misere=False, layout=DENSE):
+    """
+    Resuelve un tablero de 4x4 o 5x5 y lo guarda en path.
+
+    layout DENSE da consulta O(1) indexando por la máscara real; CANONICAL
+    guarda solo una posición por clase de simetría (unas 8 veces menos
+    entradas) a cambio de canonicalizar y hacer búsqueda binaria al consultar.
+    """
+    win, best = solve_board(size, misere)
+    outcome = np.where(win, WIN, LOSS).astype(np.uint16)
+    outcome[0] = UNKNOWN  # tablero vacío: la partida ya terminó
+    entries = (outcome << 14) | best
+    if layout == DENSE:
+        write_database(path, size, misere, DENSE, entries)
+    else:
+        masks = np.arange(1 << (size * size), dtype=np.uint64)
+        keep = canonical_masks(masks, size) == masks
+        write_database(path, size, misere, CANONICAL, entries[keep], keys=masks[keep])
+
+
+def build_opening_book(path, agent, size=6, plies=2, misere=False, all_moves=True):
+    """
+    Libro de aperturas parcial: todas las posiciones canónicas alcanzables en
+    hasta `plies` jugadas desde el tablero lleno, con la jugada que elige `agent`.
+
+    El resultado queda como UNKNOWN salvo que el agente tenga un solver y la
+    posición ya esté dentro de su umbral.
+    """
+    moves = move_list(size)
+    move_index = {move: i for i, move in enumerate(moves)}
+    frontier = {Bitboard(size).mask}
+    positions = set(frontier)
+    for _ in range(plies):
+        following = set()
+        for mask in frontier:
+            state = Bitboard(size, mask)
+            for action in generate_moves(state, maximal=not all_moves):
+                state.apply(action)
+                if not state.is_empty():
+                    following.add(canonicalize(state.mask, size)[0])
+                state.undo()
+        following -= positions
+        positions |= following
+        frontier = following
+
+    keys = np.array(sorted(positions), dtype=np.uint64)
+    entries = np.empty(keys.size, dtype=np.uint16)
+    for i, key in enumerate(keys):
+        state = Bitboard(size, int(key))
+        action = agent.act({"board": state.to_array(), "current_player": 0})
+        outcome = UNKNOWN
+        solver = getattr(agent, "solver", None)
+        if solver is not None and state.count() <= agent.endgame_threshold:
+            outcome = WIN if solver.is_win(state.mask) else LOSS
+        entries[i] = encode_entry(outcome, move_index[tuple(int(x) for x in action)])
+    write_database(path, size, misere, CANONICAL, entries, keys=keys)
+
+
+class SolveDatabase:
+    """
+    Lector de una base de datos / libro de aperturas, mapeado en memoria.
+
+    lookup(state) devuelve (resultado, acción) o None si la posición no está.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, size, misere, layout, _, count, _ = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es una base de datos TacTix.")
+        self.path = path
+        self.size = size
+        self.misere = bool(misere)
+        self.layout = layout
+        self.count = count
+        self.moves = move_list(size)
+        offset = HEADER.size
+        if layout == CANONICAL:
+            self.keys = np.memmap(path, dtype="<u8", mode="r", offset=offset, shape=(count,))
+            offset += 8 * count
+        else:
+            self.keys = None
+        self.entries = np.memmap(path, dtype="<u2", mode="r", offset=offset, shape=(count,))
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, state):
+        if state.size != self.size:
+            return None
+        if self.layout == DENSE:
+            outcome, move = decode_entry(self.entries[state.mask])
+            sym = 0
+        else:
+            canon, sym = canonicalize(state.mask, self.size)
+            i = int(np.searchsorted(self.keys, np.uint64(canon)))
+            if i >= self.count or int(self.keys[i]) != canon:
+                return None
+            outcome, move = decode_entry(self.entries[i])
+        if move == NO_MOVE:
+            return outcome, None
+        return outcome, from_canonical_move(self.moves[move], sym, self.size)
+
+    def best_move(self, state):
+        found = self.lookup(state)
+        return found[1] if found is not None else None
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Resuelve tableros chicos de TacTix.")
+    parser.add_argument("size", type=int, choices=[2, 3, 4, 5])
+    parser.add_argument("path")
+    parser.add_argument("--misere", action="store_true")
+    parser.add_argument("--canonical", action="store_true", help="guardar solo posiciones canónicas")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build_solve_database(args.path, args.size, args.misere, CANONICAL if args.canonical else DENSE)
+    db = SolveDatabase(args.path)
+    print(f"{len(db)} entradas en {time.perf_counter() - start:.1f}s")
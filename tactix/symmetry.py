@@ -0,0 +1,111 @@
+from functools import lru_cache
+
+# Las 8 simetrías diedrales del tablero como funciones (r, c) -> (r', c')
+TRANSFORMS = (
+    lambda r, c, n: (r, c),                  # identidad
+    lambda r, c, n: (c, n - 1 - r),          # rotación 90
+    lambda r, c, n: (n - 1 - r, n - 1 - c),  # rotación 180
+    lambda r, c, n: (n - 1 - c, r),          # rotación 270
+    lambda r, c, n: (r, n - 1 - c),          # espejo horizontal
+    lambda r, c, n: (n - 1 - r, c),          # espejo vertical
+    lambda r, c, n: (c, r),                  # transpuesta
+    lambda r, c, n: (n - 1 - c, n - 1 - r),  # anti-transpuesta
+)
+INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+SWAPS_AXES = (False, True, False, True, False, False, True, True)
+
+
+class SymmetryTables:
+    """
+    row_images[k][r][occ] es la imagen bajo la simetría k de la fila r con
+    ocupación occ, así que transformar un tablero cuesta `size` búsquedas.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.full_line = (1 << size) - 1
+        self.row_images = []
+        for transform in TRANSFORMS:
+            per_row = []
+            for r in range(size):
+                images = []
+                for occ in range(1 << size):
+                    image = 0
+                    for c in range(size):
+                        if occ >> c & 1:
+                            rr, cc = transform(r, c, size)
+                            image |= 1 << (rr * size + cc)
+                    images.append(image)
+                per_row.append(images)
+            self.row_images.append(per_row)
+
+
+@lru_cache(maxsize=None)
+def get_symmetry_tables(size):
+    return SymmetryTables(size)
+
+
+def transform_mask(mask, k, size):
+    tables = get_symmetry_tables(size)
+    full_line, images = tables.full_line, tables.row_images[k]
+    out = 0
+    for r in range(size):
+        out |= images[r][(mask >> (r * size)) & full_line]
+    return out
+
+
+def canonicalize(mask, size):
+    """
+    Devuelve (canónica, k): la menor imagen de la máscara entre las 8 simetrías
+    y la simetría k que lleva el tablero real a esa forma canónica.
+    """
+    tables = get_symmetry_tables(size)
+    full_line = tables.full_line
+    rows = [(mask >> (r * size)) & full_line for r in range(size)]
+    best, best_k = mask, 0
+    for k in range(1, 8):
+        images = tables.row_images[k]
+        out = 0
+        for r in range(size):
+            out |= images[r][rows[r]]
+        if out < best:
+            best, best_k = out, k
+    return best, best_k
+
+
+@lru_cache(maxsize=None)
+def _move_maps(size):
+    maps = []
+    for k, transform in enumerate(TRANSFORMS):
+        mapping = {}
+        for is_row in (0, 1):
+            for idx in range(size):
+                for start in range(size):
+                    for end in range(start, size):
+                        if is_row:
+                            a, b = transform(idx, start, size), transform(idx, end, size)
+                        else:
+                            a, b = transform(start, idx, size), transform(end, idx, size)
+                        new_is_row = is_row ^ SWAPS_AXES[k]
+                        if new_is_row:
+                            move = (a[0], min(a[1], b[1]), max(a[1], b[1]), 1)
+                        else:
+                            move = (a[1], min(a[0], b[0]), max(a[0], b[0]), 0)
+                        mapping[(idx, start, end, is_row)] = move
+        maps.append(mapping)
+    return maps
+
+
+def transform_move(action, k, size):
+    idx, start, end, is_row = action
+    return _move_maps(size)[k][(idx, start, end, 1 if is_row else 0)]
+
+
+def to_canonical_move(action, k, size):
+    # Jugada del tablero real -> orientación canónica
+    return transform_move(action, k, size)
+
+
+def from_canonical_move(action, k, size):
+    # Jugada guardada en orientación canónica -> tablero real
+    return transform_move(action, INVERSE[k], size)
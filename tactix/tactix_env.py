@@ -1,6 +1,7 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
+from bitboard import Bitboard
 
 class TacTixEnv(gym.Env):
     metadata = {"render.modes": ["human"]}
@@ -9,7 +10,7 @@ class TacTixEnv(gym.Env):
         super(TacTixEnv, self).__init__()
         self.board_size = board_size
         self.misere = misere  # True = misère (last move loses), False = normal
-        self.board = np.ones((board_size, board_size), dtype=np.int32)
+        self.bitboard = Bitboard(board_size)
         self.done = False
         self.current_player = 0  # 0 or 1
 
@@ -19,25 +20,28 @@ class TacTixEnv(gym.Env):
             "current_player": spaces.Discrete(2)
         })
 
+    @property
+    def board(self):
+        return self.bitboard.to_array()
+
+    @board.setter
+    def board(self, board):
+        self.bitboard = Bitboard.from_array(board)
+
     def reset(self):
-        self.board = np.ones((self.board_size, self.board_size), dtype=np.int32)
+        self.bitboard.reset()
         self.done = False
         self.current_player = 0
         return self._get_obs()
 
     def _get_obs(self):
         return {
-            "board": self.board.copy(),
+            "board": self.bitboard.to_array(),
             "current_player": self.current_player
         }
 
     def _valid_action(self, idx, start, end, is_row):
-        if not (0 <= idx < self.board_size and 0 <= start <= end < self.board_size):
-            return False
-        if is_row:
-            return np.all(self.board[idx, start:end+1] == 1)
-        else:
-            return np.all(self.board[start:end+1, idx] == 1)
+        return self.bitboard.is_valid((idx, start, end, is_row))
 
     def step(self, action):
         idx, start, end, is_row = action
@@ -46,12 +50,9 @@ class TacTixEnv(gym.Env):
         if not self._valid_action(idx, start, end, is_row):
             raise ValueError("Invalid action.")
 
-        if is_row:
-            self.board[idx, start:end+1] = 0
-        else:
-            self.board[start:end+1, idx] = 0
+        self.bitboard.apply((idx, start, end, is_row))
 
-        if np.count_nonzero(self.board) == 0:
+        if self.bitboard.is_empty():
             self.done = True
             reward = -1 if self.misere else 1  # Misère: last move loses
         else:
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos se importan por nombre desde la carpeta del proyecto (from agent import Agent)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
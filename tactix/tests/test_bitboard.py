@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from bitboard import Bitboard
+from tactix_env import TacTixEnv
+
+
+def random_board(size, rng, density=0.6):
+    return (rng.random((size, size)) < density).astype(np.int32)
+
+
+def array_valid(board, idx, start, end, is_row):
+    # TacTixEnv._valid_action original, sobre el arreglo
+    if not (0 <= idx < board.shape[0] and 0 <= start <= end < board.shape[0]):
+        return False
+    if is_row:
+        return bool(np.all(board[idx, start:end + 1] == 1))
+    return bool(np.all(board[start:end + 1, idx] == 1))
+
+
+def array_apply(board, action):
+    idx, start, end, is_row = action
+    board = board.copy()
+    if is_row:
+        board[idx, start:end + 1] = 0
+    else:
+        board[start:end + 1, idx] = 0
+    return board
+
+
+def all_actions(size):
+    return [(idx, start, end, is_row) for is_row in (0, 1) for idx in range(size)
+            for start in range(size) for end in range(size)]
+
+
+@pytest.mark.parametrize("size", [3, 4, 6, 7])
+def test_array_round_trip(size):
+    rng = np.random.default_rng(size)
+    for _ in range(50):
+        board = random_board(size, rng)
+        state = Bitboard.from_array(board)
+        np.testing.assert_array_equal(state.to_array(), board)
+        assert state.count() == board.sum()
+        assert state.is_empty() == (board.sum() == 0)
+
+
+@pytest.mark.parametrize("size", [3, 4, 6])
+def test_apply_and_undo_match_the_array(size):
+    rng = np.random.default_rng(size)
+    for _ in range(20):
+        board = random_board(size, rng)
+        state = Bitboard.from_array(board)
+        for action in all_actions(size):
+            assert state.is_valid(action) == array_valid(board, *action)
+            if not state.is_valid(action):
+                continue
+            state.apply(action)
+            np.testing.assert_array_equal(state.to_array(), array_apply(board, action))
+            # La máscara traspuesta incremental es la de recalcularla
+            assert state.tmask == Bitboard(size, state.mask).tmask
+            state.undo()
+            np.testing.assert_array_equal(state.to_array(), board)
+
+
+def test_env_game_matches_the_array():
+    rng = np.random.default_rng(0)
+    for misere in (False, True):
+        env = TacTixEnv(board_size=5, misere=misere)
+        obs = env.reset()
+        board = np.ones((5, 5), dtype=np.int32)
+        done = False
+        while not done:
+            legal = [a for a in all_actions(5) if array_valid(board, *a)]
+            action = legal[rng.integers(len(legal))]
+            obs, reward, done, _ = env.step(action)
+            board = array_apply(board, action)
+            np.testing.assert_array_equal(obs["board"], board)
+        assert reward == (-1 if misere else 1)
+        with pytest.raises(ValueError):
+            env.step((0, 0, 0, 1))
@@ -0,0 +1,20 @@
+import pytest
+
+import heuristics
+from benchmark import position_suite
+from expectimax_agent import ExpectimaxTacTixAgent
+from tactix_env import TacTixEnv
+
+
+@pytest.mark.parametrize("misere", [False, True])
+@pytest.mark.parametrize("pruning", ["star1", "star2"])
+def test_pruning_matches_expectimax_with_the_solver(pruning, misere):
+    # Con el solver las cotas mezclan las del evaluador y ±WIN_SCORE según el subárbol
+    env = TacTixEnv(board_size=5, misere=misere)
+    for position in position_suite(board_size=5, count=6, seed=7, max_plies=5):
+        values = {}
+        for mode in (None, pruning):
+            agent = ExpectimaxTacTixAgent(env, depth=3, pruning=mode, cache_size_bits=None, endgame_threshold=8)
+            state = heuristics.ScoredBitboard(position.size, position.mask)
+            values[mode] = [agent.search_move(state, action, 3) for action in agent.get_valid_actions(state)]
+        assert values[pruning] == pytest.approx(values[None], abs=1e-6)
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from bitboard import Bitboard
+from movegen import generate_moves
+
+
+def array_moves(board):
+    # get_valid_actions original de los agentes: segmentos maximales, columnas primero
+    actions = []
+    size = board.shape[0]
+    for is_row in [0, 1]:
+        for idx in range(size):
+            line = board[idx, :] if is_row else board[:, idx]
+            start = None
+            for i in range(size):
+                if line[i] == 1:
+                    if start is None:
+                        start = i
+                elif start is not None:
+                    actions.append((idx, start, i - 1, is_row))
+                    start = None
+            if start is not None:
+                actions.append((idx, start, size - 1, is_row))
+    return actions
+
+
+def array_segments(board):
+    # Todas las jugadas que aceptaba TacTixEnv._valid_action, en el mismo orden
+    size = board.shape[0]
+    return [(idx, start, end, is_row) for is_row in (0, 1) for idx in range(size)
+            for start in range(size) for end in range(start, size)
+            if np.all((board[idx, start:end + 1] if is_row else board[start:end + 1, idx]) == 1)]
+
+
+@pytest.mark.parametrize("size", [3, 4, 6, 7])
+def test_generate_moves_matches_the_array_generator(size):
+    rng = np.random.default_rng(size)
+    for density in (0.3, 0.6, 0.9, 1.0):
+        for _ in range(30):
+            board = (rng.random((size, size)) < density).astype(np.int32)
+            state = Bitboard.from_array(board)
+            assert generate_moves(state) == array_moves(board)
+            assert generate_moves(state, maximal=False) == array_segments(board)
+
+
+def test_generate_moves_on_an_empty_board():
+    assert generate_moves(Bitboard(4, 0)) == []
+    assert generate_moves(Bitboard(4, 0), maximal=False) == []
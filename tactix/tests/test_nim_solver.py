@@ -0,0 +1,77 @@
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+from bitboard import Bitboard
+from minimax_agent import MinimaxTacTixAgent, SearchTimeout
+from movegen import generate_moves
+from nim_solver import CHECK_INTERVAL, EndgameSolver, components
+from tactix_env import TacTixEnv
+
+
+def brute_force(size, misere):
+    # Gana quien mueve si alguna jugada (cualquier sub-segmento) deja al rival perdido
+    @lru_cache(maxsize=None)
+    def win(mask):
+        if mask == 0:
+            return misere
+        state = Bitboard(size, mask)
+        return any(not win(mask ^ state.move_masks(action)[0]) for action in generate_moves(state, maximal=False))
+    return win
+
+
+def random_masks(size, count, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        bits = rng.random(size * size) < rng.uniform(0.2, 0.8)
+        yield sum(1 << int(i) for i in np.flatnonzero(bits))
+
+
+@pytest.mark.parametrize("misere", [False, True])
+def test_solver_matches_brute_force_3x3(misere):
+    solver, win = EndgameSolver(3, misere), brute_force(3, misere)
+    for mask in range(1 << 9):
+        assert solver.is_win(mask) == win(mask), mask
+
+
+@pytest.mark.parametrize("misere", [False, True])
+def test_solver_matches_brute_force_4x4(misere):
+    solver, win = EndgameSolver(4, misere), brute_force(4, misere)
+    for mask in random_masks(4, 200, seed=misere):
+        assert sum(components(mask, 4)) == mask
+        assert solver.is_win(mask) == win(mask), mask
+        state = Bitboard(4, mask)
+        if mask and win(mask):
+            action = solver.best_move(state)
+            assert state.mask == mask
+            assert not win(mask ^ state.move_masks(action)[0])
+
+
+@pytest.mark.parametrize("misere", [False, True])
+def test_interrupted_solve_keeps_the_solver_valid(misere):
+    def check():
+        raise SearchTimeout()
+
+    solver, win = EndgameSolver(4, misere, check=check), brute_force(4, misere)
+    state = Bitboard(4)
+    with pytest.raises(SearchTimeout):
+        solver.best_move(state)
+    assert state.mask == Bitboard(4).mask
+    assert solver.nodes == CHECK_INTERVAL
+    # Lo memorizado antes del corte son valores completos
+    solver.check = None
+    for mask in random_masks(4, 100, seed=2):
+        assert solver.is_win(mask) == win(mask), mask
+
+
+def test_root_solve_respects_the_node_budget():
+    # 20 piezas en misère 6x6: resolverlas lleva muchos más nodos que el presupuesto
+    board = np.ones((6, 6), dtype=np.int32)
+    board[:2] = 0
+    board[2, :2] = 0
+    env = TacTixEnv(board_size=6, misere=True)
+    agent = MinimaxTacTixAgent(env, node_limit=100, endgame_threshold=36)
+    action = agent.act({"board": board, "current_player": 0})
+    assert Bitboard.from_array(board).is_valid(action)
+    assert agent.solver.nodes <= CHECK_INTERVAL
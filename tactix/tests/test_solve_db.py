@@ -0,0 +1,42 @@
+import pytest
+
+from bitboard import Bitboard
+from expectimax_agent import ExpectimaxTacTixAgent
+from minimax_agent import MinimaxTacTixAgent
+from nim_solver import EndgameSolver
+from solve_db import CANONICAL, DENSE, LOSS, UNKNOWN, WIN, SolveDatabase, build_solve_database
+from tactix_env import TacTixEnv
+
+
+@pytest.mark.parametrize("layout", [DENSE, CANONICAL])
+@pytest.mark.parametrize("misere", [False, True])
+def test_database_matches_the_solver(tmp_path, layout, misere):
+    path = str(tmp_path / "db.bin")
+    build_solve_database(path, 3, misere, layout)
+    db, solver = SolveDatabase(path), EndgameSolver(3, misere)
+    assert db.misere == misere
+    assert db.lookup(Bitboard(3, 0)) == (UNKNOWN, None)
+    for mask in range(1, 1 << 9):
+        state = Bitboard(3, mask)
+        outcome, action = db.lookup(state)
+        assert outcome == (WIN if solver.is_win(mask) else LOSS), mask
+        assert state.is_valid(action)
+        if outcome == WIN:
+            assert not solver.is_win(mask ^ state.move_masks(action)[0])
+
+
+@pytest.mark.parametrize("agent_class", [MinimaxTacTixAgent, ExpectimaxTacTixAgent])
+@pytest.mark.parametrize("misere", [False, True])
+def test_agents_reject_a_database_of_the_other_rules(tmp_path, agent_class, misere):
+    path = str(tmp_path / "db.bin")
+    build_solve_database(path, 3, misere)
+    agent_class(TacTixEnv(board_size=3, misere=misere), opening_book=path)
+    with pytest.raises(ValueError):
+        agent_class(TacTixEnv(board_size=3, misere=not misere), opening_book=path)
+
+
+def test_rejects_a_file_that_is_not_a_database(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        SolveDatabase(str(path))
@@ -0,0 +1,39 @@
+import json
+
+from random_agent import RandomTacTixAgent
+from tournament import AgentSpec, load_results, round_robin, run_tournament
+
+SPECS = [AgentSpec("a", RandomTacTixAgent), AgentSpec("b", RandomTacTixAgent), AgentSpec("c", RandomTacTixAgent)]
+
+
+def outcomes(results):
+    return {r["id"]: (r["winner"], r["plies"]) for r in results}
+
+
+def test_resume_after_a_truncated_line(tmp_path):
+    schedule = round_robin([spec.name for spec in SPECS], 4)
+    full = run_tournament(SPECS, schedule, board_size=4, workers=1, progress_every=0)
+
+    # Checkpoint de una corrida interrumpida a mitad de escribir el sexto resultado
+    checkpoint = tmp_path / "results.jsonl"
+    lines = [json.dumps(r) + "\n" for r in full[:6]]
+    checkpoint.write_text("".join(lines[:5]) + lines[5][:len(lines[5]) // 2])
+    assert len(load_results(str(checkpoint))) == 5
+
+    resumed = run_tournament(SPECS, schedule, board_size=4, workers=1, checkpoint=str(checkpoint),
+                             progress_every=0)
+    assert outcomes(resumed) == outcomes(full)
+    saved = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert sorted(r["id"] for r in saved) == sorted(game.id for game in schedule)
+
+
+def test_finished_checkpoint_plays_nothing(tmp_path):
+    schedule = round_robin(["a", "b"], 2)
+    checkpoint = str(tmp_path / "results.jsonl")
+    first = run_tournament(SPECS, schedule, board_size=4, workers=1, checkpoint=checkpoint, progress_every=0)
+    with open(checkpoint) as f:
+        size = len(f.read())
+    again = run_tournament(SPECS, schedule, board_size=4, workers=1, checkpoint=checkpoint, progress_every=0)
+    assert outcomes(again) == outcomes(first)
+    with open(checkpoint) as f:
+        assert len(f.read()) == size
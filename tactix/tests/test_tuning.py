@@ -0,0 +1,31 @@
+import json
+
+from tournament import gauntlet
+from tuning import DEFAULT_THETA, FitnessCache, HeuristicTuner
+
+
+def test_paired_gauntlet_seeds_do_not_depend_on_the_challenger():
+    seeds = [[game.seed for game in gauntlet(name, ["trainer"], 6, seed=7, paired=True)]
+             for name in ("theta0", "theta1")]
+    assert seeds[0] == seeds[1]
+    unpaired = [[game.seed for game in gauntlet(name, ["trainer"], 6, seed=7)] for name in ("theta0", "theta1")]
+    assert unpaired[0] != unpaired[1]
+
+
+def test_equal_thetas_get_equal_fitness():
+    # Con las mismas partidas, dos vectores iguales tienen que sacar exactamente lo mismo
+    # (con semillas por nombre, esta semilla da 0.5 contra 0.125)
+    tuner = HeuristicTuner(games=8, difficulty=0.3, board_size=4, workers=1,
+                           agent_kwargs={"depth": 1, "endgame_threshold": None})
+    f_plus, f_minus = tuner.fitness([DEFAULT_THETA, DEFAULT_THETA], seed=1)
+    assert f_plus == f_minus
+
+
+def test_cache_ignores_entries_from_unpaired_runs(tmp_path):
+    path = tmp_path / "cache.json"
+    old_key = json.dumps([[round(float(x), 2) for x in DEFAULT_THETA], 3, 8])
+    path.write_text(json.dumps({old_key: 0.9}))
+    cache = FitnessCache(str(path))
+    assert cache.get(DEFAULT_THETA, 3, 8) is None
+    cache.put(DEFAULT_THETA, 3, 8, 0.5)
+    assert FitnessCache(str(path)).get(DEFAULT_THETA, 3, 8) == 0.5
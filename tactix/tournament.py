@@ -0,0 +1,368 @@
+"""
+Torneos entre agentes en paralelo y reanudables.
+
+Cada agente se describe con un AgentSpec (nombre, clase y parámetros) para
+que cada proceso construya el suyo. Las partidas se planifican de antemano con
+un id estable; los resultados se agregan como líneas JSON al archivo de
+checkpoint a medida que terminan, así que al volver a correr con el mismo
+archivo solo se juegan las partidas que faltan. Los agentes de búsqueda
+guardan además los totales de su SearchStats en cada resultado (search_summary).
+"""
+
+import json
+import math
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from search_stats import add_totals, summarize_totals
+from tactix_env import TacTixEnv
+
+AgentSpec = namedtuple("AgentSpec", ["name", "agent_class", "kwargs"], defaults=[{}])
+Game = namedtuple("Game", ["id", "first", "second", "seed"])
+
+
+def _game_seed(base_seed, game_id):
+    # Semilla estable por partida (independiente del orden y del proceso que la juegue)
+    return random.Random(f"{base_seed}:{game_id}").randrange(1 << 31)
+
+
+def _pair_games(a, b, games, base_seed, paired=False):
+    # Alterna quién empieza: en TacTix el primer jugador no está en igualdad de condiciones
+    schedule = []
+    for k in range(games):
+        first, second = (a, b) if k % 2 == 0 else (b, a)
+        game_id = f"{a}|{b}|{k}"
+        # paired: la semilla depende solo de (base_seed, k), no de los nombres
+        schedule.append(Game(game_id, first, second, _game_seed(base_seed, k if paired else game_id)))
+    return schedule
+
+
+def round_robin(names, games_per_pair, seed=0):
+    """Todas las parejas entre sí, games_per_pair partidas por pareja."""
+    schedule = []
+    for i, a in enumerate(names):
+        for b in names[i + 1:]:
+            schedule.extend(_pair_games(a, b, games_per_pair, seed))
+    return schedule
+
+
+def gauntlet(challenger, opponents, games_per_opponent, seed=0, paired=False):
+    """
+    El retador contra cada rival, games_per_opponent partidas contra cada uno.
+
+    Con paired=True la partida k usa la misma semilla para cualquier retador,
+    así dos retadores con el mismo seed juegan las mismas partidas.
+    """
+    schedule = []
+    for opponent in opponents:
+        schedule.extend(_pair_games(challenger, opponent, games_per_opponent, seed, paired))
+    return schedule
+
+
+def play_game(env, first, second):
+    """
+    Juega una partida sin imprimir nada.
+
+    Returns:
+        (ganador, jugadas): 0 si gana `first`, 1 si gana `second`.
+    """
+    obs = env.reset()
+    done = False
+    plies = 0
+    while not done:
+        agent = first if obs["current_player"] == 0 else second
+        obs, _, done, _ = env.step(agent.act(obs))
+        plies += 1
+    last_player = 1 - obs["current_player"]
+    winner = obs["current_player"] if env.misere else last_player
+    return winner, plies
+
+
+# Estado de cada proceso: entorno y agentes construidos una vez y reutilizados
+_worker_env = None
+_worker_specs = None
+_worker_agents = {}
+
+
+def _init_worker(env_kwargs, specs):
+    global _worker_env, _worker_specs
+    _worker_env = TacTixEnv(**env_kwargs)
+    _worker_specs = {spec.name: spec for spec in specs}
+    _worker_agents.clear()
+
+
+def _agent(name):
+    agent = _worker_agents.get(name)
+    if agent is None:
+        spec = _worker_specs[name]
+        agent = _worker_agents[name] = spec.agent_class(_worker_env, **spec.kwargs)
+    return agent
+
+
+def _seed_game(seed, agents):
+    random.seed(seed)
+    np.random.seed(seed)
+    for i, agent in enumerate(agents):
+        # Agentes con generador propio (MCTSTacTixAgent)
+        if hasattr(agent, "rng"):
+            agent.rng = random.Random(seed + i)
+        if hasattr(agent, "np_rng"):
+            agent.np_rng = np.random.default_rng(seed + i)
+
+
+def _run_game(game):
+    first, second = _agent(game.first), _agent(game.second)
+    _seed_game(game.seed, (first, second))
+    # Agentes de búsqueda: totales de SearchStats de la partida
+    searchers = {name: agent for name, agent in ((game.first, first), (game.second, second))
+                 if hasattr(agent, "stats")}
+    for agent in searchers.values():
+        agent.stats.reset_totals()
+    start = time.perf_counter()
+    winner, plies = play_game(_worker_env, first, second)
+    result = {
+        "id": game.id,
+        "first": game.first,
+        "second": game.second,
+        "seed": game.seed,
+        "winner": game.first if winner == 0 else game.second,
+        "plies": plies,
+        "seconds": round(time.perf_counter() - start, 4),
+    }
+    if searchers:
+        result["stats"] = {name: agent.stats.totals for name, agent in searchers.items()}
+    return result
+
+
+def load_results(path):
+    # Resultados ya guardados; saltea las líneas cortadas por una interrupción
+    results = []
+    if path is None or not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return results
+
+
+def _truncate_partial_line(path):
+    # Quita una última línea sin terminar para que el próximo resultado no se pegue a ella
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def run_tournament(specs, schedule, board_size=6, misere=False, workers=None, checkpoint=None,
+                   progress_every=100):
+    """
+    Juega las partidas de `schedule` (round_robin / gauntlet) en un pool de procesos.
+
+    Parameters:
+        specs: Lista de AgentSpec con todos los nombres usados en schedule.
+        schedule: Lista de Game.
+        workers: Procesos (por defecto os.cpu_count(); 1 juega en este proceso).
+        checkpoint: Archivo JSONL donde se agregan los resultados; si ya
+            existe se saltean las partidas registradas.
+        progress_every: Cada cuántas partidas imprimir el avance (0 no imprime).
+
+    Returns:
+        Lista de resultados (dicts) de todas las partidas del schedule.
+    """
+    env_kwargs = {"board_size": board_size, "misere": misere}
+    ids = {game.id for game in schedule}
+    results = [r for r in load_results(checkpoint) if r["id"] in ids]
+    done = {r["id"] for r in results}
+    pending = [game for game in schedule if game.id not in done]
+    if not pending:
+        return results
+    workers = workers or os.cpu_count()
+    out = None
+    if checkpoint is not None:
+        _truncate_partial_line(checkpoint)
+        out = open(checkpoint, "a")
+    start = time.perf_counter()
+
+    def record(result):
+        results.append(result)
+        if out is not None:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+        played = len(results) - len(done)
+        if progress_every and played % progress_every == 0:
+            rate = played / (time.perf_counter() - start)
+            print(f"{len(results)}/{len(schedule)} partidas ({rate:.1f}/s)", flush=True)
+
+    try:
+        if workers == 1:
+            _init_worker(env_kwargs, specs)
+            for game in pending:
+                record(_run_game(game))
+        else:
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(env_kwargs, specs)) as pool:
+                for future in as_completed([pool.submit(_run_game, game) for game in pending]):
+                    record(future.result())
+    finally:
+        if out is not None:
+            out.close()
+    return results
+
+
+def wilson_interval(wins, games, z=1.96):
+    # Intervalo de confianza de Wilson para una proporción
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denom = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denom
+    half = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+    return center - half, center + half
+
+
+def _bradley_terry(wins, iterations=200):
+    # Fuerzas por máxima verosimilitud (algoritmo MM); wins[i][j] = victorias de i sobre j
+    n = len(wins)
+    strength = np.ones(n)
+    games = wins + wins.T
+    total_wins = wins.sum(axis=1)
+    for _ in range(iterations):
+        denom = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        strength = np.where(denom > 0, total_wins / np.where(denom > 0, denom, 1), strength)
+        strength /= np.exp(np.log(strength).mean())
+    return 400 * np.log10(strength)
+
+
+def elo_ratings(results, names=None, bootstrap=200, prior=0.5, seed=0):
+    """
+    Ratings Elo (media 0) ajustados con Bradley-Terry sobre todas las partidas,
+    con intervalo de 95% por bootstrap paramétrico de cada pareja.
+
+    prior agrega medio triunfo y media derrota virtuales por pareja jugada
+    para que un 100% no dé rating infinito.
+
+    Returns:
+        Diccionario nombre -> (elo, bajo, alto).
+    """
+    names = names or sorted({r["first"] for r in results} | {r["second"] for r in results})
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    wins = np.zeros((n, n))
+    for r in results:
+        winner = index[r["winner"]]
+        loser = index[r["second"] if r["winner"] == r["first"] else r["first"]]
+        wins[winner, loser] += 1
+    games = wins + wins.T
+    played = games > 0
+    smoothed = wins + prior * played
+    elo = _bradley_terry(smoothed)
+
+    rng = np.random.default_rng(seed)
+    samples = []
+    rate = np.divide(smoothed, smoothed + smoothed.T, out=np.zeros((n, n)), where=played)
+    upper = np.triu(played, 1)
+    for _ in range(bootstrap):
+        resampled = np.zeros((n, n))
+        draws = rng.binomial(games[upper].astype(np.int64), rate[upper])
+        resampled[upper] = draws
+        resampled.T[upper] = games[upper] - draws
+        samples.append(_bradley_terry(resampled + prior * played))
+    low, high = np.percentile(samples, [2.5, 97.5], axis=0) if samples else (elo, elo)
+    return {name: (float(elo[i]), float(low[i]), float(high[i])) for name, i in index.items()}
+
+
+def summarize(results):
+    """
+    Tabla por agente: partidas, victorias, tasa con intervalo de Wilson, tasa
+    empezando primero / segundo y Elo con intervalo.
+    """
+    names = sorted({r["first"] for r in results} | {r["second"] for r in results})
+    elo = elo_ratings(results, names)
+    summary = {}
+    for name in names:
+        own = [r for r in results if name in (r["first"], r["second"])]
+        won = sum(r["winner"] == name for r in own)
+        as_first = [r for r in own if r["first"] == name]
+        as_second = [r for r in own if r["second"] == name]
+        summary[name] = {
+            "games": len(own),
+            "wins": won,
+            "win_rate": won / len(own) if own else 0.0,
+            "win_rate_ci": wilson_interval(won, len(own)),
+            "first_win_rate": sum(r["winner"] == name for r in as_first) / len(as_first) if as_first else None,
+            "second_win_rate": sum(r["winner"] == name for r in as_second) / len(as_second) if as_second else None,
+            "elo": elo[name][0],
+            "elo_ci": elo[name][1:],
+        }
+    return summary
+
+
+def search_summary(results):
+    """
+    Trabajo de búsqueda por agente en todas sus partidas (search_stats.summarize_totals):
+    nodos por jugada y por segundo, tasa de aciertos de la tabla, factor de
+    ramificación efectivo, etc. Sirve para comparar versiones de un mismo agente.
+    """
+    totals = {}
+    for r in results:
+        for name, agent_totals in r.get("stats", {}).items():
+            add_totals(totals.setdefault(name, {}), agent_totals)
+    return {name: summarize_totals(t) for name, t in sorted(totals.items())}
+
+
+def print_summary(summary):
+    print(f"{'agente':20s} {'partidas':>8s} {'victorias':>9s} {'tasa':>6s} {'IC 95%':>15s} {'Elo':>7s} {'IC 95%':>17s}")
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["elo"]):
+        low, high = s["win_rate_ci"]
+        elo_low, elo_high = s["elo_ci"]
+        print(f"{name:20s} {s['games']:8d} {s['wins']:9d} {s['win_rate']:6.3f} [{low:.3f}, {high:.3f}] "
+              f"{s['elo']:7.1f} [{elo_low:7.1f}, {elo_high:7.1f}]")
+
+
+def print_search_summary(summary):
+    print(f"{'agente':20s} {'jugadas':>8s} {'nodos/jug':>10s} {'nodos/s':>9s} {'s/jug':>7s} "
+          f"{'TT':>6s} {'EBF':>6s}")
+    for name, s in summary.items():
+        print(f"{name:20s} {s['moves']:8d} {s['nodes_per_move']:10.1f} {s['nodes_per_second']:9.0f} "
+              f"{s['seconds_per_move']:7.4f} {s['cache_hit_rate']:6.3f} {s['ebf']:6.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from minimax_agent import MinimaxTacTixAgent
+    from expectimax_agent import ExpectimaxTacTixAgent
+    from mcts_agent import MCTSTacTixAgent
+    from random_agent import RandomTacTixAgent
+    from trainer_agent import TrainerAgent
+
+    parser = argparse.ArgumentParser(description="Torneo entre agentes de TacTix.")
+    parser.add_argument("--games", type=int, default=20, help="partidas por pareja")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None, help="archivo JSONL para reanudar")
+    parser.add_argument("--gauntlet", default=None, help="nombre del retador (si no, todos contra todos)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    specs = [
+        AgentSpec("random", RandomTacTixAgent),
+        AgentSpec("trainer", TrainerAgent, {"difficulty": 0.8}),
+        AgentSpec("minimax", MinimaxTacTixAgent, {"depth": 3}),
+        AgentSpec("expectimax", ExpectimaxTacTixAgent, {"depth": 3}),
+        AgentSpec("mcts", MCTSTacTixAgent, {"playouts": 1000, "rollout_batch": 16}),
+    ]
+    names = [spec.name for spec in specs]
+    if args.gauntlet:
+        schedule = gauntlet(args.gauntlet, [n for n in names if n != args.gauntlet], args.games, args.seed)
+    else:
+        schedule = round_robin(names, args.games, args.seed)
+    results = run_tournament(specs, schedule, workers=args.workers, checkpoint=args.checkpoint)
+    print_summary(summarize(results))
+    print()
+    print_search_summary(search_summary(results))
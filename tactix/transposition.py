@@ -0,0 +1,94 @@
+EXACT, LOWER, UPPER = 0, 1, 2
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+
+
+class TranspositionTable:
+    """
+    Tabla de transposición acotada para la búsqueda alfa-beta.
+
+    La clave es la propia máscara del tablero (más el bit de quién juega), así
+    que no hay colisiones de clave: solo dos posiciones pueden competir por el
+    mismo casillero. El índice se obtiene con hashing de Fibonacci.
+
+    Cada casillero guarda profundidad, valor, tipo de cota (EXACT/LOWER/UPPER)
+    y la mejor jugada. Se reemplaza un casillero ocupado por otra posición solo
+    si la nueva entrada es al menos igual de profunda o la vieja pertenece a una
+    búsqueda anterior (ver new_search).
+    """
+
+    def __init__(self, size_bits=16):
+        self.size_bits = size_bits
+        self.capacity = 1 << size_bits
+        self._shift = 64 - size_bits
+        self.clear()
+
+    def clear(self):
+        capacity = self.capacity
+        self.keys = [None] * capacity
+        self.depths = [-1] * capacity
+        self.values = [0] * capacity
+        self.flags = [EXACT] * capacity
+        self.moves = [None] * capacity
+        self.ages = [0] * capacity
+        self.age = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.replacements = 0
+        self.rejected = 0
+
+    def new_search(self):
+        # Las entradas de búsquedas anteriores siguen sirviendo, pero pasan a ser reemplazables
+        self.age += 1
+
+    def index(self, key):
+        return (((key ^ (key >> 64)) * _GOLDEN) & _MASK64) >> self._shift
+
+    def probe(self, key):
+        i = self.index(key)
+        if self.keys[i] == key:
+            self.hits += 1
+            return self.depths[i], self.values[i], self.flags[i], self.moves[i]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value, flag, move=None):
+        i = self.index(key)
+        stored = self.keys[i]
+        if stored is not None and stored != key:
+            if self.ages[i] == self.age and depth < self.depths[i]:
+                self.rejected += 1
+                return
+            self.replacements += 1
+        elif stored == key and depth < self.depths[i] and self.ages[i] == self.age:
+            # La misma posición ya está resuelta a más profundidad en esta búsqueda
+            self.rejected += 1
+            return
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.values[i] = value
+        self.flags[i] = flag
+        self.moves[i] = move
+        self.ages[i] = self.age
+        self.stores += 1
+
+    def __len__(self):
+        return self.capacity - self.keys.count(None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "capacity": self.capacity,
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "replacements": self.replacements,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,158 @@
+"""
+Ajuste automático de los pesos de h() con SPSA.
+
+El vector de parámetros es (puntaje de segmentos de 1, 2, 3 y 4+ piezas,
+peso de h2). El fitness de un vector es la tasa de victorias de un
+MinimaxTacTixAgent con esos pesos en un mini-torneo contra TrainerAgent a
+dificultad fija, jugado en paralelo con tournament.run_tournament.
+"""
+
+import json
+import os
+import numpy as np
+import heuristics
+from evaluation import HeuristicEvaluator
+from minimax_agent import MinimaxTacTixAgent
+from trainer_agent import TrainerAgent
+from tournament import AgentSpec, gauntlet, run_tournament
+
+DEFAULT_THETA = (*heuristics.SEGMENT_WEIGHTS, heuristics.H2_WEIGHT)
+
+
+def evaluator_for(theta):
+    return HeuristicEvaluator(weights=tuple(theta[:-1]), h2_weight=theta[-1])
+
+
+class FitnessCache:
+    """
+    Resultados ya jugados por (parámetros redondeados, semilla, partidas), en
+    memoria y opcionalmente en un archivo JSON para retomar otra sesión.
+    """
+
+    def __init__(self, path=None, decimals=2):
+        self.path = path
+        self.decimals = decimals
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def key(self, theta, seed, games):
+        # "paired": partidas con semillas por (seed, k); no mezcla archivos de antes de gauntlet(paired=True)
+        return json.dumps(["paired", [round(float(x), self.decimals) for x in theta], seed, games])
+
+    def get(self, theta, seed, games):
+        return self.entries.get(self.key(theta, seed, games))
+
+    def put(self, theta, seed, games, fitness):
+        self.entries[self.key(theta, seed, games)] = fitness
+        if self.path is not None:
+            with open(self.path, "w") as f:
+                json.dump(self.entries, f)
+
+
+class HeuristicTuner:
+    """
+    SPSA (Spall) sobre los pesos de h(), maximizando la tasa de victorias.
+
+    En cada iteración se perturban todos los parámetros a la vez con signos
+    al azar y se juegan los dos mini-torneos (theta + c*delta, theta - c*delta)
+    con las mismas semillas, lo que reduce mucho el ruido de la diferencia.
+
+    Parameters:
+        games: Partidas por evaluación (alternando quién empieza).
+        difficulty: Dificultad de TrainerAgent.
+        agent_kwargs: Parámetros del MinimaxTacTixAgent evaluado.
+        a, c, A, alpha, gamma: Ganancias de SPSA (a_k = a / (k + 1 + A)^alpha,
+            c_k = c / (k + 1)^gamma).
+        bounds: Rango permitido de cada parámetro.
+        workers: Procesos para los mini-torneos.
+        cache: FitnessCache o ruta a su archivo.
+    """
+
+    def __init__(self, games=100, difficulty=0.9, agent_kwargs=None, a=20.0, c=0.5, A=5, alpha=0.602,
+                 gamma=0.101, bounds=(0.1, 20.0), board_size=6, workers=None, cache=None, seed=0):
+        self.games = games
+        self.difficulty = difficulty
+        self.agent_kwargs = agent_kwargs if agent_kwargs is not None else {"depth": 2, "endgame_threshold": None}
+        self.a, self.c, self.A, self.alpha, self.gamma = a, c, A, alpha, gamma
+        self.bounds = bounds
+        self.board_size = board_size
+        self.workers = workers
+        self.cache = cache if isinstance(cache, FitnessCache) else FitnessCache(cache)
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.history = []
+
+    def fitness(self, thetas, seed):
+        """Tasa de victorias contra TrainerAgent de cada vector, en un solo torneo paralelo."""
+        results = [self.cache.get(theta, seed, self.games) for theta in thetas]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending:
+            trainer = AgentSpec("trainer", TrainerAgent, {"difficulty": self.difficulty})
+            specs, schedule = [trainer], []
+            for i in pending:
+                name = f"theta{i}"
+                kwargs = dict(self.agent_kwargs, evaluator=evaluator_for(thetas[i]))
+                specs.append(AgentSpec(name, MinimaxTacTixAgent, kwargs))
+                # Semillas pareadas: cada vector juega las mismas partidas, sea cual sea su índice
+                schedule.extend(gauntlet(name, ["trainer"], self.games, seed, paired=True))
+            played = run_tournament(specs, schedule, board_size=self.board_size, workers=self.workers,
+                                    progress_every=0)
+            for i in pending:
+                name = f"theta{i}"
+                wins = sum(r["winner"] == name for r in played if name in (r["first"], r["second"]))
+                results[i] = wins / self.games
+                self.cache.put(thetas[i], seed, self.games, results[i])
+        return results
+
+    def step(self, theta, k):
+        c_k = self.c / (k + 1) ** self.gamma
+        a_k = self.a / (k + 1 + self.A) ** self.alpha
+        delta = self.rng.choice((-1.0, 1.0), size=theta.size)
+        low, high = self.bounds
+        plus = np.clip(theta + c_k * delta, low, high)
+        minus = np.clip(theta - c_k * delta, low, high)
+        f_plus, f_minus = self.fitness([plus, minus], seed=self.seed * 100_003 + k)
+        gradient = (f_plus - f_minus) / (2 * c_k * delta)
+        theta = np.clip(theta + a_k * gradient, low, high)
+        self.history.append({"iteration": k, "theta": theta.round(3).tolist(), "f_plus": f_plus, "f_minus": f_minus})
+        return theta
+
+    def tune(self, iterations=50, theta=DEFAULT_THETA, verbose=True):
+        """
+        Corre `iterations` pasos de SPSA desde theta.
+
+        Returns:
+            El vector final (array de 5: pesos de segmento y peso de h2).
+        """
+        theta = np.asarray(theta, dtype=float)
+        for k in range(iterations):
+            theta = self.step(theta, k)
+            if verbose:
+                last = self.history[-1]
+                print(f"{k + 1:3d} theta={last['theta']} f+={last['f_plus']:.3f} f-={last['f_minus']:.3f}",
+                      flush=True)
+        return theta
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ajuste SPSA de los pesos de h().")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--games", type=int, default=100, help="partidas por evaluación")
+    parser.add_argument("--difficulty", type=float, default=0.9)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--cache", default="tuning-cache.json")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tuner = HeuristicTuner(games=args.games, difficulty=args.difficulty,
+                           agent_kwargs={"depth": args.depth, "endgame_threshold": None},
+                           workers=args.workers, cache=args.cache, seed=args.seed)
+    theta = tuner.tune(args.iterations)
+    baseline, tuned = tuner.fitness([np.array(DEFAULT_THETA, dtype=float), theta], seed=-1)
+    print(f"pesos por defecto {DEFAULT_THETA}: {baseline:.3f}")
+    print(f"pesos ajustados {theta.round(2).tolist()}: {tuned:.3f}")
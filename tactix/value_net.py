@@ -0,0 +1,175 @@
+import numpy as np
+from evaluation import Evaluator
+from solve_db import canonical_masks
+
+
+def mask_features(masks, size):
+    # Una entrada por casilla (1.0 si hay pieza), sobre la forma canónica del tablero
+    masks = canonical_masks(np.asarray(masks, dtype=np.uint64), size)
+    shifts = np.arange(size * size, dtype=np.uint64)
+    return ((masks[:, None] >> shifts) & np.uint64(1)).astype(np.float32)
+
+
+class ValueNetwork:
+    """
+    Perceptrón multicapa chico (ReLU, salida tanh) que estima el resultado de
+    la partida para el jugador que mueve: +1 gana, -1 pierde.
+
+    Todo en numpy y float32; predict recibe un lote de máscaras.
+    """
+
+    def __init__(self, size=6, hidden=(64, 32), seed=0):
+        self.size = size
+        rng = np.random.default_rng(seed)
+        dims = [size * size, *hidden, 1]
+        self.weights = [(rng.standard_normal((a, b)) * np.sqrt(2 / a)).astype(np.float32)
+                        for a, b in zip(dims[:-1], dims[1:])]
+        self.biases = [np.zeros(b, dtype=np.float32) for b in dims[1:]]
+
+    def forward(self, x):
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            x = np.maximum(x @ w + b, 0)
+        return np.tanh(x @ self.weights[-1] + self.biases[-1])[:, 0]
+
+    def predict(self, masks):
+        return self.forward(mask_features(masks, self.size))
+
+    def _gradients(self, x, y):
+        # Error cuadrático medio; devuelve (pérdida, gradientes de pesos y sesgos)
+        activations = [x]
+        for w, b in zip(self.weights[:-1], self.biases[:-1]):
+            activations.append(np.maximum(activations[-1] @ w + b, 0))
+        out = np.tanh(activations[-1] @ self.weights[-1] + self.biases[-1])[:, 0]
+        error = out - y
+        delta = (2 * error / y.size * (1 - out * out))[:, None]
+        grad_w, grad_b = [], []
+        for layer in range(len(self.weights) - 1, -1, -1):
+            grad_w.append(activations[layer].T @ delta)
+            grad_b.append(delta.sum(axis=0))
+            if layer:
+                delta = (delta @ self.weights[layer].T) * (activations[layer] > 0)
+        return float(np.mean(error * error)), grad_w[::-1], grad_b[::-1]
+
+    def fit(self, masks, values, epochs=5, batch_size=512, learning_rate=1e-3, seed=0, verbose=False):
+        """
+        Entrena con Adam sobre (máscaras, valor para el que mueve), por ejemplo
+        las de GameDataset.chunk_arrays.
+
+        Returns:
+            Pérdida media de cada época.
+        """
+        x = mask_features(masks, self.size)
+        y = np.asarray(values, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        params = self.weights + self.biases
+        m = [np.zeros_like(p) for p in params]
+        v = [np.zeros_like(p) for p in params]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+        history = []
+        for epoch in range(epochs):
+            order = rng.permutation(y.size)
+            losses = []
+            for start in range(0, y.size, batch_size):
+                batch = order[start:start + batch_size]
+                loss, grad_w, grad_b = self._gradients(x[batch], y[batch])
+                losses.append(loss)
+                step += 1
+                for i, grad in enumerate(grad_w + grad_b):
+                    m[i] = beta1 * m[i] + (1 - beta1) * grad
+                    v[i] = beta2 * v[i] + (1 - beta2) * grad * grad
+                    m_hat = m[i] / (1 - beta1 ** step)
+                    v_hat = v[i] / (1 - beta2 ** step)
+                    params[i] -= (learning_rate * m_hat / (np.sqrt(v_hat) + eps)).astype(np.float32)
+            history.append(float(np.mean(losses)))
+            if verbose:
+                print(f"época {epoch + 1}: pérdida {history[-1]:.4f}")
+        return history
+
+    def save(self, path):
+        arrays = {f"w{i}": w for i, w in enumerate(self.weights)}
+        arrays.update({f"b{i}": b for i, b in enumerate(self.biases)})
+        np.savez(path, size=self.size, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        net = cls.__new__(cls)
+        net.size = int(data["size"])
+        layers = len([k for k in data.files if k.startswith("w")])
+        net.weights = [data[f"w{i}"] for i in range(layers)]
+        net.biases = [data[f"b{i}"] for i in range(layers)]
+        return net
+
+
+class ValueNetEvaluator(Evaluator):
+    """
+    Evaluador con ValueNetwork: scale * valor para el que mueve, con el signo
+    del maximizador. Evalúa por lotes (todos los hijos hoja de un nodo en una
+    sola pasada de la red), así que por defecto los agentes usan batch_leaves.
+    """
+
+    batched = True
+
+    def __init__(self, network, scale=100.0):
+        self.network = ValueNetwork.load(network) if isinstance(network, str) else network
+        self.scale = scale
+
+    def evaluate(self, state, maximizing_player):
+        value = float(self.network.predict(np.array([state.mask], dtype=np.uint64))[0])
+        return self.scale * (value if maximizing_player else -value)
+
+    def evaluate_masks(self, masks, size, maximizing_player):
+        values = self.network.predict(masks) * self.scale
+        return (values if maximizing_player else -values).tolist()
+
+    def bounds(self, size):
+        return -self.scale, self.scale
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    from benchmark import position_suite, measure_pruning
+    from minimax_agent import MinimaxTacTixAgent
+    from random_agent import RandomTacTixAgent
+    from selfplay import GameDataset, generate_random_selfplay, generate_selfplay
+    from tactix_env import TacTixEnv
+    from tournament import AgentSpec, print_summary, round_robin, run_tournament, summarize
+    from trainer_agent import TrainerAgent
+
+    parser = argparse.ArgumentParser(description="Entrena la red de valor y la compara con h().")
+    parser.add_argument("--data", default="selfplay-data")
+    parser.add_argument("--random-games", type=int, default=100_000)
+    parser.add_argument("--trainer-games", type=int, default=5_000)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--out", default="value_net.npz")
+    parser.add_argument("--games", type=int, default=40, help="partidas por pareja en la comparación")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.data):
+        generate_random_selfplay(args.data, args.random_games)
+        generate_selfplay(args.data, AgentSpec("trainer", TrainerAgent, {"difficulty": 0.7}),
+                          AgentSpec("random", RandomTacTixAgent), args.trainer_games, workers=args.workers)
+    dataset = GameDataset(args.data)
+    arrays = [dataset.chunk_arrays(i) for i in range(len(dataset.games))]
+    masks = np.concatenate([a[0] for a in arrays])
+    values = np.concatenate([a[2] for a in arrays])
+    network = ValueNetwork()
+    network.fit(masks, values, epochs=args.epochs, verbose=True)
+    network.save(args.out)
+
+    env = TacTixEnv()
+    suite = position_suite()
+    evaluators = {"h": None, "red": ValueNetEvaluator(network)}
+    for name, evaluator in evaluators.items():
+        agent = MinimaxTacTixAgent(env, depth=3, evaluator=evaluator)
+        result = measure_pruning(agent, suite, depth=3)
+        print(f"{name:4s} nodos={result['nodes']:7d} nodos/s={result['nodes'] / result['seconds']:9.0f}")
+
+    specs = [AgentSpec("minimax-h", MinimaxTacTixAgent, {"depth": 3}),
+             AgentSpec("minimax-red", MinimaxTacTixAgent, {"depth": 3, "evaluator": ValueNetEvaluator(network)}),
+             AgentSpec("trainer", TrainerAgent, {"difficulty": 0.8})]
+    results = run_tournament(specs, round_robin([s.name for s in specs], args.games), workers=args.workers)
+    print_summary(summarize(results))
@@ -0,0 +1,128 @@
+import numpy as np
+from gymnasium import spaces
+from gymnasium.utils import seeding
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+from bitboard import get_tables
+from mcts_agent import get_rollout_tables, sample_maximal_runs
+
+
+class VecTacTixEnv(VectorEnv):
+    """
+    num_envs partidas de TacTix en un buffer de máscaras uint64 (tableros de
+    hasta 8x8), con la API de gymnasium.vector.VectorEnv.
+
+    step(actions) recibe un array num_envs x 4 de (idx, start, end, is_row)
+    y aplica todas las jugadas a la vez. Las partidas terminadas se reinician
+    en el mismo paso (AutoresetMode.SAME_STEP): la observación devuelta ya es
+    el tablero lleno y infos["winner"] (con máscara infos["_winner"]) dice quién
+    ganó. La recompensa es la de TacTixEnv para el jugador que movió.
+
+    Las observaciones se escriben en buffers preasignados y se devuelven sin
+    copiar: el siguiente step las sobrescribe. Con obs_mode="mask" se devuelve
+    directamente el buffer de máscaras (formato Bitboard.mask).
+    """
+
+    metadata = {"render_modes": [], "autoreset_mode": AutoresetMode.SAME_STEP}
+
+    def __init__(self, num_envs, board_size=6, misere=False, obs_mode="board"):
+        if board_size > 8:
+            raise ValueError("VecTacTixEnv guarda cada tablero en 64 bits (hasta 8x8).")
+        if obs_mode not in ("board", "mask"):
+            raise ValueError(f"Modo de observación desconocido: {obs_mode}")
+        self.num_envs = num_envs
+        self.board_size = board_size
+        self.misere = misere
+        self.obs_mode = obs_mode
+        tables = get_tables(board_size)
+        self.full = np.uint64(tables.full)
+
+        # segments[is_row, idx, start, end]: máscara de la jugada (0 si start > end)
+        segments = np.zeros((2, board_size, board_size, board_size), dtype=np.uint64)
+        for is_row in (0, 1):
+            for idx in range(board_size):
+                for start in range(board_size):
+                    for end in range(start, board_size):
+                        segments[is_row, idx, start, end] = tables.segment_masks[is_row][idx][start][end][0]
+        self._segments = segments
+        self._cell_shifts = np.arange(board_size * board_size, dtype=np.uint64)
+        self._rollout_tables = get_rollout_tables(board_size)
+
+        self.masks = np.full(num_envs, self.full, dtype=np.uint64)
+        self.current_player = np.zeros(num_envs, dtype=np.int64)
+        self._boards = np.zeros((num_envs, board_size, board_size), dtype=np.int32)
+        self._bits = np.zeros((num_envs, board_size * board_size), dtype=np.uint64)
+        self._rewards = np.zeros(num_envs, dtype=np.float32)
+        self._truncations = np.zeros(num_envs, dtype=bool)
+
+        self.single_action_space = spaces.MultiDiscrete([board_size, board_size, board_size, 2])
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        if obs_mode == "board":
+            self.single_observation_space = spaces.Dict({
+                "board": spaces.Box(low=0, high=1, shape=(board_size, board_size), dtype=np.int32),
+                "current_player": spaces.Discrete(2),
+            })
+        else:
+            self.single_observation_space = spaces.Box(low=0, high=int(tables.full), shape=(), dtype=np.uint64)
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self._np_random = None
+
+    def _get_obs(self):
+        if self.obs_mode == "mask":
+            return self.masks
+        # Decodifica las máscaras al buffer de tableros sin arrays intermedios nuevos
+        np.right_shift(self.masks[:, None], self._cell_shifts, out=self._bits)
+        np.bitwise_and(self._bits, np.uint64(1), out=self._bits)
+        np.copyto(self._boards.reshape(self.num_envs, -1), self._bits, casting="unsafe")
+        return {"board": self._boards, "current_player": self.current_player}
+
+    def reset(self, *, seed=None, options=None):
+        if seed is not None or self._np_random is None:
+            self._np_random, _ = seeding.np_random(seed)
+        self.masks.fill(self.full)
+        self.current_player.fill(0)
+        return self._get_obs(), {}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs, 4)
+        idx, start, end, is_row = actions.T
+        size = self.board_size
+        in_range = (idx >= 0) & (idx < size) & (start >= 0) & (end < size) & (is_row >= 0) & (is_row <= 1)
+        segment = self._segments[is_row.clip(0, 1), idx.clip(0, size - 1),
+                                 start.clip(0, size - 1), end.clip(0, size - 1)]
+        valid = in_range & (segment != 0) & ((self.masks & segment) == segment)
+        if not valid.all():
+            raise ValueError(f"Invalid action in envs {np.flatnonzero(~valid).tolist()}.")
+
+        self.masks ^= segment
+        done = self.masks == 0
+        self._rewards.fill(0)
+        self._rewards[done] = -1 if self.misere else 1
+        infos = {}
+        if done.any():
+            # El que movió es current_player: gana salvo en misère
+            mover = self.current_player
+            infos["winner"] = np.where(done, 1 - mover if self.misere else mover, -1)
+            infos["_winner"] = done.copy()
+        self.current_player ^= 1
+        # Autoreset en el mismo paso
+        self.masks[done] = self.full
+        self.current_player[done] = 0
+        return self._get_obs(), self._rewards, done, self._truncations, infos
+
+    def sample_actions(self):
+        """
+        Una jugada al azar por partida, uniforme entre los segmentos maximales
+        (como RandomTacTixAgent), en un array num_envs x 4.
+        """
+        if self._np_random is None:
+            self._np_random, _ = seeding.np_random()
+        size = self.board_size
+        rows, line, bits = sample_maximal_runs(self.masks, self._rollout_tables, self._np_random)
+        bits = bits.astype(np.int64)
+        actions = np.empty((self.num_envs, 4), dtype=np.int64)
+        actions[:, 0] = line % size
+        actions[:, 1] = np.log2(bits & -bits).astype(np.int64)
+        actions[:, 2] = np.log2(bits).astype(np.int64)
+        actions[:, 3] = line >= size
+        return actions